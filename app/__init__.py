@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, redirect, send_from_directory
+from flask import Flask, Response, jsonify, redirect, request
 from flask_cors import CORS
 
 def create_app(config_object="app.config.Config"):
@@ -9,6 +9,88 @@ def create_app(config_object="app.config.Config"):
     # Initialize extensions
     CORS(app)
     
+    # Fast JSON provider for jsonify (orjson when installed)
+    from app.services.fast_json import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # Shared, pooled HTTP transport for Helius RPC calls
+    from app.services.http_transport import HeliusTransport
+    app.extensions["helius_transport"] = HeliusTransport.from_config(app.config, logger=app.logger)
+    warmup_connections = app.config.get("HELIUS_WARMUP_CONNECTIONS", 2)
+    if warmup_connections > 0:
+        # Connections are opened in the background on the first request, never during a cold start
+        from app.services.http_transport import warm_on_first_request
+        warm_on_first_request(app, warmup_connections)
+    
+    # Endpoint selection, health tracking and failover across HELIUS_RPC_URLS
+    from app.services.rpc_router import RpcRouter
+    app.extensions["helius_rpc_router"] = RpcRouter.from_config(app.config, logger=app.logger)
+    
+    # Deduplication of concurrent identical RPCs (shared with the response cache)
+    from app.services.singleflight import SingleFlight
+    app.extensions["helius_singleflight"] = SingleFlight()
+    
+    # Response cache in front of helius_fetch
+    if app.config.get("HELIUS_CACHE_ENABLED", True):
+        from app.services.cache import ResponseCache
+        app.extensions["helius_cache"] = ResponseCache.from_config(
+            app.config, logger=app.logger, single_flight=app.extensions["helius_singleflight"]
+        )
+    
+    # Stale-while-revalidate cache of rendered API responses
+    if app.config.get("ROUTE_CACHE_ENABLED", True):
+        from app.services.route_cache import RouteCache
+        app.extensions["route_cache"] = RouteCache.from_config(app.config, logger=app.logger)
+    
+    # Client-side credit budget in front of every Helius call
+    if app.config.get("HELIUS_RATE_LIMIT_ENABLED", True):
+        from app.services.rate_limit import AdaptiveRateLimiter
+        app.extensions["helius_rate_limiter"] = AdaptiveRateLimiter.from_config(app.config, logger=app.logger)
+    
+    # Optional hedging of slow idempotent reads
+    if app.config.get("HELIUS_HEDGE_ENABLED", False):
+        from app.services.hedging import HedgePolicy
+        app.extensions["helius_hedging"] = HedgePolicy.from_config(app.config)
+    
+    # Decimals of mints seen by the lean token-account path (immutable, never expired)
+    from app.services.spl_token import MintTable
+    app.extensions["mint_table"] = MintTable(app.config.get("MINT_TABLE_MAX_ENTRIES", 100000))
+    
+    # Persistent per-address analytics state; durable (SQLite) by default, whatever the RPC cache uses
+    from app.services.cache_backends import build_cache_backend
+    app.extensions["analytics_store"] = build_cache_backend(
+        app.config,
+        kind=app.config.get("ANALYTICS_STORE_BACKEND", "sqlite"),
+        sqlite_path=app.config.get("ANALYTICS_SQLITE_PATH", "/tmp/perceptchain-analytics.sqlite3"),
+    )
+    
+    # Persistent collection rarity indexes; durable (SQLite) by default, like the analytics state
+    app.extensions["rarity_store"] = build_cache_backend(
+        app.config,
+        kind=app.config.get("RARITY_STORE_BACKEND", "sqlite"),
+        sqlite_path=app.config.get("RARITY_SQLITE_PATH", "/tmp/perceptchain-rarity.sqlite3"),
+    )
+    
+    # Optional background ingestion of watched addresses into a local append-only index
+    if app.config.get("INGEST_ENABLED", False):
+        from app.services.ingest_store import IngestStore
+        from app.services.ingest import IngestWorker
+        app.extensions["ingest_store"] = IngestStore.from_config(app.config)
+        app.extensions["ingest_worker"] = IngestWorker.from_config(app, app.extensions["ingest_store"])
+        app.extensions["ingest_worker"].start()
+        # Threads do not survive a fork (e.g. gunicorn --preload), so workers restart it on their first request
+        app.before_request(app.extensions["ingest_worker"].start)
+    
+    # Request latency, upstream call metrics and sampled Server-Timing headers
+    if app.config.get("METRICS_ENABLED", True):
+        from app.services import metrics
+        app.extensions["metrics"] = metrics.Metrics()
+        metrics.init_app(app)
+    
+    # Docs served from memory, read and encoded on first request
+    from app.services.static_docs import StaticDocs
+    app.extensions["static_docs"] = StaticDocs.from_config(app.static_folder, app.config)
+    
     # Register blueprints
     from app.api import api_bp
     app.register_blueprint(api_bp)
@@ -24,18 +106,82 @@ def create_app(config_object="app.config.Config"):
     
     @app.route('/docs')
     def docs():
-        return send_from_directory(app.static_folder, 'swagger-ui.html')
+        return app.extensions["static_docs"].response('swagger-ui.html', request)
     
     @app.route("/get-docs-json")
     def get_docs_json():
-        return send_from_directory(app.static_folder, 'swagger.json')
+        return app.extensions["static_docs"].response('swagger.json', request)
     
     # Register error handlers
     register_error_handlers(app)
     
-    app.logger.info(f"Backend configured to use Helius RPC endpoint: {app.config['HELIUS_RPC_URL']}")
+    # Register operational stats endpoints
+    register_stats_routes(app)
+    
+    endpoints = [e["url"] for e in app.extensions["helius_rpc_router"].stats()["endpoints"]]
+    app.logger.info(f"Backend configured to use Helius RPC endpoint(s): {', '.join(endpoints)}")
     return app
 
+def register_stats_routes(app):
+    
+    @app.route('/stats/transport')
+    def transport_stats():
+        return jsonify(app.extensions["helius_transport"].stats()), 200
+    
+    @app.route('/stats/cache')
+    def cache_stats():
+        cache = app.extensions.get("helius_cache")
+        if cache is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **cache.stats()}), 200
+    
+    @app.route('/stats/routecache')
+    def route_cache_stats():
+        cache = app.extensions.get("route_cache")
+        if cache is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **cache.stats()}), 200
+    
+    @app.route('/stats/ratelimit')
+    def rate_limit_stats():
+        limiter = app.extensions.get("helius_rate_limiter")
+        if limiter is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **limiter.stats()}), 200
+    
+    @app.route('/stats/singleflight')
+    def singleflight_stats():
+        return jsonify(app.extensions["helius_singleflight"].stats()), 200
+    
+    @app.route('/stats/endpoints')
+    def endpoint_stats():
+        return jsonify(app.extensions["helius_rpc_router"].stats()), 200
+    
+    @app.route('/stats/hedging')
+    def hedging_stats():
+        policy = app.extensions.get("helius_hedging")
+        if policy is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **policy.stats()}), 200
+
+    @app.route('/stats/mints')
+    def mint_table_stats():
+        return jsonify(app.extensions["mint_table"].stats()), 200
+    
+    @app.route('/stats/ingest')
+    def ingest_stats():
+        worker = app.extensions.get("ingest_worker")
+        if worker is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **worker.stats(), "store": app.extensions["ingest_store"].stats()}), 200
+    
+    @app.route('/metrics')
+    def prometheus_metrics():
+        metrics = app.extensions.get("metrics")
+        if metrics is None:
+            return {"error": "Metrics are disabled"}, 404
+        return Response(metrics.render(app.extensions), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 def register_error_handlers(app):
     
     @app.errorhandler(404)
@@ -1,15 +1,32 @@
+import csv
+import io
+import json
+import math
 import time
 from base58 import b58decode
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, Response, stream_with_context
 from app.api import api_bp
 from app.services.helius_service import (
     get_signatures_for_address,
     get_token_accounts_by_owner,
     get_top_holders,
+    get_address_analytics,
+    get_assets_by_group,
+    get_collection_stats,
+    iter_collection_pages,
+    iter_signature_pages,
+    _signature_row,
     InvalidPublicKeyError,
     HeliusServiceError,
-    HeliusTimeoutError
+    HeliusTimeoutError,
+    HeliusRateLimitError
 )
+from app.services.rarity import get_rarity_index
+from app.services.holders import get_holder_snapshot
+from app.services.bulk import bulk_top_holders, bulk_wallet_tokens
+from app.services import fast_json
+from app.services.deadline import with_deadline
+from app.services.route_cache import cached_json_response
 
 def is_valid_public_key(address: str) -> bool:
     """Check if the given string is a valid Solana public key."""
@@ -19,7 +36,21 @@ def is_valid_public_key(address: str) -> bool:
     except Exception:
         return False
 
+def _rate_limited_response(error: HeliusRateLimitError):
+    """429 with a Retry-After header, so clients back off instead of hammering us."""
+    response = jsonify({"error": "Helius rate limit reached, retry later"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(error.retry_after or 1)))
+    return response
+
+def token_holders_cache_key(token_address: str, limit: int) -> str:
+    return f"route:token-holders:{token_address}:{limit}"
+
+def wallet_tokens_cache_key(wallet_address: str, include_details: bool) -> str:
+    return f"route:wallet-tokens:{wallet_address}:{int(include_details)}"
+
 @api_bp.route('/token-holders/<string:token_address>/<int:limit>')
+@with_deadline()
 def token_holders_route(token_address: str, limit: int):
     
     # 1. Validate address
@@ -27,12 +58,11 @@ def token_holders_route(token_address: str, limit: int):
         return jsonify({"error": f"Invalid token mint address: {token_address}"}), 400
 
     try:
-        # 2. go to helius service
-        holders = get_top_holders(
-            mint_address=token_address,
-            top_n=limit
+        # 2. go to helius service (served stale-while-revalidate from the route cache)
+        return cached_json_response(
+            token_holders_cache_key(token_address, limit),
+            lambda: get_top_holders(mint_address=token_address, top_n=limit)
         )
-        return jsonify(holders)
 
 
     # serious error handling
@@ -44,6 +74,10 @@ def token_holders_route(token_address: str, limit: int):
         current_app.logger.error(f"Helius timeout for {token_address}: {e}")
         return jsonify({"error": "Helius API timed out"}), 504
 
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for {token_address}: {e}")
+        return _rate_limited_response(e)
+
     except HeliusServiceError as e:
         current_app.logger.error(f"Helius service error for {token_address}: {e}")
         status = 403 if "403" in str(e) else 500
@@ -54,7 +88,70 @@ def token_holders_route(token_address: str, limit: int):
         return jsonify({"error": "Unexpected server error"}), 500
 
 
+def _number_list(name: str, default: str, cast):
+    """Parse a comma-separated query parameter of numbers; None if any is malformed."""
+    try:
+        return [cast(value) for value in request.args.get(name, default=default, type=str).split(",") if value.strip()]
+    except ValueError:
+        return None
+
+@api_bp.route('/token-holders/<string:token_address>/distribution')
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def token_holders_distribution_route(token_address: str):
+    """
+    Endpoint to fetch the full holder distribution of a mint from a periodically refreshed snapshot.
+    
+    URL parameters:
+    - token_address: The token mint address
+    
+    Query parameters:
+    - top: Number of largest accounts to return (default: 20, max: HOLDER_SNAPSHOT_TOP_ADDRESSES)
+    - shares: Comma-separated k values for the share of supply held by the k largest accounts (default: 1,10,100,1000)
+    - percentiles: Comma-separated balance percentiles (default: 50,90,99)
+    """
+    max_top = current_app.config.get("HOLDER_SNAPSHOT_TOP_ADDRESSES", 1000)
+    top_n = max(min(request.args.get('top', default=20, type=int), max_top), 0)
+    shares = _number_list('shares', "1,10,100,1000", int)
+    percentiles = _number_list('percentiles', "50,90,99", float)
+    
+    if not is_valid_public_key(token_address):
+        return jsonify({"error": f"Invalid token mint address: {token_address}"}), 400
+    
+    if shares is None or percentiles is None:
+        return jsonify({"error": "shares and percentiles must be comma-separated numbers"}), 400
+    
+    try:
+        snapshot = get_holder_snapshot(token_address)
+        distribution = snapshot.summary()
+        distribution["topShares"] = {str(k): snapshot.top_share(k) for k in shares}
+        distribution["percentiles"] = {f"{p:g}": snapshot.percentile(p) for p in percentiles}
+        distribution["top"] = snapshot.top(top_n)
+        return jsonify(distribution)
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for {token_address}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for {token_address}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for {token_address}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error building holder distribution for {token_address}")
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
 @api_bp.route('/wallet/tokens/<string:wallet_address>')
+@with_deadline()
 def token_accounts_route(wallet_address: str):
     """
     Endpoint to fetch all token accounts owned by a specific wallet.
@@ -73,12 +170,11 @@ def token_accounts_route(wallet_address: str):
         return jsonify({"error": f"Invalid wallet address: {wallet_address}"}), 400
     
     try:
-        # Fetch token accounts
-        token_accounts = get_token_accounts_by_owner(
-            owner_address=wallet_address,
-            include_details=include_details
+        # Fetch token accounts (served stale-while-revalidate from the route cache)
+        return cached_json_response(
+            wallet_tokens_cache_key(wallet_address, include_details),
+            lambda: get_token_accounts_by_owner(owner_address=wallet_address, include_details=include_details)
         )
-        return jsonify(token_accounts)
         
     except InvalidPublicKeyError as e:
         current_app.logger.error(f"Validation error: {e}")
@@ -88,6 +184,10 @@ def token_accounts_route(wallet_address: str):
         current_app.logger.error(f"Helius timeout for wallet {wallet_address}: {e}")
         return jsonify({"error": "Helius API timed out"}), 504
         
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for wallet {wallet_address}: {e}")
+        return _rate_limited_response(e)
+        
     except HeliusServiceError as e:
         current_app.logger.error(f"Helius service error for wallet {wallet_address}: {e}")
         status = 403 if "403" in str(e) else 500
@@ -99,6 +199,7 @@ def token_accounts_route(wallet_address: str):
     
     
 @api_bp.route('/transactions/<string:address>')
+@with_deadline()
 def signatures_route(address: str):
     """
     Endpoint to fetch transaction signatures for an address with analytics.
@@ -138,6 +239,10 @@ def signatures_route(address: str):
         current_app.logger.error(f"Helius timeout for address {address}: {e}")
         return jsonify({"error": "Helius API timed out"}), 504
         
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for address {address}: {e}")
+        return _rate_limited_response(e)
+        
     except HeliusServiceError as e:
         current_app.logger.error(f"Helius service error for address {address}: {e}")
         status = 403 if "403" in str(e) else 500
@@ -145,4 +250,475 @@ def signatures_route(address: str):
         
     except Exception as e:
         current_app.logger.exception(f"Unexpected error fetching signatures for {address}")
-        return jsonify({"error": "Unexpected server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
+EXPORT_COLUMNS = ["signature", "blockTime", "readableTime", "slot", "err", "status", "fee", "memo"]
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+def _export_chunk(rows, fmt: str) -> str:
+    """Encode one page of signature rows as NDJSON lines or CSV records."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([_csv_value(row[col]) for col in EXPORT_COLUMNS])
+        return buf.getvalue()
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+@api_bp.route('/transactions/<string:address>/export')
+@with_deadline()
+def signatures_export_route(address: str):
+    """
+    Endpoint to stream an address's full transaction history.
+    
+    URL parameters:
+    - address: The wallet or contract address to query
+    
+    Query parameters:
+    - format: "ndjson" (default) or "csv"
+    - cursor: Resume after this signature (the last signature a previous export delivered)
+    - until: Stop at this signature (optional)
+    - page_size: Signatures fetched per upstream call (default: 1000, max: 1000)
+    """
+    fmt = request.args.get('format', default="ndjson", type=str).lower()
+    cursor = request.args.get('cursor', default=None, type=str)
+    until = request.args.get('until', default=None, type=str)
+    page_size = min(request.args.get('page_size', default=1000, type=int), 1000)
+    
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": f"Unsupported export format: {fmt}"}), 400
+    
+    # Validate address
+    if not is_valid_public_key(address):
+        return jsonify({"error": f"Invalid address: {address}"}), 400
+    
+    try:
+        # Fetch the first page up front so upstream failures still map to a status code
+        pages = iter_signature_pages(address, before=cursor, until=until, page_size=page_size)
+        first_page = next(pages, [])
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for address {address}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for address {address}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for address {address}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error exporting signatures for {address}")
+        return jsonify({"error": "Unexpected server error"}), 500
+    
+    def generate():
+        last_signature = cursor
+        if fmt == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+        
+        try:
+            page = first_page
+            while page:
+                rows = [_signature_row(tx) for tx in page]
+                last_signature = rows[-1]["signature"]
+                yield _export_chunk(rows, fmt)
+                page = next(pages, [])
+        except Exception as e:
+            # Headers are already sent; tell NDJSON clients where to resume from
+            current_app.logger.error(f"Export for {address} interrupted after {last_signature}: {e}")
+            if fmt == "ndjson":
+                yield json.dumps({"error": "Export interrupted", "cursor": last_signature}) + "\n"
+        finally:
+            pages.close()
+    
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{address}-transactions.{fmt}"'
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api_bp.route('/transactions/<string:address>/analytics')
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def signatures_analytics_route(address: str):
+    """
+    Endpoint to fetch analytics covering an address's whole transaction history.
+    
+    URL parameters:
+    - address: The wallet or contract address to query
+    """
+    # Validate address
+    if not is_valid_public_key(address):
+        return jsonify({"error": f"Invalid address: {address}"}), 400
+    
+    try:
+        analytics = get_address_analytics(address)
+        return jsonify(analytics)
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for address {address}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for address {address}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for address {address}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error computing analytics for {address}")
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
+ASSET_GROUP_KEYS = ("collection", "creator", "owner")
+
+@api_bp.route('/assets/<string:group_key>/<string:group_value>')
+@with_deadline()
+def assets_by_group_route(group_key: str, group_value: str):
+    """
+    Endpoint to fetch one page of assets by collection, creator or owner.
+    
+    URL parameters:
+    - group_key: The type of grouping (collection, creator, owner)
+    - group_value: The collection ID, creator address or owner address
+    
+    Query parameters:
+    - page: Page number (default: 1)
+    - limit: Number of results per page (default: 20, max: 1000)
+    """
+    page = max(request.args.get('page', default=1, type=int), 1)
+    limit = max(min(request.args.get('limit', default=20, type=int), 1000), 1)
+    
+    if group_key not in ASSET_GROUP_KEYS:
+        return jsonify({"error": f"Invalid group key: {group_key}"}), 400
+    
+    if not is_valid_public_key(group_value):
+        return jsonify({"error": f"Invalid {group_key} address: {group_value}"}), 400
+    
+    try:
+        assets = get_assets_by_group(
+            group_key=group_key,
+            group_value=group_value,
+            page=page,
+            limit=limit
+        )
+        return jsonify(assets)
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for {group_key} {group_value}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for {group_key} {group_value}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for {group_key} {group_value}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error fetching assets for {group_key} {group_value}")
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
+@api_bp.route('/assets/<string:group_key>/<string:group_value>/all')
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def assets_by_group_all_route(group_key: str, group_value: str):
+    """
+    Endpoint to fetch a whole collection (every DAS page) in one call.
+    
+    URL parameters:
+    - group_key: The type of grouping (collection, creator, owner)
+    - group_value: The collection ID, creator address or owner address
+    
+    Query parameters:
+    - format: "stats" (default) for merged attribute/owner aggregates only,
+      or "ndjson" to stream every asset as one JSON object per line
+    """
+    fmt = request.args.get('format', default="stats", type=str).lower()
+    
+    if fmt not in ("stats", "ndjson"):
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    
+    if group_key not in ASSET_GROUP_KEYS:
+        return jsonify({"error": f"Invalid group key: {group_key}"}), 400
+    
+    if not is_valid_public_key(group_value):
+        return jsonify({"error": f"Invalid {group_key} address: {group_value}"}), 400
+    
+    try:
+        if fmt == "stats":
+            return jsonify(get_collection_stats(group_key, group_value))
+        
+        # Fetch the first page up front so upstream failures still map to a status code
+        pages = iter_collection_pages(group_key, group_value)
+        first_page = next(pages, [])
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for {group_key} {group_value}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for {group_key} {group_value}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for {group_key} {group_value}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error fetching collection {group_key} {group_value}")
+        return jsonify({"error": "Unexpected server error"}), 500
+    
+    def generate():
+        try:
+            page = first_page
+            while page:
+                yield "".join(json.dumps(asset, separators=(",", ":")) + "\n" for asset in page)
+                page = next(pages, [])
+        except Exception as e:
+            current_app.logger.error(f"Collection stream for {group_key} {group_value} interrupted: {e}")
+            yield json.dumps({"error": "Stream interrupted"}) + "\n"
+        finally:
+            pages.close()
+    
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api_bp.route('/assets/collection/<string:collection>/rarity')
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def collection_rarity_route(collection: str):
+    """
+    Endpoint to fetch a collection's rarity summary and its rarest assets.
+    
+    URL parameters:
+    - collection: The collection ID
+    
+    Query parameters:
+    - top: Number of rarest assets to return (default: 20, max: 1000)
+    """
+    top_n = max(min(request.args.get('top', default=20, type=int), 1000), 0)
+    
+    if not is_valid_public_key(collection):
+        return jsonify({"error": f"Invalid collection address: {collection}"}), 400
+    
+    try:
+        index = get_rarity_index(collection)
+        summary = index.summary()
+        summary["rarest"] = index.top(top_n)
+        return jsonify(summary)
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for collection {collection}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for collection {collection}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for collection {collection}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error building rarity index for {collection}")
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
+@api_bp.route('/assets/collection/<string:collection>/rarity/<string:asset_id>')
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def asset_rarity_route(collection: str, asset_id: str):
+    """
+    Endpoint to fetch the rarity score, rank and trait frequencies of one asset.
+    
+    URL parameters:
+    - collection: The collection ID
+    - asset_id: The asset ID
+    """
+    if not is_valid_public_key(collection):
+        return jsonify({"error": f"Invalid collection address: {collection}"}), 400
+    
+    try:
+        rarity = get_rarity_index(collection).rarity(asset_id)
+        if rarity is None:
+            return jsonify({"error": f"Asset {asset_id} not found in collection {collection}"}), 404
+        return jsonify(rarity)
+        
+    except HeliusTimeoutError as e:
+        current_app.logger.error(f"Helius timeout for collection {collection}: {e}")
+        return jsonify({"error": "Helius API timed out"}), 504
+        
+    except HeliusRateLimitError as e:
+        current_app.logger.warning(f"Helius rate limit for collection {collection}: {e}")
+        return _rate_limited_response(e)
+        
+    except HeliusServiceError as e:
+        current_app.logger.error(f"Helius service error for collection {collection}: {e}")
+        status = 403 if "403" in str(e) else 500
+        return jsonify({"error": str(e)}), status
+        
+    except Exception as e:
+        current_app.logger.exception(f"Unexpected error fetching rarity of {asset_id} in {collection}")
+        return jsonify({"error": "Unexpected server error"}), 500
+
+
+
+def _bulk_addresses(field: str):
+    """
+    Read the `field` address list from a bulk request's JSON body.
+    
+    Returns:
+        Tuple of (addresses, None), or (None, 400 response) if the list is
+        missing, too long, or holds any invalid address (all are reported).
+    """
+    body = request.get_json(silent=True)
+    addresses = body.get(field) if isinstance(body, dict) else None
+    if not isinstance(addresses, list) or not addresses or not all(isinstance(a, str) for a in addresses):
+        return None, (jsonify({"error": f"Request body must be a JSON object with a non-empty '{field}' list"}), 400)
+    
+    max_items = current_app.config.get("BULK_MAX_ITEMS", 500)
+    if len(addresses) > max_items:
+        return None, (jsonify({"error": f"At most {max_items} {field} per request"}), 400)
+    
+    invalid = [address for address in addresses if not is_valid_public_key(address)]
+    if invalid:
+        return None, (jsonify({"error": f"Invalid addresses in '{field}'", "invalid": invalid}), 400)
+    return addresses, None
+
+def _bulk_item_error(error: Exception):
+    """Status code and message for one failed item, as the single-address route would answer."""
+    if isinstance(error, InvalidPublicKeyError):
+        return 400, str(error)
+    if isinstance(error, HeliusTimeoutError):
+        return 504, "Helius API timed out"
+    if isinstance(error, HeliusRateLimitError):
+        return 429, "Helius rate limit reached, retry later"
+    if isinstance(error, HeliusServiceError):
+        return (403 if "403" in str(error) else 500), str(error)
+    return 500, "Unexpected server error"
+
+def _bulk_stream(results, key: str) -> Response:
+    """Stream bulk results as NDJSON, one line per address in completion order."""
+    def generate():
+        try:
+            for address, result in results:
+                if isinstance(result, Exception):
+                    status, message = _bulk_item_error(result)
+                    current_app.logger.warning(f"Bulk item {address} failed: {result}")
+                    line = {key: address, "status": status, "error": message}
+                else:
+                    line = {key: address, "status": 200, "data": result}
+                yield fast_json.dumps(line) + b"\n"
+        except Exception as e:
+            current_app.logger.error(f"Bulk stream interrupted: {e}")
+            yield fast_json.dumps({"error": "Stream interrupted"}) + b"\n"
+        finally:
+            results.close()
+    
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api_bp.route('/bulk/token-holders', methods=['POST'])
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def bulk_token_holders_route():
+    """
+    Endpoint to fetch the top holders of many mints in one request.
+    
+    JSON body:
+    - mints: List of token mint addresses (at most BULK_MAX_ITEMS)
+    - limit: Holders per mint (default: 10)
+    
+    Streams one NDJSON line per distinct mint as soon as it is ready:
+    {"mint": ..., "status": 200, "data": [holders]} or {"mint": ..., "status": <code>, "error": ...}
+    """
+    mints, error = _bulk_addresses("mints")
+    if error:
+        return error
+    
+    limit = request.get_json().get("limit", 10)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    
+    try:
+        results = bulk_top_holders(mints, top_n=limit)
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except Exception as e:
+        current_app.logger.exception("Unexpected error starting bulk token holders")
+        return jsonify({"error": "Unexpected server error"}), 500
+    
+    return _bulk_stream(results, "mint")
+
+
+@api_bp.route('/bulk/wallet/tokens', methods=['POST'])
+@with_deadline("LONG_REQUEST_DEADLINE_MS")
+def bulk_token_accounts_route():
+    """
+    Endpoint to fetch the token accounts of many wallets in one request.
+    
+    JSON body:
+    - wallets: List of wallet addresses (at most BULK_MAX_ITEMS)
+    - include_details: Whether to include token supply and percentage owned (default: true)
+    
+    Streams one NDJSON line per distinct wallet as soon as it is ready:
+    {"wallet": ..., "status": 200, "data": {...}} or {"wallet": ..., "status": <code>, "error": ...}
+    """
+    wallets, error = _bulk_addresses("wallets")
+    if error:
+        return error
+    
+    include_details = request.get_json().get("include_details", True)
+    if not isinstance(include_details, bool):
+        return jsonify({"error": "include_details must be a boolean"}), 400
+    
+    try:
+        results = bulk_wallet_tokens(wallets, include_details=include_details)
+        
+    except InvalidPublicKeyError as e:
+        current_app.logger.error(f"Validation error: {e}")
+        return jsonify({"error": str(e)}), 400
+        
+    except Exception as e:
+        current_app.logger.exception("Unexpected error starting bulk wallet tokens")
+        return jsonify({"error": "Unexpected server error"}), 500
+    
+    return _bulk_stream(results, "wallet")
@@ -0,0 +1,243 @@
+"""
+ASGI entry point.
+
+The three core `/api` routes are served by async handlers built on
+`app.services.helius_async`, so a single worker process keeps as many Helius
+round-trips in flight as there are client requests. Those routes are found
+through the Flask app's own url_map and served inside a Flask request
+context, so its hooks (CORS, metrics, warm-up, ingestion) run as usual.
+Every other path (docs, exports, analytics, assets, stats) is handed to the
+Flask WSGI app on a thread through a2wsgi, so URLs and response bodies are
+the same in both serving modes.
+
+Run with:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextvars
+import io
+import math
+
+try:
+    import httpx  # noqa: F401  (the async Helius transport)
+    from a2wsgi import WSGIMiddleware
+    from a2wsgi.wsgi import build_environ
+except ImportError as e:
+    raise RuntimeError(f"The ASGI entry point requires '{e.name}' (pip install -r requirements-asgi.txt)") from e
+from flask import Response, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+from app.services.errors import InvalidPublicKeyError, HeliusTimeoutError, HeliusServiceError, HeliusRateLimitError
+from app.services.deadline import request_deadline
+from app.services.route_cache import get_route_cache, render_json
+from app.services.metrics import begin_request
+
+
+async def _token_holders(token_address: str, limit: int):
+    from app.api.routes import is_valid_public_key
+    from app.services.helius_async import async_get_top_holders
+
+    if not is_valid_public_key(token_address):
+        return {"error": f"Invalid token mint address: {token_address}"}, 400
+    return await async_get_top_holders(mint_address=token_address, top_n=limit), 200
+
+
+async def _wallet_tokens(wallet_address: str):
+    from app.api.routes import is_valid_public_key
+    from app.services.helius_async import async_get_token_accounts_by_owner
+
+    include_details = request.args.get("include_details", "true").lower() == "true"
+    if not is_valid_public_key(wallet_address):
+        return {"error": f"Invalid wallet address: {wallet_address}"}, 400
+    return await async_get_token_accounts_by_owner(owner_address=wallet_address, include_details=include_details), 200
+
+
+async def _transactions(address: str):
+    from app.api.routes import is_valid_public_key
+    from app.services.helius_async import async_get_signatures_for_address
+
+    limit = min(request.args.get("limit", 20, type=int), 1000)
+    before = request.args.get("before")
+    until = request.args.get("until")
+    if not is_valid_public_key(address):
+        return {"error": f"Invalid address: {address}"}, 400
+    return await async_get_signatures_for_address(address=address, limit=limit, before=before, until=until), 200
+
+
+def _token_holders_key(token_address: str, limit: int) -> str:
+    from app.api.routes import token_holders_cache_key
+    return token_holders_cache_key(token_address, limit)
+
+
+def _wallet_tokens_key(wallet_address: str) -> str:
+    from app.api.routes import wallet_tokens_cache_key
+    return wallet_tokens_cache_key(wallet_address, request.args.get("include_details", "true").lower() == "true")
+
+
+# Flask endpoints (app/api/routes.py) served by async handlers: endpoint -> (handler, route cache key or None).
+# URLs come from the app's own url_map, so the two serving modes cannot disagree on routing.
+ASYNC_VIEWS = {
+    "api.token_holders_route": (_token_holders, _token_holders_key),
+    "api.token_accounts_route": (_wallet_tokens, _wallet_tokens_key),
+    "api.signatures_route": (_transactions, None),
+}
+
+
+class AsgiApp:
+    """
+    ASGI callable wrapping a Flask app built by `create_app`.
+
+    Args:
+        flask_app: The Flask application (its config, extensions, hooks and JSON provider are reused)
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        missing = [endpoint for endpoint in ASYNC_VIEWS if endpoint not in flask_app.view_functions]
+        if missing:
+            raise RuntimeError(f"Async handlers for unknown Flask endpoints: {', '.join(missing)}")
+        self._urls = flask_app.url_map.bind("localhost")
+        self._wsgi = WSGIMiddleware(flask_app, workers=flask_app.config.get("ASGI_WSGI_THREADS", 32))
+        self._refresh_tasks = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                transport = self.flask_app.extensions.get("helius_async_transport")
+                if transport is not None:
+                    await transport.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        if scope["method"] in ("GET", "HEAD"):
+            try:
+                endpoint, view_args = self._urls.match(scope["path"], "GET")
+            except (HTTPException, RequestRedirect):
+                endpoint = None
+            if endpoint in ASYNC_VIEWS:
+                await self._serve_async(endpoint, view_args, scope, send)
+                return
+        await self._wsgi(scope, receive, send)
+
+    async def _serve_async(self, endpoint, view_args, scope, send):
+        """
+        Serve an async view inside a regular Flask request context.
+
+        before_request and after_request hooks run as for any Flask request, so
+        metrics, Server-Timing, CORS (flask_cors's configured settings), the
+        ingest worker restart and connection warm-up behave the same in both modes.
+        """
+        handler, cache_key = ASYNC_VIEWS[endpoint]
+        app = self.flask_app
+        environ = build_environ(scope, io.BytesIO())
+        with app.request_context(environ):
+            response = app.preprocess_request()
+            if response is None:
+                response = await self._dispatch(handler, cache_key, view_args, environ)
+            response = app.process_response(app.make_response(response))
+
+        headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.items()]
+        content = b"" if scope["method"] == "HEAD" else response.get_data()
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+    async def _dispatch(self, handler, cache_key, view_args, environ) -> Response:
+        app = self.flask_app
+        logger = app.logger
+        subject = next(iter(view_args.values()))
+
+        # Stale-while-revalidate, as `cached_json_response` does for the WSGI routes
+        cache = get_route_cache() if cache_key is not None else None
+        key = cache_key(**view_args) if cache is not None else None
+        entry, refresh = cache.lookup(key) if key is not None else (None, False)
+        if refresh:
+            self._spawn_refresh(handler, view_args, environ, cache, key)
+
+        if entry is not None:
+            response = Response(entry["body"], mimetype=app.json.mimetype)
+        else:
+            retry_after = None
+            try:
+                with request_deadline(app.config.get("REQUEST_DEADLINE_MS", 30000)):
+                    body, status = await handler(**view_args)
+
+            except InvalidPublicKeyError as e:
+                logger.error(f"Validation error: {e}")
+                body, status = {"error": str(e)}, 400
+
+            except HeliusTimeoutError as e:
+                logger.error(f"Helius timeout for {subject}: {e}")
+                body, status = {"error": "Helius API timed out"}, 504
+
+            except HeliusRateLimitError as e:
+                logger.warning(f"Helius rate limit for {subject}: {e}")
+                body, status = {"error": "Helius rate limit reached, retry later"}, 429
+                retry_after = str(max(1, math.ceil(e.retry_after or 1)))
+
+            except HeliusServiceError as e:
+                logger.error(f"Helius service error for {subject}: {e}")
+                body, status = {"error": str(e)}, 403 if "403" in str(e) else 500
+
+            except Exception:
+                logger.exception(f"Unexpected error for {subject}")
+                body, status = {"error": "Unexpected server error"}, 500
+
+            # Same bytes and content type as `jsonify`
+            response = app.json.response(body)
+            response.status_code = status
+            if retry_after is not None:
+                response.headers["Retry-After"] = retry_after
+            if key is not None and status == 200:
+                entry = cache.store(key, response.get_data())
+
+        if entry is not None:
+            for name, value in cache.headers_for(entry):
+                response.headers[name] = value
+            if cache.is_not_modified(entry, request.headers.get("If-None-Match")):
+                response.status_code = 304
+                response.set_data(b"")
+                del response.headers["Content-Type"]
+        return response
+
+    def _spawn_refresh(self, handler, view_args, environ, cache, key):
+        # Started in an empty context: the refresh must not inherit (and outlive) this request's context
+        task = contextvars.Context().run(asyncio.ensure_future, self._refresh(handler, view_args, environ, cache, key))
+        # The loop only keeps weak references to tasks
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, handler, view_args, environ, cache, key):
+        error = None
+        # Background work is not part of the request that triggered it
+        begin_request(0.0)
+        try:
+            # The handlers read the query string; no hooks run for a refresh
+            with self.flask_app.request_context(dict(environ)):
+                with request_deadline(self.flask_app.config.get("REQUEST_DEADLINE_MS", 30000)):
+                    body, status = await handler(**view_args)
+                if status == 200:
+                    cache.store(key, render_json(body))
+        except Exception as e:
+            error = e
+        finally:
+            cache.finish_refresh(key, error)
+
+
+def create_asgi_app(flask_app=None) -> AsgiApp:
+    """Wrap `flask_app` (or a new `create_app()`) in the ASGI entry point."""
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    return AsgiApp(flask_app)
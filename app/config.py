@@ -1,18 +1,154 @@
 import os
 from dotenv import load_dotenv
+from app.services.cache import parse_method_ttls
+from app.services.rate_limit import parse_method_costs
 
 load_dotenv()
 
 class Config:
     HELIUS_API_KEY = os.environ.get('HELIUS_API_KEY')
-    if not HELIUS_API_KEY:
-        raise ValueError("HELIUS_API_KEY not found in environment variables")
     
-    try:
-        HELIUS_RPC_URL = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
-    except:
-        HELIUS_API_URL = os.environ.get('HELIUS_API_URL')
+    # An explicit RPC URL (e.g. a local replay stub, see benchmarks/stub_rpc.py) needs no API key
+    HELIUS_RPC_URL = os.environ.get('HELIUS_RPC_URL') or (
+        f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}" if HELIUS_API_KEY else None
+    )
+    
+    # Optional pool of RPC endpoints, "url|weight,url|weight" (weight defaults to 1).
+    # Empty means HELIUS_RPC_URL only.
+    HELIUS_RPC_URLS = os.environ.get('HELIUS_RPC_URLS', '')
+    if not HELIUS_RPC_URL and not HELIUS_RPC_URLS:
+        raise ValueError("HELIUS_API_KEY not found in environment variables")
+    HELIUS_ROUTER_EWMA_ALPHA = float(os.environ.get('HELIUS_ROUTER_EWMA_ALPHA', 0.2))
+    HELIUS_ROUTER_FAILURE_THRESHOLD = int(os.environ.get('HELIUS_ROUTER_FAILURE_THRESHOLD', 5))
+    HELIUS_ROUTER_OPEN_SECONDS = float(os.environ.get('HELIUS_ROUTER_OPEN_SECONDS', 10))
+    HELIUS_ROUTER_MAX_ATTEMPTS = int(os.environ.get('HELIUS_ROUTER_MAX_ATTEMPTS', 2))
     
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     PORT = int(os.environ.get('PORT', 5000))
-    DEFAULT_TIMEOUT = 20000
\ No newline at end of file
+    DEFAULT_TIMEOUT = 20000
+    
+    # Per-call upstream timeouts and end-to-end request deadlines (milliseconds).
+    # Every RPC a request makes is capped by what is left of its deadline.
+    DEFAULT_TIMEOUT_MS = int(os.environ.get('DEFAULT_TIMEOUT_MS', DEFAULT_TIMEOUT))
+    HISTORY_TIMEOUT_MS = int(os.environ.get('HISTORY_TIMEOUT_MS', 30000))
+    REQUEST_DEADLINE_MS = int(os.environ.get('REQUEST_DEADLINE_MS', 30000))
+    LONG_REQUEST_DEADLINE_MS = int(os.environ.get('LONG_REQUEST_DEADLINE_MS', 120000))
+
+    # JSON encoding of API responses and Helius traffic ("auto" uses orjson when installed, "std" never does)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    JSON_SORT_KEYS = os.environ.get('JSON_SORT_KEYS', 'True').lower() == 'true'
+    # Unset: pretty-printed in debug mode only; "true": always compact; "false": always pretty-printed
+    JSON_COMPACT = {'true': True, 'false': False}.get(os.environ.get('JSON_COMPACT', '').lower())
+    
+    # /wallet/tokens: fetch raw base64 token accounts and decode them in place of jsonParsed
+    TOKEN_ACCOUNTS_LEAN = os.environ.get('TOKEN_ACCOUNTS_LEAN', 'True').lower() == 'true'
+    MINT_TABLE_MAX_ENTRIES = int(os.environ.get('MINT_TABLE_MAX_ENTRIES', 100000))
+    # Token programs scanned concurrently for wallet holdings (legacy SPL Token and Token-2022)
+    WALLET_TOKEN_PROGRAMS = os.environ.get(
+        'WALLET_TOKEN_PROGRAMS',
+        'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA,TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb'
+    )
+    
+    # Shared HTTP transport for Helius RPC calls (one pool per worker process)
+    HELIUS_POOL_CONNECTIONS = int(os.environ.get('HELIUS_POOL_CONNECTIONS', 4))
+    HELIUS_POOL_MAXSIZE = int(os.environ.get('HELIUS_POOL_MAXSIZE', 32))
+    HELIUS_POOL_BLOCK = os.environ.get('HELIUS_POOL_BLOCK', 'False').lower() == 'true'
+    HELIUS_KEEPALIVE = os.environ.get('HELIUS_KEEPALIVE', 'True').lower() == 'true'
+    HELIUS_KEEPALIVE_EXPIRY = float(os.environ.get('HELIUS_KEEPALIVE_EXPIRY', 60))
+    HELIUS_HTTP2 = os.environ.get('HELIUS_HTTP2', 'False').lower() == 'true'
+    # Connections per RPC endpoint opened in the background on a worker's first request (0 disables)
+    HELIUS_WARMUP_CONNECTIONS = int(os.environ.get('HELIUS_WARMUP_CONNECTIONS', 2))
+    # ASGI mode: threads running the Flask app for routes without an async handler
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 32))
+    
+    # Maximum calls per batched JSON-RPC POST
+    HELIUS_MAX_BATCH_SIZE = int(os.environ.get('HELIUS_MAX_BATCH_SIZE', 100))
+    
+    # Cap on concurrent upstream calls per worker process (fan-out thread pool size)
+    HELIUS_MAX_CONCURRENCY = int(os.environ.get('HELIUS_MAX_CONCURRENCY', 16))
+    
+    # Response cache for slow-changing RPC results (per-method TTLs in seconds)
+    HELIUS_CACHE_ENABLED = os.environ.get('HELIUS_CACHE_ENABLED', 'True').lower() == 'true'
+    HELIUS_CACHE_MAX_ENTRIES = int(os.environ.get('HELIUS_CACHE_MAX_ENTRIES', 10000))
+    HELIUS_CACHE_BACKEND = os.environ.get('HELIUS_CACHE_BACKEND', 'memory')  # memory | sqlite | redis
+    HELIUS_CACHE_SQLITE_PATH = os.environ.get('HELIUS_CACHE_SQLITE_PATH', '/tmp/perceptchain-cache.sqlite3')
+    HELIUS_CACHE_REDIS_URL = os.environ.get('HELIUS_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    HELIUS_CACHE_TTLS = parse_method_ttls(
+        os.environ.get('HELIUS_CACHE_TTLS', 'getTokenSupply=60,getTokenLargestAccounts=5')
+    )
+    
+    # Stale-while-revalidate cache of /token-holders and /wallet/tokens responses (seconds)
+    ROUTE_CACHE_ENABLED = os.environ.get('ROUTE_CACHE_ENABLED', 'True').lower() == 'true'
+    ROUTE_CACHE_SOFT_TTL = float(os.environ.get('ROUTE_CACHE_SOFT_TTL', 5))
+    ROUTE_CACHE_HARD_TTL = float(os.environ.get('ROUTE_CACHE_HARD_TTL', 60))
+    ROUTE_CACHE_REFRESH_AHEAD = float(os.environ.get('ROUTE_CACHE_REFRESH_AHEAD', 0.8))
+    ROUTE_CACHE_HOT_HITS = int(os.environ.get('ROUTE_CACHE_HOT_HITS', 3))
+    ROUTE_CACHE_REFRESH_WORKERS = int(os.environ.get('ROUTE_CACHE_REFRESH_WORKERS', 4))
+    
+    # Client-side Helius credit budget (token bucket, adapts to 429 / Retry-After)
+    HELIUS_RATE_LIMIT_ENABLED = os.environ.get('HELIUS_RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    HELIUS_RATE_LIMIT_CREDITS_PER_SEC = float(os.environ.get('HELIUS_RATE_LIMIT_CREDITS_PER_SEC', 100))
+    HELIUS_RATE_LIMIT_BURST = float(os.environ.get('HELIUS_RATE_LIMIT_BURST', 200))
+    HELIUS_RATE_LIMIT_MAX_WAIT_MS = int(os.environ.get('HELIUS_RATE_LIMIT_MAX_WAIT_MS', 2000))
+    HELIUS_METHOD_COSTS = parse_method_costs(
+        os.environ.get('HELIUS_METHOD_COSTS', 'getAssetsByGroup=10,getAsset=10,getProgramAccounts=10')
+    )
+    
+    # Browser/CDN cache lifetime of /docs and /get-docs-json (revalidated by ETag afterwards)
+    DOCS_MAX_AGE_SECONDS = int(os.environ.get('DOCS_MAX_AGE_SECONDS', 300))
+    
+    # Hedged reads: re-send a slow idempotent call after its p95 latency, use the first answer
+    HELIUS_HEDGE_ENABLED = os.environ.get('HELIUS_HEDGE_ENABLED', 'False').lower() == 'true'
+    HELIUS_HEDGE_METHODS = os.environ.get(
+        'HELIUS_HEDGE_METHODS',
+        'getTokenLargestAccounts,getTokenSupply,getSignaturesForAddress,getTokenAccountsByOwner'
+    )
+    HELIUS_HEDGE_PERCENTILE = float(os.environ.get('HELIUS_HEDGE_PERCENTILE', 95))
+    HELIUS_HEDGE_MIN_DELAY_MS = int(os.environ.get('HELIUS_HEDGE_MIN_DELAY_MS', 25))
+    
+    # Prometheus metrics at /metrics, and the share of requests answered with a Server-Timing breakdown
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('METRICS_SERVER_TIMING_SAMPLE_RATE', 0.0))
+    
+    # Bulk endpoints (/bulk/token-holders, /bulk/wallet/tokens)
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 500))
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 25))
+    BULK_WORKERS = int(os.environ.get('BULK_WORKERS', 4))
+    
+    # Incremental whole-history analytics for /transactions/<address>/analytics
+    ANALYTICS_MAX_SIGNATURES_PER_UPDATE = int(os.environ.get('ANALYTICS_MAX_SIGNATURES_PER_UPDATE', 50000))
+    ANALYTICS_STATE_TTL = int(os.environ.get('ANALYTICS_STATE_TTL', 30 * 24 * 3600))
+    # Where the accumulated state lives; "memory" loses it on every restart and cold start
+    ANALYTICS_STORE_BACKEND = os.environ.get('ANALYTICS_STORE_BACKEND', 'sqlite')  # memory | sqlite | redis
+    ANALYTICS_SQLITE_PATH = os.environ.get('ANALYTICS_SQLITE_PATH', '/tmp/perceptchain-analytics.sqlite3')
+    
+    # Pages with at least this many signatures use the columnar (NumPy) analytics path
+    VECTORIZE_MIN_ROWS = int(os.environ.get('VECTORIZE_MIN_ROWS', 256))
+    
+    # Whole-collection DAS walks (/assets/<group_key>/<group_value>/all)
+    DAS_PAGE_SIZE = int(os.environ.get('DAS_PAGE_SIZE', 1000))
+    DAS_PAGE_PARALLELISM = int(os.environ.get('DAS_PAGE_PARALLELISM', 4))
+    
+    # Background ingestion of watched addresses; /transactions and /wallet/tokens answer them from a local index
+    INGEST_ENABLED = os.environ.get('INGEST_ENABLED', 'False').lower() == 'true'
+    INGEST_WATCH_ADDRESSES = os.environ.get('INGEST_WATCH_ADDRESSES', '')
+    INGEST_POLL_SECONDS = float(os.environ.get('INGEST_POLL_SECONDS', 10))
+    INGEST_BACKFILL_SIGNATURES = int(os.environ.get('INGEST_BACKFILL_SIGNATURES', 1000))
+    INGEST_MAX_STALENESS_SECONDS = float(os.environ.get('INGEST_MAX_STALENESS_SECONDS', 60))
+    INGEST_SQLITE_PATH = os.environ.get('INGEST_SQLITE_PATH', '/tmp/perceptchain-ingest.sqlite3')
+    INGEST_LOCK_PATH = os.environ.get('INGEST_LOCK_PATH', '')
+    
+    # Full holder distributions (/token-holders/<mint>/distribution), scanned with getProgramAccounts
+    HOLDER_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get('HOLDER_SNAPSHOT_REFRESH_SECONDS', 300))
+    HOLDER_SNAPSHOT_MAX_MINTS = int(os.environ.get('HOLDER_SNAPSHOT_MAX_MINTS', 16))
+    HOLDER_SNAPSHOT_TOP_ADDRESSES = int(os.environ.get('HOLDER_SNAPSHOT_TOP_ADDRESSES', 1000))
+    HOLDER_SNAPSHOT_TIMEOUT_MS = int(os.environ.get('HOLDER_SNAPSHOT_TIMEOUT_MS', 60000))
+    
+    # Collection rarity indexes (/assets/collection/<collection>/rarity)
+    RARITY_REFRESH_SECONDS = int(os.environ.get('RARITY_REFRESH_SECONDS', 300))
+    RARITY_REBUILD_SECONDS = int(os.environ.get('RARITY_REBUILD_SECONDS', 24 * 3600))
+    RARITY_MAX_INDEXES = int(os.environ.get('RARITY_MAX_INDEXES', 16))
+    RARITY_STATE_TTL = int(os.environ.get('RARITY_STATE_TTL', 7 * 24 * 3600))
+    # Where built indexes live; "memory" rebuilds every collection after each restart and cold start
+    RARITY_STORE_BACKEND = os.environ.get('RARITY_STORE_BACKEND', 'sqlite')  # memory | sqlite | redis
+    RARITY_SQLITE_PATH = os.environ.get('RARITY_SQLITE_PATH', '/tmp/perceptchain-rarity.sqlite3')
@@ -0,0 +1,224 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from app.services.cache_backends import CacheBackend, MISSING
+
+
+class TopKSketch:
+    """
+    Space-Saving heavy-hitters sketch.
+
+    Keeps at most `capacity` counters, so memory stays bounded however many
+    distinct programs an address touches. Counts are exact while fewer than
+    `capacity` keys have been seen and overestimate by at most `error` after.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, key: str, count: int = 1, error: int = 0):
+        if key in self.counts:
+            self.counts[key] += count
+            self.errors[key] += error
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = error
+            return
+        # Replace the smallest counter; the new key inherits its count as error bound
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim)
+        self.counts[key] = floor + count
+        self.errors[key] = floor + error
+
+    def merge(self, other: "TopKSketch"):
+        for key, count in other.counts.items():
+            self.add(key, count, other.errors.get(key, 0))
+
+    def top(self, n: int) -> List[tuple]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def to_dict(self) -> Dict:
+        return {"capacity": self.capacity, "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TopKSketch":
+        sketch = cls(data.get("capacity", 100))
+        sketch.counts = dict(data.get("counts", {}))
+        sketch.errors = dict(data.get("errors", {}))
+        return sketch
+
+
+class AnalyticsAccumulator:
+    """
+    Mergeable transaction-history analytics for one address.
+
+    Tracks counters, hourly (hour-of-day) and daily histograms in UTC, and a
+    top-K sketch of programs parsed from memos. Accumulators over disjoint
+    signature ranges merge into the accumulator of their union, so history
+    only ever needs to be fetched once.
+    """
+
+    def __init__(self, address: str, top_k_capacity: int = 100):
+        self.address = address
+        self.count = 0
+        self.success_count = 0
+        self.total_fees = 0
+        self.hourly = [0] * 24
+        self.daily: Dict[str, int] = {}
+        self.programs = TopKSketch(top_k_capacity)
+
+        # Range of history covered, as (signature, blockTime) at each end
+        self.newest_signature: Optional[str] = None
+        self.newest_block_time: Optional[int] = None
+        self.oldest_signature: Optional[str] = None
+        self.oldest_block_time: Optional[int] = None
+        self.complete = False  # True once the oldest end reached the start of history
+        self.updated_at: Optional[float] = None
+        
+        # Signatures newer than `newest_signature` counted so far by a delta that ran out of budget.
+        # Merged only once it reaches down to `newest_signature`, so the covered range never has a hole.
+        self.pending: Optional["AnalyticsAccumulator"] = None
+
+    def add(self, tx: Dict):
+        """Add one raw getSignaturesForAddress entry. Entries must arrive newest first."""
+        self.count += 1
+        if tx.get("confirmationStatus") == "finalized" and not tx.get("err"):
+            self.success_count += 1
+
+        timestamp = tx.get("blockTime")
+        if timestamp:
+            dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            self.hourly[dt.hour] += 1
+            day = dt.strftime("%Y-%m-%d")
+            self.daily[day] = self.daily.get(day, 0) + 1
+
+        memo = tx.get("memo")
+        if memo and isinstance(memo, str):
+            for account_key in memo.split(','):
+                if account_key and len(account_key) > 10:
+                    self.programs.add(account_key)
+
+        if "fee" in tx:
+            self.total_fees += tx.get("fee") or 0
+
+        if self.newest_signature is None:
+            self.newest_signature = tx.get("signature")
+            self.newest_block_time = timestamp
+        self.oldest_signature = tx.get("signature")
+        self.oldest_block_time = timestamp
+
+    def merge(self, other: "AnalyticsAccumulator"):
+        """Merge counters, histograms and the program sketch of another accumulator."""
+        self.count += other.count
+        self.success_count += other.success_count
+        self.total_fees += other.total_fees
+        self.hourly = [a + b for a, b in zip(self.hourly, other.hourly)]
+        for day, count in other.daily.items():
+            self.daily[day] = self.daily.get(day, 0) + count
+        self.programs.merge(other.programs)
+
+    def extend_newer(self, delta: "AnalyticsAccumulator"):
+        """Merge a delta covering the signatures newer than `newest_signature`."""
+        self.merge(delta)
+        if delta.newest_signature is not None:
+            self.newest_signature = delta.newest_signature
+            self.newest_block_time = delta.newest_block_time
+        if self.oldest_signature is None:
+            self.oldest_signature = delta.oldest_signature
+            self.oldest_block_time = delta.oldest_block_time
+            self.complete = delta.complete
+
+    def extend_older(self, backfill: "AnalyticsAccumulator"):
+        """Merge a backfill covering the signatures older than `oldest_signature`."""
+        self.merge(backfill)
+        if backfill.oldest_signature is not None:
+            self.oldest_signature = backfill.oldest_signature
+            self.oldest_block_time = backfill.oldest_block_time
+        if self.newest_signature is None:
+            self.newest_signature = backfill.newest_signature
+            self.newest_block_time = backfill.newest_block_time
+        self.complete = backfill.complete
+
+    def summary(self, top_n: int = 10) -> Dict:
+        return {
+            "address": self.address,
+            "count": self.count,
+            "successRate": round(self.success_count / self.count * 100, 2) if self.count else 0,
+            "totalFees": self.total_fees,
+            "analytics": {
+                "hourlyActivity": [{"hour": hour, "count": count} for hour, count in enumerate(self.hourly) if count],
+                "dailyActivity": [{"date": day, "count": self.daily[day]} for day in sorted(self.daily)],
+                "topPrograms": [{"program": program, "count": count} for program, count in self.programs.top(top_n)]
+            },
+            "coverage": {
+                "newestSignature": self.newest_signature,
+                "newestBlockTime": self.newest_block_time,
+                "oldestSignature": self.oldest_signature,
+                "oldestBlockTime": self.oldest_block_time,
+                "complete": self.complete,
+                "pendingNewer": self.pending.count if self.pending is not None else 0,
+                "updatedAt": self.updated_at
+            }
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "address": self.address,
+            "count": self.count,
+            "success_count": self.success_count,
+            "total_fees": self.total_fees,
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "programs": self.programs.to_dict(),
+            "newest_signature": self.newest_signature,
+            "newest_block_time": self.newest_block_time,
+            "oldest_signature": self.oldest_signature,
+            "oldest_block_time": self.oldest_block_time,
+            "complete": self.complete,
+            "updated_at": self.updated_at,
+            "pending": self.pending.to_dict() if self.pending is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AnalyticsAccumulator":
+        acc = cls(data["address"])
+        acc.count = data["count"]
+        acc.success_count = data["success_count"]
+        acc.total_fees = data["total_fees"]
+        acc.hourly = list(data["hourly"])
+        acc.daily = dict(data["daily"])
+        acc.programs = TopKSketch.from_dict(data["programs"])
+        acc.newest_signature = data["newest_signature"]
+        acc.newest_block_time = data["newest_block_time"]
+        acc.oldest_signature = data["oldest_signature"]
+        acc.oldest_block_time = data["oldest_block_time"]
+        acc.complete = data["complete"]
+        acc.updated_at = data["updated_at"]
+        if data.get("pending"):
+            acc.pending = cls.from_dict(data["pending"])
+        return acc
+
+
+def get_analytics_store() -> CacheBackend:
+    """Return the store that persists per-address accumulators (registered by `create_app`)."""
+    return current_app.extensions["analytics_store"]
+
+
+def load_accumulator(address: str) -> Optional[AnalyticsAccumulator]:
+    data = get_analytics_store().get(f"analytics:{address}")
+    if data is MISSING:
+        return None
+    return AnalyticsAccumulator.from_dict(data)
+
+
+def save_accumulator(acc: AnalyticsAccumulator):
+    acc.updated_at = time.time()
+    ttl = current_app.config.get("ANALYTICS_STATE_TTL", 30 * 24 * 3600)
+    get_analytics_store().set(f"analytics:{acc.address}", acc.to_dict(), ttl)
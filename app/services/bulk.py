@@ -0,0 +1,229 @@
+"""
+Bulk versions of /token-holders and /wallet/tokens for many addresses at once.
+
+Addresses are validated and deduplicated up front, then split into chunks of
+BULK_CHUNK_SIZE. Each chunk is one batched JSON-RPC request, and chunks run
+in parallel on the bulk pool. Mint supply and decimals are read with
+`getMultipleAccounts` (100 mints per call) instead of one `getTokenSupply`
+per mint, and a mint shared by several wallets is read once per bulk request.
+Results are yielded per address as soon as its chunk finishes, so routes can
+stream them.
+"""
+import threading
+from concurrent.futures import Future, as_completed, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from flask import current_app
+
+from app.services import spl_token
+from app.services.deadline import budget_ms, current_deadline, request_deadline
+from app.services.errors import HeliusTimeoutError
+from app.services.executor import get_bulk_executor
+from app.services.helius_service import (
+    helius_fetch_batch,
+    _validate_public_key,
+    _build_top_holders,
+    _token_accounts_params,
+    _parse_token_accounts,
+    _apply_token_supplies,
+    _build_token_accounts_response,
+)
+
+
+class _SharedMintSupplies:
+    """Mint supply lookups shared by the chunks of one bulk request; each mint is read once."""
+
+    def __init__(self):
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, mints: List[str], timeout: int) -> Dict:
+        """getTokenSupply-shaped result (or the exception its lookup failed with) per mint."""
+        owned, futures = [], {}
+        with self._lock:
+            for mint in mints:
+                future = self._futures.get(mint)
+                if future is None:
+                    future = self._futures[mint] = Future()
+                    owned.append(mint)
+                futures[mint] = future
+
+        # Mints first seen by this chunk are fetched here; the rest are awaited from other chunks
+        if owned:
+            try:
+                results = helius_fetch_batch(spl_token.mint_data_calls(owned, spl_token.MINT_SUPPLY_SLICE), timeout)
+                supplies = spl_token.parse_mint_supplies(owned, results)
+            except Exception as e:
+                supplies = dict.fromkeys(owned, e)
+            for mint in owned:
+                futures[mint].set_result(supplies[mint])
+
+        supply_by_mint = {}
+        for mint, future in futures.items():
+            try:
+                supply_by_mint[mint] = future.result(budget_ms(timeout) / 1000.0)
+            except FutureTimeoutError:
+                supply_by_mint[mint] = HeliusTimeoutError(f"Supply lookup for mint {mint} exceeded {timeout}ms")
+        return supply_by_mint
+
+
+def _unique_addresses(addresses: Iterable[str]) -> List[str]:
+    addresses = list(dict.fromkeys(addresses))
+    for address in addresses:
+        _validate_public_key(address)
+    return addresses
+
+
+def _run_chunks(addresses: List[str], work: Callable[[List[str]], Dict]) -> Iterator[Tuple[str, object]]:
+    """
+    Start `work(chunk)` for every chunk of `addresses` on the bulk pool.
+
+    Chunks run under what is left of the current request deadline (counted
+    from when they start), since the returned iterator is usually consumed
+    after the view has returned.
+
+    Returns:
+        Iterator of (address, result or exception) in completion order;
+        closing it cancels chunks that have not started.
+    """
+    app = current_app._get_current_object()
+    deadline = current_deadline()
+    size = max(1, app.config.get("BULK_CHUNK_SIZE", 25))
+
+    def run(chunk: List[str]) -> Dict:
+        timeout_ms = deadline.remaining_ms() if deadline else app.config.get("LONG_REQUEST_DEADLINE_MS", 120000)
+        with app.app_context(), request_deadline(timeout_ms):
+            return work(chunk)
+
+    executor = get_bulk_executor()
+    futures = {
+        executor.submit(run, addresses[start:start + size]): addresses[start:start + size]
+        for start in range(0, len(addresses), size)
+    }
+
+    def drain():
+        try:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = dict.fromkeys(chunk, e)
+                for address in chunk:
+                    yield address, results[address]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    return drain()
+
+
+def bulk_top_holders(mint_addresses: Iterable[str], top_n: int = 10) -> Iterator[Tuple[str, object]]:
+    """
+    Top holders for many mints; see `get_top_holders`.
+
+    Raises:
+        InvalidPublicKeyError if any mint is invalid (before any upstream call)
+
+    Returns:
+        Iterator of (mint, holder list or exception) per distinct mint, as chunks finish
+    """
+    return _run_chunks(_unique_addresses(mint_addresses), lambda chunk: _top_holders_chunk(chunk, top_n))
+
+
+def _top_holders_chunk(mints: List[str], top_n: int) -> Dict:
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+
+    # Largest accounts per mint and the supply of all of them, in one batched request
+    calls = [("getTokenLargestAccounts", [mint]) for mint in mints]
+    calls += spl_token.mint_data_calls(mints, spl_token.MINT_SUPPLY_SLICE)
+    results = helius_fetch_batch(calls, timeout)
+    supply_by_mint = spl_token.parse_mint_supplies(mints, results[len(mints):])
+    spl_token.get_mint_table().update(spl_token.decimals_from_supplies(supply_by_mint))
+
+    holders = {}
+    for mint, largest in zip(mints, results):
+        supply = supply_by_mint[mint]
+        if isinstance(largest, Exception):
+            holders[mint] = largest
+        elif isinstance(supply, Exception):
+            holders[mint] = supply
+        else:
+            holders[mint] = _build_top_holders(largest, supply, top_n)
+    return holders
+
+
+def bulk_wallet_tokens(wallet_addresses: Iterable[str], include_details: bool = True) -> Iterator[Tuple[str, object]]:
+    """
+    Token accounts of many wallets; see `get_token_accounts_by_owner`.
+
+    Raises:
+        InvalidPublicKeyError if any wallet is invalid (before any upstream call)
+
+    Returns:
+        Iterator of (wallet, response body or exception) per distinct wallet, as chunks finish
+    """
+    supplies = _SharedMintSupplies()
+    return _run_chunks(
+        _unique_addresses(wallet_addresses),
+        lambda chunk: _wallet_tokens_chunk(chunk, include_details, supplies),
+    )
+
+
+def _wallet_tokens_chunk(wallets: List[str], include_details: bool, supplies: _SharedMintSupplies) -> Dict:
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+    lean = current_app.config.get("TOKEN_ACCOUNTS_LEAN", True)
+    mint_table = spl_token.get_mint_table()
+    programs = spl_token.token_programs()
+
+    # Every wallet under every token program, in one batched request
+    params_for = spl_token.token_accounts_params if lean else _token_accounts_params
+    results = helius_fetch_batch(
+        [("getTokenAccountsByOwner", params_for(wallet, program_id)) for wallet in wallets for program_id in programs],
+        timeout,
+    )
+
+    accounts_by_wallet = {}
+    for i, wallet in enumerate(wallets):
+        per_program = results[i * len(programs):(i + 1) * len(programs)]
+        error = next((result for result in per_program if isinstance(result, Exception)), None)
+        if error is not None:
+            accounts_by_wallet[wallet] = error
+        elif lean:
+            accounts_by_wallet[wallet] = spl_token.merge_by_address(
+                spl_token.decode_token_accounts(result, mint_table) for result in per_program
+            )
+        else:
+            accounts_by_wallet[wallet] = spl_token.merge_by_address(
+                (_parse_token_accounts(result) for result in per_program), address=lambda token: token["address"]
+            )
+
+    # Supplies (and decimals) for the chunk's distinct mints, shared with the other chunks
+    mints = list(dict.fromkeys(
+        account.mint if lean else account["mint"]
+        for accounts in accounts_by_wallet.values() if not isinstance(accounts, Exception)
+        for account in accounts
+    ))
+    mints = [mint for mint in mints if mint]
+    if include_details:
+        needed = mints
+    else:
+        needed = mint_table.missing(mints) if lean else []
+    supply_by_mint = supplies.get(needed, timeout) if needed else {}
+    mint_table.update(spl_token.decimals_from_supplies(supply_by_mint))
+    # Mints whose supply lookup failed: read the decimals from the mint accounts instead
+    missing = mint_table.missing(mints) if lean else []
+    if missing:
+        results = helius_fetch_batch(spl_token.mint_data_calls(missing), timeout)
+        mint_table.update(spl_token.parse_mint_decimals(missing, results))
+
+    bodies = {}
+    for wallet, accounts in accounts_by_wallet.items():
+        if isinstance(accounts, Exception):
+            bodies[wallet] = accounts
+            continue
+        token_accounts = spl_token.build_token_list(accounts, mint_table) if lean else accounts
+        if include_details:
+            _apply_token_supplies(token_accounts, supply_by_mint)
+        bodies[wallet] = _build_token_accounts_response(wallet, token_accounts)
+    return bodies
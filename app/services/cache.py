@@ -0,0 +1,147 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+
+from app.services.cache_backends import CacheBackend, MemoryBackend, MISSING, build_cache_backend
+from app.services.singleflight import SingleFlight
+
+
+def parse_method_ttls(spec: str) -> Dict[str, float]:
+    """Parse "method=seconds,method=seconds" into a TTL table."""
+    ttls = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        method, seconds = item.split("=", 1)
+        ttls[method.strip()] = float(seconds)
+    return ttls
+
+
+def cache_key(method: str, params: list) -> str:
+    """Canonical key for an RPC call; param dict ordering does not matter."""
+    return method + ":" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+class ResponseCache:
+    """
+    TTL cache for RPC results, keyed by method and params.
+
+    Only methods with a TTL in `method_ttls` are cached. Storage is delegated
+    to a pluggable CacheBackend (memory, SQLite or Redis); concurrent misses
+    on the same key within a worker share one upstream call (stampede
+    protection, through `single_flight`). Cached values are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, backend: CacheBackend = None, method_ttls: Dict[str, float] = None, logger=None,
+                 single_flight: SingleFlight = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.method_ttls = dict(method_ttls or {})
+        self.logger = logger
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, config, logger=None, single_flight: SingleFlight = None) -> "ResponseCache":
+        return cls(
+            backend=build_cache_backend(config),
+            method_ttls=config.get("HELIUS_CACHE_TTLS", {}),
+            logger=logger,
+            single_flight=single_flight,
+        )
+
+    def ttl_for(self, method: str) -> float:
+        return self.method_ttls.get(method, 0)
+
+    def _backend_get(self, key: str):
+        # A broken shared store must degrade to a miss, never fail the request
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            if self.logger:
+                self.logger.warning(f"Cache backend read failed: {e}")
+            return MISSING
+
+    def get(self, key: str, default=None):
+        """Return a fresh cached value (counting a hit) or `default` (counting a miss)."""
+        value = self._backend_get(key)
+        with self._lock:
+            if value is not MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            self.errors += 1
+            if self.logger:
+                self.logger.warning(f"Cache backend write failed: {e}")
+
+    def get_or_fetch(self, method: str, params: list, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for (method, params), calling `fetch` on a miss.
+
+        Errors are never cached; every caller waiting on a failed fetch
+        receives the same exception.
+        """
+        ttl = self.ttl_for(method)
+        if ttl <= 0:
+            return fetch()
+
+        key = cache_key(method, params)
+        value = self._backend_get(key)
+        with self._lock:
+            if value is not MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        def load():
+            result = fetch()
+            self.set(key, result, ttl)
+            return result
+
+        result, shared = self.single_flight.do(key, load, method)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return result
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        try:
+            backend_stats = self.backend.stats()
+        except Exception as e:
+            backend_stats = {"backend": self.backend.name, "error": str(e)}
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                **backend_stats,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups * 100, 2) if lookups else 0,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "inFlight": self.single_flight.in_flight(),
+                "ttls": dict(self.method_ttls),
+            }
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the cache registered on the current app, or None if caching is disabled."""
+    return current_app.extensions.get("helius_cache")
@@ -0,0 +1,323 @@
+import base64
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from app.services import fast_json
+
+
+# Sentinel returned by CacheBackend.get on a miss (None is a valid cached RPC result)
+MISSING = object()
+
+# Serialized values carry a one-byte format tag so the format can change safely.
+# 0x01 (marshal) is no longer written or read; such entries decode as misses.
+_FORMAT_JSON = b"\x02"
+_FORMAT_JSON_BYTES = b"\x03"
+_BYTES_KEY = "$bytes"
+
+
+def _encode_bytes(value: Any) -> Dict:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_BYTES_KEY: base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+
+def _decode_bytes(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and _BYTES_KEY in value:
+            return base64.b64decode(value[_BYTES_KEY], validate=True)
+        return {k: _decode_bytes(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_bytes(v) for v in value]
+    return value
+
+
+def serialize(value: Any) -> bytes:
+    """
+    Encode a cached value as JSON bytes.
+
+    Values are plain dicts/lists/strings/numbers/booleans/None (tuples come
+    back as lists), encoded with orjson when it is installed. JSON is data
+    only and reads the same on every Python version, so entries are safe to
+    share through Redis between workers and hosts. Bytes (rendered route
+    bodies, rarity index columns) are stored base64-encoded under a separate
+    tag, so plain values never pay for the extra decoding pass.
+
+    Raises:
+        ValueError if `value` contains anything but those types
+    """
+    try:
+        return _FORMAT_JSON + fast_json.dumps(value)
+    except TypeError:
+        pass
+    try:
+        return _FORMAT_JSON_BYTES + fast_json.dumps(value, default=_encode_bytes)
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e))
+
+
+def deserialize(data: bytes) -> Any:
+    """
+    Decode a `serialize`d value.
+
+    Raises:
+        ValueError for unknown formats (such as entries written by older versions) and corrupt data
+    """
+    tag, body = data[:1], data[1:]
+    if tag not in (_FORMAT_JSON, _FORMAT_JSON_BYTES):
+        raise ValueError(f"Unknown cache value format: {tag!r}")
+    try:
+        value = fast_json.loads(body)
+        return _decode_bytes(value) if tag == _FORMAT_JSON_BYTES else value
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Corrupt cache value: {e}")
+
+
+def _decode_or_missing(data: bytes) -> Any:
+    # An entry this version cannot read is a miss; the next write replaces it
+    try:
+        return deserialize(data)
+    except ValueError:
+        return MISSING
+
+
+class CacheBackend:
+    """
+    Storage interface used by ResponseCache.
+
+    Backends only store and expire values; hit/miss accounting and
+    stampede protection stay in ResponseCache.
+    """
+
+    name = "base"
+
+    def get(self, key: str) -> Any:
+        """Return the stored value, or MISSING if absent or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {"backend": self.name}
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process TTL + LRU store. Values are kept as live objects (no
+    serialization), so it is the fastest backend but private to one worker.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk store shared by every worker on the host.
+
+    Uses WAL mode so readers never block on the single writer. When the table
+    grows past `max_entries`, expired rows go first, then the oldest writes.
+    """
+
+    name = "sqlite"
+
+    # Check the size bound every N writes rather than on every write
+    _EVICT_EVERY = 256
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards the counters below
+        self._writes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._connect()  # create the schema eagerly so config errors surface at startup
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = self._connect().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return MISSING
+        if row[1] <= time.time():
+            with self._lock:
+                self.expirations += 1
+            return MISSING
+        return _decode_or_missing(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+            (key, serialize(value), now + ttl, now),
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self._EVICT_EVERY == 0
+        if evict:
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at LIMIT ?)", (excess,)
+            )
+            with self._lock:
+                self.evictions += excess
+
+    def delete(self, key: str):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+    def stats(self) -> Dict:
+        count = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        with self._lock:
+            return {
+                "backend": self.name,
+                "path": self.path,
+                "entries": count,
+                "maxEntries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Store shared across workers and hosts, spoken over the Redis protocol.
+
+    Expiry is delegated to Redis (SET ... PX); size bounds come from the
+    server's `maxmemory` / `maxmemory-policy allkeys-lru` settings. Any
+    RESP-compatible server works, including local stand-ins for testing.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = None, prefix: str = "perceptchain:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("HELIUS_CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.url = url
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return MISSING
+        return _decode_or_missing(data)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, serialize(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "prefix": self.prefix}
+
+
+def build_cache_backend(config, kind: str = None, sqlite_path: str = None) -> CacheBackend:
+    """
+    Create the backend selected by HELIUS_CACHE_BACKEND.
+
+    Args:
+        config: App config (sizes, paths and the Redis URL)
+        kind: Backend to use instead of HELIUS_CACHE_BACKEND
+        sqlite_path: Database file to use instead of HELIUS_CACHE_SQLITE_PATH
+    """
+    kind = (kind or config.get("HELIUS_CACHE_BACKEND", "memory")).lower()
+    max_entries = config.get("HELIUS_CACHE_MAX_ENTRIES", 10000)
+
+    if kind == "memory":
+        return MemoryBackend(max_entries=max_entries)
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path or config.get("HELIUS_CACHE_SQLITE_PATH"), max_entries=max_entries)
+    if kind == "redis":
+        return RedisBackend(config.get("HELIUS_CACHE_REDIS_URL"))
+    raise ValueError(f"Unknown cache backend: {kind}")
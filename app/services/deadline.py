@@ -0,0 +1,80 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import current_app
+
+from app.services.errors import HeliusTimeoutError
+
+
+class Deadline:
+    """An absolute point in (monotonic) time by which a request must be answered."""
+    __slots__ = ("timeout_ms", "expires_at")
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.expires_at = time.monotonic() + timeout_ms / 1000.0
+
+    def remaining_ms(self) -> int:
+        return max(0, int((self.expires_at - time.monotonic()) * 1000))
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# The deadline of the request being served. Context variables are copied into
+# fan-out threads (see executor.submit) and asyncio tasks, so every RPC a
+# request makes sees the same deadline without it being passed explicitly.
+_current: ContextVar[Optional[Deadline]] = ContextVar("helius_request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def request_deadline(timeout_ms: int):
+    """Run the enclosed block under a deadline `timeout_ms` from now (an enclosing, earlier deadline wins)."""
+    deadline = Deadline(timeout_ms)
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def with_deadline(config_key: str = "REQUEST_DEADLINE_MS"):
+    """
+    Route decorator: serve the request under one end-to-end deadline read from `config_key`.
+
+    Streaming bodies run after the view returns, outside the deadline; only
+    the work done inside the view is bounded.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with request_deadline(current_app.config.get(config_key, 30000)):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def budget_ms(timeout_ms: int) -> int:
+    """
+    The time an upstream call may take: its own timeout, capped by what is left of the request deadline.
+
+    Raises:
+        HeliusTimeoutError if the request deadline has already passed
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return timeout_ms
+    remaining = deadline.remaining_ms()
+    if remaining <= 0:
+        raise HeliusTimeoutError(f"Request deadline of {deadline.timeout_ms}ms exceeded")
+    return min(timeout_ms, remaining)
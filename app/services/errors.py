@@ -0,0 +1,16 @@
+# Custom exceptions shared by the Helius service layer
+class InvalidPublicKeyError(Exception):
+    pass
+
+class HeliusTimeoutError(Exception):
+    pass
+
+class HeliusServiceError(Exception):
+    pass
+
+class HeliusRateLimitError(HeliusServiceError):
+    """Raised when Helius throttles us (HTTP 429) or the client-side limiter sheds a call."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
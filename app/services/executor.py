@@ -0,0 +1,154 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from app.services.errors import HeliusTimeoutError
+
+
+# One bounded pool per worker process; its size is the global concurrency cap
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# Side pools, by name: (pid, pool). Their tasks may use the fan-out pool, but fan-out
+# tasks never wait on them, so they cannot deadlock each other.
+_side_pools: Dict[str, Tuple[int, ThreadPoolExecutor]] = {}
+
+# Marks pool threads so nested fan-outs run inline instead of deadlocking the pool
+_local = threading.local()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return this process's shared fan-out pool, creating it on first use."""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            max_workers = current_app.config.get("HELIUS_MAX_CONCURRENCY", 16)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="helius-fanout")
+            _executor_pid = pid
+    return _executor
+
+
+def _side_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    pid = os.getpid()
+    entry = _side_pools.get(name)
+    if entry is not None and entry[0] == pid:
+        return entry[1]
+
+    with _executor_lock:
+        entry = _side_pools.get(name)
+        if entry is None or entry[0] != pid:
+            entry = _side_pools[name] = (
+                pid, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"helius-{name}")
+            )
+    return entry[1]
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Return this process's pool for hedged RPC attempts, creating it on first use."""
+    return _side_pool("hedge", 2 * current_app.config.get("HELIUS_MAX_CONCURRENCY", 16))
+
+
+def get_refresh_executor() -> ThreadPoolExecutor:
+    """Return this process's pool for background cache refreshes, creating it on first use."""
+    return _side_pool("refresh", current_app.config.get("ROUTE_CACHE_REFRESH_WORKERS", 4))
+
+
+def get_bulk_executor() -> ThreadPoolExecutor:
+    """Return this process's pool for the chunks of bulk requests, creating it on first use."""
+    return _side_pool("bulk", current_app.config.get("BULK_WORKERS", 4))
+
+
+def in_worker_thread() -> bool:
+    return getattr(_local, "in_pool", False)
+
+
+def _run_task(fn: Callable[[], Any], cancelled: threading.Event):
+    if cancelled.is_set():
+        return None
+    _local.in_pool = True
+    try:
+        return fn()
+    finally:
+        _local.in_pool = False
+
+
+def submit(fn: Callable, *args) -> Future:
+    """
+    Schedule `fn(*args)` on the shared pool in a copy of the caller's context.
+
+    From a pool thread the call runs inline and an already-completed Future is
+    returned, so background work can never deadlock the pool.
+    """
+    if in_worker_thread():
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return get_executor().submit(contextvars.copy_context().run, _run_task, lambda: fn(*args), threading.Event())
+
+
+def run_concurrently(calls: List[Callable[[], Any]], timeout_ms: int = None) -> List[Any]:
+    """
+    Runs independent calls concurrently on the shared pool.
+
+    Each call runs in a copy of the caller's context, so `current_app` and any
+    request-scoped context variables are available inside it.
+
+    Args:
+        calls: Zero-argument callables
+        timeout_ms: Overall deadline for the whole fan-out (None waits indefinitely)
+
+    Returns:
+        List of results in the same order as `calls`
+
+    Raises:
+        The first exception raised by any call (siblings that have not started
+        yet are cancelled), or HeliusTimeoutError if the deadline passes first.
+    """
+    if not calls:
+        return []
+
+    # Nothing to overlap, or already on a pool thread: run inline
+    if len(calls) == 1 or in_worker_thread():
+        return [fn() for fn in calls]
+
+    deadline = time.monotonic() + timeout_ms / 1000.0 if timeout_ms is not None else None
+    cancelled = threading.Event()
+    executor = get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_task, fn, cancelled)
+        for fn in calls
+    ]
+
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_EXCEPTION)
+
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+
+            if pending and deadline is not None and time.monotonic() >= deadline:
+                raise HeliusTimeoutError(f"Concurrent Helius calls exceeded {timeout_ms}ms deadline")
+    finally:
+        if pending:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+    return [future.result() for future in futures]
@@ -0,0 +1,101 @@
+"""
+Fast JSON encoding and decoding for Helius traffic and API responses.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so the dependency stays optional. Upstream bodies are decoded
+straight from the raw response bytes, and API responses are encoded
+straight to bytes, skipping the str round-trip.
+
+Differences from the stdlib path: non-ASCII text is written as UTF-8
+rather than \\u escapes, and responses are always compact unless
+pretty-printing is on. Values orjson cannot encode (integers beyond 64
+bits, non-string dict keys) transparently fall back to the stdlib encoder.
+"""
+import json
+from typing import Any, Callable
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def available() -> bool:
+    return orjson is not None
+
+
+def loads(data: bytes) -> Any:
+    """Decode a JSON document from bytes (or str)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any, default: Callable[[Any], Any] = None) -> bytes:
+    """
+    Encode `value` as compact JSON bytes, keeping dict insertion order.
+
+    `default` is called for objects JSON cannot encode and returns an
+    encodable replacement (or raises TypeError), as in `json.dumps`.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default)
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(",", ":"), default=default).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, used for `jsonify` and the ASGI handlers alike.
+
+    Config:
+        JSON_PROVIDER: "auto" (orjson when installed) or "std" (always the stdlib encoder)
+        JSON_SORT_KEYS: Sort object keys in responses (stable output, but slower)
+        JSON_COMPACT: True always compact, False always pretty-printed,
+            None pretty-printed in debug mode only (Flask's default)
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.sort_keys = app.config.get("JSON_SORT_KEYS", True)
+        self.compact = app.config.get("JSON_COMPACT")
+        self.fast = orjson is not None and app.config.get("JSON_PROVIDER", "auto") != "std"
+
+    def _options(self, indent: bool, sort_keys: bool) -> int:
+        # Dates and dataclasses go through Flask's `default` so they encode exactly as before
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.fast and set(kwargs) <= {"indent", "separators", "sort_keys"} and kwargs.get("indent") in (None, 2):
+            try:
+                option = self._options(kwargs.get("indent") == 2, kwargs.get("sort_keys", self.sort_keys))
+                return orjson.dumps(obj, default=self.default, option=option).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if self.fast and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not self.fast:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self._options(indent, self.sort_keys) | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(data, mimetype=self.mimetype)
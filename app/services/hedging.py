@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+from flask import current_app
+
+
+class HedgePolicy:
+    """
+    Decides when to send a duplicate ("hedged") copy of a slow idempotent read.
+
+    Latencies of recent calls are kept per method; once `min_samples` are
+    known, a call still unanswered after the method's `percentile` latency
+    (never less than `min_delay_ms`) gets a second copy, and whichever
+    answer arrives first is used. At p95 this costs about 5% extra calls and
+    cuts the tail caused by a single slow upstream node or connection.
+    """
+
+    def __init__(self, methods: Iterable[str], percentile: float = 95, min_delay_ms: int = 25,
+                 window: int = 256, min_samples: int = 20):
+        self.methods = set(methods)
+        self.percentile = percentile
+        self.min_delay = min_delay_ms / 1000.0
+        self.window = window
+        self.min_samples = min_samples
+
+        self._samples: Dict[str, Deque[float]] = {}
+        self._delays: Dict[str, float] = {}
+        self._since_update: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hedged: Dict[str, int] = {}
+        self.hedge_wins: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "HedgePolicy":
+        return cls(
+            methods=[m.strip() for m in config.get("HELIUS_HEDGE_METHODS", "").split(",") if m.strip()],
+            percentile=config.get("HELIUS_HEDGE_PERCENTILE", 95),
+            min_delay_ms=config.get("HELIUS_HEDGE_MIN_DELAY_MS", 25),
+        )
+
+    def applies_to(self, method: str) -> bool:
+        return method in self.methods
+
+    def record(self, method: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(method)
+            if samples is None:
+                samples = self._samples[method] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+            # Re-derive the delay every few samples rather than sorting on every call
+            count = self._since_update.get(method, 0) + 1
+            if count >= 16 or method not in self._delays:
+                ordered = sorted(samples)
+                index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self._delays[method] = max(self.min_delay, ordered[index])
+                count = 0
+            self._since_update[method] = count
+
+    def delay_for(self, method: str) -> Optional[float]:
+        """Seconds to wait before hedging `method`, or None if it should not be hedged (yet)."""
+        if method not in self.methods:
+            return None
+        samples = self._samples.get(method)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return self._delays.get(method)
+
+    def count_hedge(self, method: str, won: bool = False):
+        with self._lock:
+            counts = self.hedge_wins if won else self.hedged
+            counts[method] = counts.get(method, 0) + 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "percentile": self.percentile,
+                "methods": {
+                    method: {
+                        "samples": len(self._samples.get(method, ())),
+                        "delayMs": round(self._delays[method] * 1000, 1) if method in self._delays else None,
+                        "hedged": self.hedged.get(method, 0),
+                        "hedgeWins": self.hedge_wins.get(method, 0),
+                    }
+                    for method in sorted(self.methods)
+                },
+            }
+
+
+def get_hedge_policy() -> Optional[HedgePolicy]:
+    """Return the hedging policy registered on the current app, or None if hedging is disabled."""
+    return current_app.extensions.get("helius_hedging")
@@ -0,0 +1,538 @@
+"""
+Async versions of the `helius_service` request paths, for the ASGI entry point.
+
+They share the sync module's validation, caching and response-building
+helpers, so both serving modes return identical bodies; only the upstream
+I/O differs. Calls go through one shared async connection pool per event
+loop, so a worker keeps many Helius round-trips in flight at once instead of
+holding a thread for each.
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+from flask import current_app
+
+from app.services.http_transport import TransportResponse, TransportTimeout, TransportError
+from app.services.errors import HeliusTimeoutError, HeliusServiceError
+from app.services.cache import get_response_cache, cache_key
+from app.services.cache_backends import MISSING, MemoryBackend
+from app.services.singleflight import get_single_flight
+from app.services.helius_service import (
+    _validate_public_key,
+    _build_top_holders,
+    _token_accounts_params,
+    _parse_token_accounts,
+    _apply_token_supplies,
+    _build_token_accounts_response,
+    _build_signatures_response,
+    _check_rate_limit,
+    _count_rpc_error,
+    _indexed_token_accounts,
+    _indexed_signatures,
+)
+from app.services.metrics import get_metrics, record_wait, upstream_error_class
+from app.services.rate_limit import get_rate_limiter
+from app.services.rpc_router import get_rpc_router, is_idempotent
+from app.services import fast_json, spl_token
+from app.services.deadline import budget_ms
+from app.services.hedging import HedgePolicy, get_hedge_policy
+
+
+class AsyncHeliusTransport:
+    """
+    Pooled async HTTP client bound to the event loop that first uses it.
+
+    An `httpx.AsyncClient` sized from the same HELIUS_POOL_MAXSIZE /
+    HELIUS_KEEPALIVE* settings as the sync transport; with `http2=True` and
+    `httpx[http2]` installed it multiplexes requests over HTTP/2. Concurrent
+    identical calls share one upstream request.
+    """
+
+    def __init__(self, pool_maxsize: int = 32, keepalive: bool = True, keepalive_expiry: float = 60.0,
+                 http2: bool = False, logger=None):
+        self.pool_maxsize = pool_maxsize
+        self.keepalive = keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.logger = logger
+
+        self._client = None
+        self._loop = None
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._fetches = set()
+        self.requests = 0
+        self.in_flight = 0
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "AsyncHeliusTransport":
+        return cls(
+            pool_maxsize=config.get("HELIUS_POOL_MAXSIZE", 32),
+            keepalive=config.get("HELIUS_KEEPALIVE", True),
+            keepalive_expiry=config.get("HELIUS_KEEPALIVE_EXPIRY", 60.0),
+            http2=config.get("HELIUS_HTTP2", False),
+            logger=logger,
+        )
+
+    def _ensure_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return self._client
+
+        # Futures and connections cannot cross event loops; start over on a new one
+        self._client = self._build_client()
+        self._loop = loop
+        self._flights = {}
+        self._fetches = set()
+        return self._client
+
+    def _build_client(self):
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+                if self.logger:
+                    self.logger.warning("HELIUS_HTTP2 is enabled but httpx[http2] is not installed; using HTTP/1.1")
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize if self.keepalive else 0,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        )
+
+    async def post(self, url: str, body: bytes, headers: Dict[str, str], timeout: float) -> TransportResponse:
+        """POST `body` to `url` over a pooled connection."""
+        client = self._ensure_client()
+        if not self.keepalive:
+            headers = dict(headers, Connection="close")
+
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            resp = await client.post(url, content=body, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise TransportTimeout(str(e))
+        except httpx.HTTPError as e:
+            raise TransportError(str(e))
+        finally:
+            self.in_flight -= 1
+        return TransportResponse(resp.status_code, resp.reason_phrase, resp.headers, resp.content)
+
+    def join(self, key: str) -> Tuple[asyncio.Future, bool]:
+        """Join the in-flight call for `key`, or start one (leader=True) that must be `finish`ed."""
+        self._ensure_client()
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        return flight, True
+
+    def finish(self, key: str, flight: asyncio.Future, result=None, error: BaseException = None):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if error is not None:
+            flight.set_exception(error)
+            # Mark the exception retrieved so a flight nobody joined doesn't log a warning
+            flight.exception()
+        else:
+            flight.set_result(result)
+
+    async def coalesce(self, key: str, fetch) -> Tuple[object, bool]:
+        """
+        Await `fetch()` once for all concurrent callers of the same key.
+
+        Returns:
+            Tuple of (result, shared), where shared is True for callers that joined
+        """
+        flight, leader = self.join(key)
+        if not leader:
+            return await asyncio.shield(flight), True
+
+        # The fetch runs as its own task: cancelling the leader (its request's deadline,
+        # a client disconnect) only stops it waiting, while the callers that joined still get the result
+        task = asyncio.ensure_future(fetch())
+        self._fetches.add(task)
+        task.add_done_callback(lambda done: self._settle(key, flight, done))
+        return await asyncio.shield(task), False
+
+    def _settle(self, key: str, flight: asyncio.Future, task: asyncio.Task):
+        self._fetches.discard(task)
+        if task.cancelled():
+            # Only reachable if the task itself was cancelled (loop shutdown); never hand CancelledError to joiners
+            self.finish(key, flight, error=HeliusTimeoutError("Shared Helius call was cancelled"))
+        elif task.exception() is not None:
+            self.finish(key, flight, error=task.exception())
+        else:
+            self.finish(key, flight, result=task.result())
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+def get_async_transport() -> AsyncHeliusTransport:
+    """Return the async transport registered on the current app, creating it on first use."""
+    transport = current_app.extensions.get("helius_async_transport")
+    if transport is None:
+        transport = AsyncHeliusTransport.from_config(current_app.config, logger=current_app.logger)
+        current_app.extensions["helius_async_transport"] = transport
+    return transport
+
+
+async def _async_post_rpc(payload, timeout_ms: int):
+    router = get_rpc_router()
+    body = fast_json.dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
+    attempts = router.max_attempts if is_idempotent(payload) else 1
+    tried = []
+
+    while True:
+        attempt_ms = budget_ms(timeout_ms)
+
+        # Credits first, as in _post_rpc: a refused or cancelled wait never holds a half-open probe
+        if limiter is not None:
+            wait = limiter.reserve(payload, attempt_ms)
+            if wait:
+                await asyncio.sleep(wait)
+                record_wait(wait)
+
+        endpoint = router.choose(tried)
+        tried.append(endpoint)
+
+        start = time.monotonic()
+        resp = None
+        try:
+            resp = await get_async_transport().post(endpoint.url, body, headers, attempt_ms / 1000.0)
+            error = None if resp.status_code < 500 else HeliusServiceError(f"HTTP error: {resp.status_code} {resp.reason}")
+        except TransportTimeout as e:
+            error = HeliusTimeoutError(str(e))
+        except TransportError as e:
+            error = HeliusServiceError(f"HTTP error: {e}")
+        except BaseException:
+            # Cancelled (e.g. the losing copy of a hedged read) or an unexpected error: no outcome to record
+            router.release(endpoint)
+            raise
+
+        if metrics is not None:
+            metrics.observe_upstream(
+                payload, time.monotonic() - start, len(resp.content) if resp is not None else 0,
+                upstream_error_class(error if resp is None else None, resp.status_code if resp is not None else None),
+            )
+
+        if error is None:
+            router.on_success(endpoint, time.monotonic() - start)
+            break
+        router.on_failure(endpoint, time.monotonic() - start)
+        if len(tried) >= min(attempts, len(router.endpoints)):
+            raise error
+        current_app.logger.warning(f"Retrying RPC on another endpoint after: {error}")
+
+    _check_rate_limit(resp, limiter)
+    if resp.status_code >= 400:
+        raise HeliusServiceError(f"HTTP error: {resp.status_code} {resp.reason}")
+
+    return fast_json.loads(resp.content)
+
+
+async def _async_helius_fetch_uncached(method: str, params: list, timeout_ms: int):
+    payload = {
+        "jsonrpc": "2.0",
+        "id": method,
+        "method": method,
+        "params": params
+    }
+
+    data = await _async_post_rpc(payload, timeout_ms)
+    if data.get("error"):
+        _count_rpc_error(method)
+        raise HeliusServiceError(json.dumps(data["error"]))
+    return data["result"]
+
+
+async def _async_timed_fetch(policy: HedgePolicy, method: str, params: list, timeout_ms: int):
+    start = time.monotonic()
+    result = await _async_helius_fetch_uncached(method, params, timeout_ms)
+    policy.record(method, time.monotonic() - start)
+    return result
+
+
+async def _async_hedged_fetch(method: str, params: list, timeout_ms: int):
+    """Async `_hedged_fetch`; the losing copy is cancelled."""
+    policy = get_hedge_policy()
+    if policy is None or not policy.applies_to(method):
+        return await _async_helius_fetch_uncached(method, params, timeout_ms)
+
+    delay = policy.delay_for(method)
+    if delay is None:
+        return await _async_timed_fetch(policy, method, params, timeout_ms)
+
+    primary = asyncio.ensure_future(_async_timed_fetch(policy, method, params, timeout_ms))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    policy.count_hedge(method)
+    hedge = asyncio.ensure_future(_async_timed_fetch(policy, method, params, timeout_ms))
+
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        policy.count_hedge(method, won=True)
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _cache_io(cache, fn, *args):
+    """Call `fn(*args)` on a thread when `cache` is backed by SQLite or Redis, inline when it is in memory."""
+    if isinstance(cache.backend, MemoryBackend):
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def async_helius_fetch(method: str, params: list, timeout_ms: int):
+    """
+    Async `helius_fetch`; results of methods with a configured TTL come from the response cache
+    and concurrent identical calls on this event loop share one upstream request.
+    """
+    cache = get_response_cache()
+    cached = cache is not None and cache.ttl_for(method) > 0
+
+    key = cache_key(method, params)
+    if cached:
+        value = await _cache_io(cache, cache.get, key, MISSING)
+        if value is not MISSING:
+            return value
+
+    async def fetch():
+        result = await _async_hedged_fetch(method, params, timeout_ms)
+        if cached:
+            await _cache_io(cache, cache.set, key, result, cache.ttl_for(method))
+        return result
+
+    result, shared = await get_async_transport().coalesce(key, fetch)
+    get_single_flight().record(method, shared)
+    return result
+
+
+async def async_helius_fetch_batch(calls: List[Tuple[str, list]], timeout_ms: int, max_batch_size: int = None) -> List:
+    """
+    Async `helius_fetch_batch`: same chunking, per-item errors and cache handling.
+    """
+    if max_batch_size is None:
+        max_batch_size = current_app.config.get("HELIUS_MAX_BATCH_SIZE", 100)
+    max_batch_size = max(1, max_batch_size)
+
+    cache = get_response_cache()
+    results = [None] * len(calls)
+    misses = []
+    cached = {}
+    cacheable = [i for i, (method, _) in enumerate(calls) if cache is not None and cache.ttl_for(method) > 0]
+    if cacheable:
+        # One trip to the cache backend for the whole batch
+        keys = [cache_key(*calls[i]) for i in cacheable]
+        cached = dict(zip(cacheable, await _cache_io(cache, lambda: [cache.get(key, MISSING) for key in keys])))
+    for i in range(len(calls)):
+        value = cached.get(i, MISSING)
+        if value is not MISSING:
+            results[i] = value
+            continue
+        misses.append(i)
+
+    async def fetch_chunk(positions: List[int]) -> List:
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": calls[i][0], "params": calls[i][1]}
+            for i in positions
+        ]
+
+        try:
+            data = await _async_post_rpc(payload, timeout_ms)
+        except (HeliusServiceError, HeliusTimeoutError) as e:
+            return [e] * len(positions)
+
+        if not isinstance(data, list):
+            error = HeliusServiceError(json.dumps(data.get("error", data)) if isinstance(data, dict) else str(data))
+            return [error] * len(positions)
+
+        by_id = {}
+        for item in data:
+            idx = item.get("id")
+            if item.get("error"):
+                _count_rpc_error(calls[idx][0] if isinstance(idx, int) and 0 <= idx < len(calls) else "batch")
+                by_id[idx] = HeliusServiceError(json.dumps(item["error"]))
+            else:
+                by_id[idx] = item.get("result")
+
+        return [
+            by_id[i] if i in by_id else HeliusServiceError(f"No response for batched call {calls[i][0]}")
+            for i in positions
+        ]
+
+    # Misses already in flight elsewhere are awaited; the rest are sent by this batch
+    transport = get_async_transport()
+    single_flight = get_single_flight()
+    led, joined = [], []
+    for i in misses:
+        key = cache_key(*calls[i])
+        flight, leader = transport.join(key)
+        single_flight.record(calls[i][0], not leader)
+        (led if leader else joined).append((i, key, flight))
+
+    positions = [i for i, _, _ in led]
+    chunks = [positions[start:start + max_batch_size] for start in range(0, len(positions), max_batch_size)]
+    fetched = {}
+    try:
+        for chunk, chunk_results in zip(chunks, await asyncio.gather(*(fetch_chunk(c) for c in chunks))):
+            for i, value in zip(chunk, chunk_results):
+                fetched[i] = value
+        writes = [
+            (cache_key(*calls[i]), value, cache.ttl_for(calls[i][0]))
+            for i, value in fetched.items()
+            if cache is not None and cache.ttl_for(calls[i][0]) > 0 and not isinstance(value, Exception)
+        ]
+        if writes:
+            await _cache_io(cache, lambda: [cache.set(*write) for write in writes])
+    finally:
+        for i, key, flight in led:
+            value = fetched.get(i, HeliusServiceError(f"Batched call {calls[i][0]} was not sent"))
+            results[i] = value
+            if isinstance(value, Exception):
+                transport.finish(key, flight, error=value)
+            else:
+                transport.finish(key, flight, result=value)
+
+    for i, _, flight in joined:
+        try:
+            results[i] = await asyncio.shield(flight)
+        except (HeliusServiceError, HeliusTimeoutError) as e:
+            results[i] = e
+
+    return results
+
+
+async def async_get_top_holders(mint_address: str, top_n: int = 10) -> List[Dict]:
+    """Async `get_top_holders`."""
+    _validate_public_key(mint_address)
+
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+
+    try:
+        result, supply_resp = await asyncio.wait_for(asyncio.gather(
+            async_helius_fetch("getTokenLargestAccounts", [mint_address], timeout),
+            async_helius_fetch("getTokenSupply", [mint_address], timeout),
+        ), budget_ms(timeout) / 1000.0)
+    except asyncio.TimeoutError:
+        raise HeliusTimeoutError(f"Concurrent Helius calls exceeded {timeout}ms deadline")
+
+    return _build_top_holders(result, supply_resp, top_n)
+
+
+async def _async_scan_token_programs(owner_address: str, params_for, timeout: int) -> List:
+    """getTokenAccountsByOwner for every token program at once (params_for(owner, program_id) builds the params)."""
+    try:
+        return await asyncio.wait_for(asyncio.gather(*(
+            async_helius_fetch("getTokenAccountsByOwner", params_for(owner_address, program_id), timeout)
+            for program_id in spl_token.token_programs()
+        )), budget_ms(timeout) / 1000.0)
+    except asyncio.TimeoutError:
+        raise HeliusTimeoutError(f"Concurrent Helius calls exceeded {timeout}ms deadline")
+
+
+async def _async_lean_token_accounts(owner_address: str, include_details: bool, timeout: int) -> List[Dict]:
+    """Async `_lean_token_accounts`."""
+    mint_table = spl_token.get_mint_table()
+    results = await _async_scan_token_programs(owner_address, spl_token.token_accounts_params, timeout)
+    accounts = spl_token.merge_by_address(spl_token.decode_token_accounts(result, mint_table) for result in results)
+
+    mints = list(dict.fromkeys(account.mint for account in accounts))
+    missing = mint_table.missing(mints)
+    supply_by_mint = None
+    if include_details:
+        supplies = await async_helius_fetch_batch([("getTokenSupply", [mint]) for mint in mints], timeout)
+        supply_by_mint = dict(zip(mints, supplies))
+        mint_table.update(spl_token.decimals_from_supplies(supply_by_mint))
+        missing = [mint for mint in missing if mint_table.decimals(mint) is None]
+    if missing:
+        results = await async_helius_fetch_batch(spl_token.mint_data_calls(missing), timeout)
+        mint_table.update(spl_token.parse_mint_decimals(missing, results))
+
+    token_accounts = spl_token.build_token_list(accounts, mint_table)
+    if supply_by_mint is not None:
+        _apply_token_supplies(token_accounts, supply_by_mint)
+    return token_accounts
+
+
+async def _from_index(read, *args):
+    """`read(*args)` against the ingestion index, a SQLite file, on a thread; None when ingestion is off."""
+    if current_app.extensions.get("ingest_store") is None:
+        return None
+    return await asyncio.to_thread(read, *args)
+
+
+async def async_get_token_accounts_by_owner(owner_address: str, include_details: bool = True) -> Dict:
+    """Async `get_token_accounts_by_owner`."""
+    _validate_public_key(owner_address)
+
+    indexed = await _from_index(_indexed_token_accounts, owner_address, include_details)
+    if indexed is not None:
+        return indexed
+
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+
+    if current_app.config.get("TOKEN_ACCOUNTS_LEAN", True):
+        token_accounts = await _async_lean_token_accounts(owner_address, include_details, timeout)
+        return _build_token_accounts_response(owner_address, token_accounts)
+
+    results = await _async_scan_token_programs(owner_address, _token_accounts_params, timeout)
+    token_accounts = spl_token.merge_by_address(
+        (_parse_token_accounts(result) for result in results), address=lambda token: token["address"]
+    )
+
+    if include_details:
+        mints = list(dict.fromkeys(t["mint"] for t in token_accounts if t["mint"]))
+        supplies = await async_helius_fetch_batch([("getTokenSupply", [mint]) for mint in mints], timeout)
+        _apply_token_supplies(token_accounts, dict(zip(mints, supplies)))
+
+    return _build_token_accounts_response(owner_address, token_accounts)
+
+
+async def async_get_signatures_for_address(address: str, limit: int = 20, before: str = None, until: str = None) -> Dict:
+    """Async `get_signatures_for_address`."""
+    _validate_public_key(address)
+
+    if limit > 1000:
+        limit = 1000  # API maximum
+
+    result = await _from_index(_indexed_signatures, address, limit, before, until)
+    if result is not None:
+        return _build_signatures_response(address, limit, result)
+
+    timeout = current_app.config.get("HISTORY_TIMEOUT_MS", 30000)
+
+    params = [address, {"limit": limit}]
+    if before:
+        params[1]["before"] = before
+    if until:
+        params[1]["until"] = until
+
+    result = await async_helius_fetch("getSignaturesForAddress", params, timeout)
+    return _build_signatures_response(address, limit, result)
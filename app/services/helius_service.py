@@ -1,22 +1,28 @@
+import contextvars
 import json
-from typing import List, Dict
+import time
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import List, Dict, Tuple, Iterator, Optional
 from flask import current_app
-import requests
 from base58 import b58decode
+from app.services.http_transport import get_transport, TransportTimeout, TransportError
+from app.services.errors import InvalidPublicKeyError, HeliusTimeoutError, HeliusServiceError, HeliusRateLimitError
+from app.services.executor import run_concurrently, submit, get_hedge_executor
+from app.services.deadline import budget_ms
+from app.services.hedging import HedgePolicy, get_hedge_policy
+from app.services.cache import get_response_cache, cache_key
+from app.services.singleflight import get_single_flight
+from app.services.rate_limit import get_rate_limiter, parse_retry_after
+from app.services.rpc_router import get_rpc_router, is_idempotent
+from app.services.cache_backends import MISSING
+from app.services.analytics import AnalyticsAccumulator, load_accumulator, save_accumulator
+from app.services import vectorized, fast_json, spl_token
+from app.services.metrics import get_metrics, record_wait, upstream_error_class
 
 
 from datetime import datetime
 
-# Custom exceptions
-class InvalidPublicKeyError(Exception):
-    pass
-
-class HeliusTimeoutError(Exception):
-    pass
-
-class HeliusServiceError(Exception):
-    pass
-
 def _validate_public_key(address: str):
     try:
         decoded = b58decode(address)
@@ -25,33 +31,264 @@ def _validate_public_key(address: str):
     except Exception:
         raise InvalidPublicKeyError(f"Invalid base58 public key: {address}")
 
+def _post_rpc(payload, timeout_ms: int):
+    """
+    Sends a JSON-RPC payload (single call or batch array) and returns the decoded body.
+    
+    The endpoint is picked by the RPC router; read-only payloads that hit a
+    connection error, timeout or 5xx are retried on another endpoint. No
+    attempt outlives the current request deadline, if one is set.
+    """
+    router = get_rpc_router()
+    body = fast_json.dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
+    attempts = router.max_attempts if is_idempotent(payload) else 1
+    tried = []
+    
+    while True:
+        attempt_ms = budget_ms(timeout_ms)
+        
+        # Wait for credits (up to the limiter's queueing budget) before spending them, and before
+        # choosing: a call that is refused credits must not hold a half-open endpoint's probe
+        if limiter is not None:
+            queued = time.monotonic()
+            limiter.acquire(payload, attempt_ms)
+            record_wait(time.monotonic() - queued)
+        
+        endpoint = router.choose(tried)
+        tried.append(endpoint)
+        
+        start = time.monotonic()
+        resp = None
+        try:
+            resp = get_transport().post(endpoint.url, body, headers, attempt_ms / 1000.0)
+            error = None if resp.status_code < 500 else HeliusServiceError(f"HTTP error: {resp.status_code} {resp.reason}")
+        except TransportTimeout as e:
+            error = HeliusTimeoutError(str(e))
+        except TransportError as e:
+            error = HeliusServiceError(f"HTTP error: {e}")
+        except BaseException:
+            # An unexpected error says nothing about the endpoint; free its half-open probe
+            router.release(endpoint)
+            raise
+        
+        if metrics is not None:
+            metrics.observe_upstream(
+                payload, time.monotonic() - start, len(resp.content) if resp is not None else 0,
+                upstream_error_class(error if resp is None else None, resp.status_code if resp is not None else None),
+            )
+        
+        if error is None:
+            router.on_success(endpoint, time.monotonic() - start)
+            break
+        router.on_failure(endpoint, time.monotonic() - start)
+        if len(tried) >= min(attempts, len(router.endpoints)):
+            raise error
+        current_app.logger.warning(f"Retrying RPC on another endpoint after: {error}")
+    
+    _check_rate_limit(resp, limiter)
+    if resp.status_code >= 400:
+        raise HeliusServiceError(f"HTTP error: {resp.status_code} {resp.reason}")
+    
+    return fast_json.loads(resp.content)
+
+def _check_rate_limit(resp, limiter):
+    """Feed the response back to the limiter; raise HeliusRateLimitError on a 429."""
+    if resp.status_code == 429:
+        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        if limiter is not None:
+            limiter.on_throttled(retry_after)
+        raise HeliusRateLimitError(f"HTTP error: 429 {resp.reason}", retry_after=retry_after)
+    if limiter is not None and resp.status_code < 400:
+        limiter.on_success()
+
+def _count_rpc_error(method: str):
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.count_rpc_error(method)
+
 def helius_fetch(method: str, params: list, timeout_ms: int):
     """
     Low-level JSON-RPC helper for Helius.
+    
+    Results of methods with a configured TTL are served from the response cache.
+    Concurrent identical calls (same method and params) share one upstream request.
     """
-    timeout_sec = timeout_ms / 1000.0
-    rpc_url = current_app.config["HELIUS_RPC_URL"]
+    fetch = lambda: _hedged_fetch(method, params, timeout_ms)
+    cache = get_response_cache()
+    if cache is not None and cache.ttl_for(method) > 0:
+        return cache.get_or_fetch(method, params, fetch)
+    result, _ = get_single_flight().do(cache_key(method, params), fetch, method, budget_ms(timeout_ms))
+    return result
+
+def _timed_fetch(policy: HedgePolicy, method: str, params: list, timeout_ms: int):
+    start = time.monotonic()
+    result = _helius_fetch_uncached(method, params, timeout_ms)
+    policy.record(method, time.monotonic() - start)
+    return result
+
+def _hedged_fetch(method: str, params: list, timeout_ms: int):
+    """
+    Runs an idempotent read, sending a duplicate if the first copy is slower than usual.
+    
+    Without a hedging policy for `method` this is a plain `_helius_fetch_uncached`.
+    """
+    policy = get_hedge_policy()
+    if policy is None or not policy.applies_to(method):
+        return _helius_fetch_uncached(method, params, timeout_ms)
+    
+    delay = policy.delay_for(method)
+    if delay is None:
+        # Still learning this method's latency profile
+        return _timed_fetch(policy, method, params, timeout_ms)
+    
+    executor = get_hedge_executor()
+    primary = executor.submit(contextvars.copy_context().run, _timed_fetch, policy, method, params, timeout_ms)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    
+    policy.count_hedge(method)
+    hedge = executor.submit(contextvars.copy_context().run, _timed_fetch, policy, method, params, timeout_ms)
+    
+    # First successful answer wins; only fail if both copies fail
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    policy.count_hedge(method, won=True)
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+def _helius_fetch_uncached(method: str, params: list, timeout_ms: int):
     payload = {
         "jsonrpc": "2.0",
         "id": method,
         "method": method,
         "params": params
     }
-    headers = {"Content-Type": "application/json"}
 
-    try:
-        resp = requests.post(rpc_url, json=payload, headers=headers, timeout=timeout_sec)
-        resp.raise_for_status()
-    except requests.Timeout as e:
-        raise HeliusTimeoutError(str(e))
-    except requests.RequestException as e:
-        raise HeliusServiceError(f"HTTP error: {e}")
-
-    data = resp.json()
+    data = _post_rpc(payload, timeout_ms)
     if data.get("error"):
+        _count_rpc_error(method)
         raise HeliusServiceError(json.dumps(data["error"]))
     return data["result"]
 
+def helius_fetch_batch(calls: List[Tuple[str, list]], timeout_ms: int, max_batch_size: int = None) -> List:
+    """
+    Sends several JSON-RPC calls as batched POSTs (one array of calls per request).
+    
+    Args:
+        calls: List of (method, params) tuples
+        timeout_ms: Timeout applied to each batched POST
+        max_batch_size: Maximum calls per POST (defaults to HELIUS_MAX_BATCH_SIZE)
+    
+    Returns:
+        List aligned with `calls`. Each item is the call's result, or an exception
+        instance (HeliusServiceError / HeliusTimeoutError) if that call failed.
+        A failed call never fails the rest of the batch.
+    """
+    if max_batch_size is None:
+        max_batch_size = current_app.config.get("HELIUS_MAX_BATCH_SIZE", 100)
+    max_batch_size = max(1, max_batch_size)
+    
+    # Serve cacheable calls from the response cache; only misses go upstream
+    cache = get_response_cache()
+    results = [None] * len(calls)
+    miss_positions = []
+    for i, (method, params) in enumerate(calls):
+        if cache is not None and cache.ttl_for(method) > 0:
+            value = cache.get(cache_key(method, params), MISSING)
+            if value is not MISSING:
+                results[i] = value
+                continue
+        miss_positions.append(i)
+    
+    # Misses already in flight elsewhere are waited on; the rest are sent by this batch
+    single_flight = get_single_flight()
+    led, joined = [], []
+    for i in miss_positions:
+        key = cache_key(*calls[i])
+        flight, leader = single_flight.join(key, calls[i][0])
+        (led if leader else joined).append((i, key, flight))
+    
+    fetched = []
+    try:
+        fetched = _helius_fetch_batch_uncached([calls[i] for i, _, _ in led], timeout_ms, max_batch_size)
+        for (i, _, _), value in zip(led, fetched):
+            results[i] = value
+            method, params = calls[i]
+            if cache is not None and cache.ttl_for(method) > 0 and not isinstance(value, Exception):
+                cache.set(cache_key(method, params), value, cache.ttl_for(method))
+    finally:
+        # Always release waiters, even if the batch itself blew up
+        for n, (i, key, flight) in enumerate(led):
+            value = fetched[n] if n < len(fetched) else HeliusServiceError(f"Batched call {calls[i][0]} was not sent")
+            if isinstance(value, Exception):
+                single_flight.finish(key, flight, error=value)
+            else:
+                single_flight.finish(key, flight, result=value)
+    
+    for i, _, flight in joined:
+        try:
+            results[i] = flight.wait(budget_ms(timeout_ms))
+        except (HeliusServiceError, HeliusTimeoutError) as e:
+            results[i] = e
+    
+    return results
+
+def _helius_fetch_batch_uncached(calls: List[Tuple[str, list]], timeout_ms: int, max_batch_size: int) -> List:
+    def fetch_chunk(start: int, chunk: List[Tuple[str, list]]) -> List:
+        # Ids are positions in `calls` so responses can be mapped back in any order
+        payload = [
+            {"jsonrpc": "2.0", "id": start + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        
+        try:
+            data = _post_rpc(payload, timeout_ms)
+        except (HeliusServiceError, HeliusTimeoutError) as e:
+            # Transport failure: every call in this chunk failed, other chunks are unaffected
+            return [e] * len(chunk)
+        
+        if not isinstance(data, list):
+            # Some servers answer a malformed batch with a single error object
+            error = HeliusServiceError(json.dumps(data.get("error", data)) if isinstance(data, dict) else str(data))
+            return [error] * len(chunk)
+        
+        chunk_results = {}
+        for item in data:
+            idx = item.get("id")
+            if not isinstance(idx, int) or not start <= idx < start + len(chunk):
+                continue
+            if item.get("error"):
+                _count_rpc_error(calls[idx][0])
+                chunk_results[idx] = HeliusServiceError(json.dumps(item["error"]))
+            else:
+                chunk_results[idx] = item.get("result")
+        
+        return [
+            chunk_results[i] if i in chunk_results else HeliusServiceError(f"No response for batched call {calls[i][0]}")
+            for i in range(start, start + len(chunk))
+        ]
+    
+    # Chunks are independent, so they are sent concurrently (each bounded by its own POST timeout)
+    chunk_calls = [
+        (lambda start=start: fetch_chunk(start, calls[start:start + max_batch_size]))
+        for start in range(0, len(calls), max_batch_size)
+    ]
+    
+    results = []
+    for chunk_results in run_concurrently(chunk_calls):
+        results.extend(chunk_results)
+    return results
+
 def get_top_holders(mint_address: str, top_n: int = 10) -> List[Dict]:
     """
     Fetches the top 'top_n' token holders for 'mint_address' using Helius RPCs.
@@ -62,33 +299,118 @@ def get_top_holders(mint_address: str, top_n: int = 10) -> List[Dict]:
 
     timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
 
-    # 1. Largest accounts (returns up to 20)
-    result = helius_fetch("getTokenLargestAccounts", [mint_address], timeout)
+    # 1. Largest accounts (returns up to 20) and total supply (for percentage calculation),
+    #    fetched concurrently since neither depends on the other. Neither call depends on
+    #    top_n (the list is sliced afterwards), so requests for any limit share them.
+    result, supply_resp = run_concurrently([
+        lambda: helius_fetch("getTokenLargestAccounts", [mint_address], timeout),
+        lambda: helius_fetch("getTokenSupply", [mint_address], timeout),
+    ], budget_ms(timeout))
+
+    return _build_top_holders(result, supply_resp, top_n)
+
+def _build_top_holders(result: Dict, supply_resp: Dict, top_n: int) -> List[Dict]:
+    """
+    Builds the holder list from getTokenLargestAccounts and getTokenSupply results.
+    """
     accounts = result.get("value", [])
 
-    # 2. Total supply (for percentage calculation)
-    supply_resp = helius_fetch("getTokenSupply", [mint_address], timeout)
+    # 2. Supply details, in integer base units so large supplies keep full precision
     supply_info = supply_resp.get("value", {})
-    raw_supply = float(supply_info.get("amount", "0"))
-    decimals = int(supply_info.get("decimals", 0))
-    total_supply = raw_supply / (10 ** decimals) if decimals else 0
+    raw_supply = int(supply_info.get("amount", "0"))
 
     # 3. Build the holder list with percentages
     holders = []
     for acct in accounts[:top_n]:
-        ui_amount = acct.get("uiAmount", 0)
-        percentage = (ui_amount / total_supply * 100) if total_supply else 0
         holders.append({
             "address": acct.get("address"),
             "amount": acct.get("amount"),
-            "uiAmount": ui_amount,
-            "percentage": round(percentage, 4)
+            "uiAmount": acct.get("uiAmount", 0),
+            "percentage": spl_token.share_percent(int(acct.get("amount") or 0), raw_supply)
         })
 
     return holders
 
 
 
+def _fetch_assets_page(group_key: str, group_value: str, page: int, limit: int, timeout: int, sort_by: Dict = None) -> Dict:
+    # Build params for the Helius RPC call
+    params = [
+        {
+            "groupKey": group_key,
+            "groupValue": group_value,
+            "page": page,
+            "limit": limit
+        }
+    ]
+    if sort_by:
+        params[0]["sortBy"] = sort_by
+    
+    # Make the RPC call
+    return helius_fetch("getAssetsByGroup", params, timeout)
+
+def _process_asset(asset: Dict) -> Dict:
+    """
+    Extracts the fields we serve from a raw DAS asset.
+    """
+    return {
+        "id": asset.get("id"),
+        "name": asset.get("content", {}).get("metadata", {}).get("name"),
+        "symbol": asset.get("content", {}).get("metadata", {}).get("symbol"),
+        "image": asset.get("content", {}).get("links", {}).get("image"),
+        "owner": asset.get("ownership", {}).get("owner"),
+        "attributes": asset.get("content", {}).get("metadata", {}).get("attributes", []),
+        "royalty": asset.get("royalty", {}).get("basis_points", 0) / 100.0,  # Convert to percentage
+        "collection": {
+            "name": asset.get("grouping", [{}])[0].get("group_value") if asset.get("grouping") else None,
+            "id": asset.get("grouping", [{}])[0].get("collection_id") if asset.get("grouping") else None
+        }
+    }
+
+def _aggregate_assets(assets: List[Dict]) -> Tuple[Dict, Dict]:
+    """
+    Counts attribute values and owners over processed assets.
+    
+    Returns:
+        Tuple of (attribute_counts {trait_type: {value: count}}, owner_counts {owner: count})
+    """
+    # Count attributes for potential visualizations
+    attribute_counts = {}
+    for asset in assets:
+        for attr in asset["attributes"]:
+            trait_type = attr.get("trait_type")
+            value = attr.get("value")
+            
+            if trait_type not in attribute_counts:
+                attribute_counts[trait_type] = {}
+            
+            if value not in attribute_counts[trait_type]:
+                attribute_counts[trait_type][value] = 0
+                
+            attribute_counts[trait_type][value] += 1
+    
+    # Count owners for distribution visualization
+    owner_counts = {}
+    for asset in assets:
+        owner = asset["owner"]
+        if owner not in owner_counts:
+            owner_counts[owner] = 0
+        owner_counts[owner] += 1
+    
+    return attribute_counts, owner_counts
+
+def _merge_asset_aggregates(attribute_counts: Dict, owner_counts: Dict, page_attributes: Dict, page_owners: Dict):
+    """
+    Merges one page's aggregates into running totals (in place).
+    """
+    for trait_type, values in page_attributes.items():
+        totals = attribute_counts.setdefault(trait_type, {})
+        for value, count in values.items():
+            totals[value] = totals.get(value, 0) + count
+    
+    for owner, count in page_owners.items():
+        owner_counts[owner] = owner_counts.get(owner, 0) + count
+
 def get_assets_by_group(group_key: str, group_value: str, page: int = 1, limit: int = 20) -> Dict:
     """
     Fetches assets by a specified grouping (collection, creator, etc).
@@ -108,21 +430,7 @@ def get_assets_by_group(group_key: str, group_value: str, page: int = 1, limit:
     
     timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
     
-    # Calculate offset for pagination
-    offset = (page - 1) * limit
-    
-    # Build params for the Helius RPC call
-    params = [
-        {
-            "groupKey": group_key,
-            "groupValue": group_value,
-            "page": page,
-            "limit": limit
-        }
-    ]
-    
-    # Make the RPC call
-    result = helius_fetch("getAssetsByGroup", params, timeout)
+    result = _fetch_assets_page(group_key, group_value, page, limit, timeout)
     
     # Process the result to enhance visualization potential
     processed_result = {
@@ -131,62 +439,123 @@ def get_assets_by_group(group_key: str, group_value: str, page: int = 1, limit:
         "page": page,
         "groupKey": group_key,
         "groupValue": group_value,
-        "assets": []
+        "assets": [_process_asset(asset) for asset in result.get("items", [])]
     }
     
-    # Extract and organize the assets data
-    for asset in result.get("items", []):
-        processed_asset = {
-            "id": asset.get("id"),
-            "name": asset.get("content", {}).get("metadata", {}).get("name"),
-            "symbol": asset.get("content", {}).get("metadata", {}).get("symbol"),
-            "image": asset.get("content", {}).get("links", {}).get("image"),
-            "owner": asset.get("ownership", {}).get("owner"),
-            "attributes": asset.get("content", {}).get("metadata", {}).get("attributes", []),
-            "royalty": asset.get("royalty", {}).get("basis_points", 0) / 100.0,  # Convert to percentage
-            "collection": {
-                "name": asset.get("grouping", [{}])[0].get("group_value") if asset.get("grouping") else None,
-                "id": asset.get("grouping", [{}])[0].get("collection_id") if asset.get("grouping") else None
-            }
-        }
-        processed_result["assets"].append(processed_asset)
-    
     # Add aggregated stats for visualization
     if processed_result["assets"]:
-        # Count attributes for potential visualizations
-        attribute_counts = {}
-        for asset in processed_result["assets"]:
-            for attr in asset["attributes"]:
-                trait_type = attr.get("trait_type")
-                value = attr.get("value")
-                
-                if trait_type not in attribute_counts:
-                    attribute_counts[trait_type] = {}
-                
-                if value not in attribute_counts[trait_type]:
-                    attribute_counts[trait_type][value] = 0
-                    
-                attribute_counts[trait_type][value] += 1
-        
+        attribute_counts, owner_counts = _aggregate_assets(processed_result["assets"])
         processed_result["attribute_stats"] = attribute_counts
-        
-        # Count owners for distribution visualization
-        owner_counts = {}
-        for asset in processed_result["assets"]:
-            owner = asset["owner"]
-            if owner not in owner_counts:
-                owner_counts[owner] = 0
-            owner_counts[owner] += 1
-        
         processed_result["owner_distribution"] = owner_counts
     
     return processed_result
 
+def iter_collection_pages(group_key: str, group_value: str, page_size: int = None, parallelism: int = None) -> Iterator[List[Dict]]:
+    """
+    Walks every DAS page of a group, several pages at a time.
+    
+    Keeps up to `parallelism` page requests in flight and yields processed
+    assets page by page, in page order. Stops at the first short page.
+    
+    Args:
+        group_key: The type of grouping (e.g., 'collection', 'creator')
+        group_value: The value to search for
+        page_size: Assets per DAS page (defaults to DAS_PAGE_SIZE, max: 1000)
+        parallelism: Pages fetched concurrently (defaults to DAS_PAGE_PARALLELISM)
+        
+    Yields:
+        Lists of processed assets
+    """
+    if group_key == "creator" or group_key == "owner":
+        _validate_public_key(group_value)
+    
+    page_size = max(1, min(page_size or current_app.config.get("DAS_PAGE_SIZE", 1000), 1000))
+    parallelism = max(1, parallelism or current_app.config.get("DAS_PAGE_PARALLELISM", 4))
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+    
+    in_flight = deque()
+    next_page = 1
+    try:
+        for _ in range(parallelism):
+            in_flight.append(submit(_fetch_assets_page, group_key, group_value, next_page, page_size, timeout))
+            next_page += 1
+        
+        while in_flight:
+            items = in_flight.popleft().result().get("items", [])
+            if len(items) < page_size:
+                # Last page: anything still in flight is past the end
+                yield [_process_asset(asset) for asset in items]
+                return
+            
+            in_flight.append(submit(_fetch_assets_page, group_key, group_value, next_page, page_size, timeout))
+            next_page += 1
+            yield [_process_asset(asset) for asset in items]
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+def get_collection_stats(group_key: str, group_value: str) -> Dict:
+    """
+    Computes attribute and owner aggregates over every asset in a group.
+    
+    Args:
+        group_key: The type of grouping (e.g., 'collection', 'creator')
+        group_value: The value to search for
+    
+    Returns:
+        Dictionary with the merged attribute_stats and owner_distribution
+    """
+    attribute_counts = {}
+    owner_counts = {}
+    total = 0
+    pages = 0
+    
+    for assets in iter_collection_pages(group_key, group_value):
+        page_attributes, page_owners = _aggregate_assets(assets)
+        _merge_asset_aggregates(attribute_counts, owner_counts, page_attributes, page_owners)
+        total += len(assets)
+        if assets:
+            pages += 1
+    
+    return {
+        "total": total,
+        "pages": pages,
+        "groupKey": group_key,
+        "groupValue": group_value,
+        "uniqueOwners": len(owner_counts),
+        "attribute_stats": attribute_counts,
+        "owner_distribution": owner_counts
+    }
 
 
+
+def _indexed_token_accounts(owner_address: str, include_details: bool) -> Optional[Dict]:
+    """
+    /wallet/tokens body of a watched wallet from the ingestion index, or None if it must come from Helius.
+    """
+    store = current_app.extensions.get("ingest_store")
+    if store is None:
+        return None
+    body = store.token_accounts(owner_address, current_app.config.get("INGEST_MAX_STALENESS_SECONDS", 60))
+    if body is not None and not include_details:
+        for token in body["tokens"]:
+            for key in ("tokenSupply", "percentageOwned", "error"):
+                token.pop(key, None)
+    return body
+
+def _indexed_signatures(address: str, limit: int, before: str, until: str) -> Optional[List[Dict]]:
+    """
+    Raw getSignaturesForAddress page of a watched address from the ingestion index, or None if it must come from Helius.
+    """
+    store = current_app.extensions.get("ingest_store")
+    if store is None:
+        return None
+    return store.signatures(address, limit, before, until, current_app.config.get("INGEST_MAX_STALENESS_SECONDS", 60))
+
 def get_token_accounts_by_owner(owner_address: str, include_details: bool = True) -> Dict:
     """
-    Fetches all SPL token accounts owned by a specific wallet address.
+    Fetches all SPL token accounts owned by a specific wallet address,
+    under every program in WALLET_TOKEN_PROGRAMS (SPL Token and Token-2022).
     
     Args:
         owner_address: The wallet address to query
@@ -198,20 +567,89 @@ def get_token_accounts_by_owner(owner_address: str, include_details: bool = True
     # Validate owner address
     _validate_public_key(owner_address)
     
+    # Watched wallets are answered from the ingestion index while it is fresh
+    indexed = _indexed_token_accounts(owner_address, include_details)
+    if indexed is not None:
+        return indexed
+    
+    return _fetch_token_accounts_by_owner(owner_address, include_details)
+
+def _fetch_token_accounts_by_owner(owner_address: str, include_details: bool) -> Dict:
+    """
+    `get_token_accounts_by_owner` from Helius, bypassing the ingestion index.
+    """
     timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
     
+    if current_app.config.get("TOKEN_ACCOUNTS_LEAN", True):
+        return _build_token_accounts_response(owner_address, _lean_token_accounts(owner_address, include_details, timeout))
+    
+    # Scan every token program (legacy SPL Token and Token-2022) concurrently
+    results = run_concurrently([
+        lambda program_id=program_id: helius_fetch(
+            "getTokenAccountsByOwner", _token_accounts_params(owner_address, program_id), timeout
+        )
+        for program_id in spl_token.token_programs()
+    ], budget_ms(timeout))
+    
+    # Process token accounts
+    token_accounts = spl_token.merge_by_address(
+        (_parse_token_accounts(result) for result in results), address=lambda token: token["address"]
+    )
+    
+    # Fetch additional token metadata if requested, one batched lookup per distinct mint
+    if include_details:
+        mints = list(dict.fromkeys(t["mint"] for t in token_accounts if t["mint"]))
+        supplies = helius_fetch_batch([("getTokenSupply", [mint]) for mint in mints], timeout)
+        _apply_token_supplies(token_accounts, dict(zip(mints, supplies)))
+    
+    return _build_token_accounts_response(owner_address, token_accounts)
+
+def _lean_token_accounts(owner_address: str, include_details: bool, timeout: int) -> List[Dict]:
+    """
+    Same tokens as the jsonParsed path, from raw base64 account data.
+    
+    Both token programs are scanned concurrently and their accounts merged
+    before any mint lookups, so each mint is looked up once. Decimals come from the mint table; with `include_details` the getTokenSupply
+    results fill it, otherwise unknown mints are read with getMultipleAccounts.
+    """
+    mint_table = spl_token.get_mint_table()
+    results = run_concurrently([
+        lambda program_id=program_id: helius_fetch(
+            "getTokenAccountsByOwner", spl_token.token_accounts_params(owner_address, program_id), timeout
+        )
+        for program_id in spl_token.token_programs()
+    ], budget_ms(timeout))
+    accounts = spl_token.merge_by_address(spl_token.decode_token_accounts(result, mint_table) for result in results)
+    
+    mints = list(dict.fromkeys(account.mint for account in accounts))
+    missing = mint_table.missing(mints)
+    supply_by_mint = None
+    if include_details:
+        supply_by_mint = dict(zip(mints, helius_fetch_batch([("getTokenSupply", [mint]) for mint in mints], timeout)))
+        mint_table.update(spl_token.decimals_from_supplies(supply_by_mint))
+        missing = [mint for mint in missing if mint_table.decimals(mint) is None]
+    if missing:
+        results = helius_fetch_batch(spl_token.mint_data_calls(missing), timeout)
+        mint_table.update(spl_token.parse_mint_decimals(missing, results))
+    
+    token_accounts = spl_token.build_token_list(accounts, mint_table)
+    if supply_by_mint is not None:
+        _apply_token_supplies(token_accounts, supply_by_mint)
+    return token_accounts
+
+def _token_accounts_params(owner_address: str, program_id: str = spl_token.TOKEN_PROGRAM_ID) -> list:
     # Build params for Helius RPC call
     # We're requesting the "jsonParsed" encoding to get nicely formatted data
-    params = [
+    return [
         owner_address,
-        {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},  # SPL Token program ID
+        {"programId": program_id},  # SPL Token or Token-2022 program ID
         {"encoding": "jsonParsed"}
     ]
-    
-    # Make the RPC call
-    result = helius_fetch("getTokenAccountsByOwner", params, timeout)
-    
-    # Process token accounts
+
+def _parse_token_accounts(result: Dict) -> List[Dict]:
+    """
+    Extracts non-zero token balances from a jsonParsed getTokenAccountsByOwner result.
+    """
     token_accounts = []
     
     for account in result.get("value", []):
@@ -231,35 +669,52 @@ def get_token_accounts_by_owner(owner_address: str, include_details: bool = True
             "uiAmount": ui_amount,
             "decimals": account_data.get("tokenAmount", {}).get("decimals", 0)
         }
-        
-        # Fetch additional token metadata if requested
-        if include_details and mint:
-            try:
-                # Get token metadata (supply, etc.)
-                supply_resp = helius_fetch("getTokenSupply", [mint], timeout)
-                supply_info = supply_resp.get("value", {})
-                
-                token_info["tokenSupply"] = {
-                    "amount": supply_info.get("amount"),
-                    "uiAmount": supply_info.get("uiAmount"),
-                    "decimals": supply_info.get("decimals", 0)
-                }
-                
-                # Calculate percentage of total supply
-                total_supply = float(supply_info.get("uiAmount", 0))
-                if total_supply > 0:
-                    token_info["percentageOwned"] = round((ui_amount / total_supply) * 100, 4)
-                else:
-                    token_info["percentageOwned"] = 0
-                    
-            except Exception as e:
-                current_app.logger.warning(f"Failed to fetch details for token {mint}: {e}")
-                token_info["error"] = "Failed to fetch token details"
                 
         token_accounts.append(token_info)
     
-    # Sort by UI amount in descending order
-    token_accounts.sort(key=lambda x: x.get("uiAmount", 0), reverse=True)
+    return token_accounts
+
+def _apply_token_supplies(token_accounts: List[Dict], supply_by_mint: Dict):
+    """
+    Adds tokenSupply / percentageOwned (or an "error" field) to each token, in place.
+    
+    Args:
+        token_accounts: Tokens as built by _parse_token_accounts
+        supply_by_mint: getTokenSupply result (or the exception it failed with) per mint
+    """
+    for token_info in token_accounts:
+        mint = token_info["mint"]
+        if not mint:
+            continue
+        
+        supply_resp = supply_by_mint[mint]
+        if isinstance(supply_resp, Exception):
+            current_app.logger.warning(f"Failed to fetch details for token {mint}: {supply_resp}")
+            token_info["error"] = "Failed to fetch token details"
+            continue
+        
+        try:
+            # Get token metadata (supply, etc.)
+            supply_info = supply_resp.get("value", {})
+            
+            token_info["tokenSupply"] = {
+                "amount": supply_info.get("amount"),
+                "uiAmount": supply_info.get("uiAmount"),
+                "decimals": supply_info.get("decimals", 0)
+            }
+            
+            # Calculate percentage of total supply (from integer base units)
+            token_info["percentageOwned"] = spl_token.share_percent(
+                int(token_info.get("amount") or 0), int(supply_info.get("amount") or 0)
+            )
+                
+        except Exception as e:
+            current_app.logger.warning(f"Failed to fetch details for token {mint}: {e}")
+            token_info["error"] = "Failed to fetch token details"
+
+def _build_token_accounts_response(owner_address: str, token_accounts: List[Dict]) -> Dict:
+    # Sort by UI amount in descending order; tokens without one (unknown decimals) go last
+    token_accounts.sort(key=lambda x: (x.get("uiAmount") is not None, x.get("uiAmount") or 0), reverse=True)
     
     return {
         "owner": owner_address,
@@ -269,28 +724,7 @@ def get_token_accounts_by_owner(owner_address: str, include_details: bool = True
 
 
 
-def get_signatures_for_address(address: str, limit: int = 20, before: str = None, until: str = None) -> Dict:
-    """
-    Fetches transaction signatures for an address with detailed analytics.
-    
-    Args:
-        address: The wallet or contract address to query
-        limit: Maximum number of signatures to fetch (default: 20, max: 1000)
-        before: Start searching from this signature (pagination token)
-        until: Search until this signature (optional)
-        
-    Returns:
-        Dictionary containing signatures with analytics data
-    """
-    # Validate address
-    _validate_public_key(address)
-    
-    # Validate limit
-    if limit > 1000:
-        limit = 1000  # API maximum
-    
-    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 30000)  # Higher timeout for transaction history
-    
+def _fetch_signature_page(address: str, limit: int, before: str, until: str, timeout: int, commitment: str = None) -> List[Dict]:
     # Build params for Helius RPC call
     params = [address, {"limit": limit}]
     
@@ -299,10 +733,18 @@ def get_signatures_for_address(address: str, limit: int = 20, before: str = None
         params[1]["before"] = before
     if until:
         params[1]["until"] = until
+    if commitment:
+        params[1]["commitment"] = commitment
     
-    # Make the RPC call
-    result = helius_fetch("getSignaturesForAddress", params, timeout)
+    return helius_fetch("getSignaturesForAddress", params, timeout)
+
+def _summarize_signature_page(result: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict], int, int]:
+    """
+    Builds the signature rows and per-page analytics for one getSignaturesForAddress page.
     
+    Returns:
+        Tuple of (signatures, hourly_activity, program_usage, success_count, total_fees)
+    """
     # Process transaction signatures
     signatures = []
     
@@ -382,6 +824,50 @@ def get_signatures_for_address(address: str, limit: int = 20, before: str = None
                                               key=lambda item: item[1], 
                                               reverse=True)][:10]  # Top 10
     
+    return signatures, hourly_activity, program_usage, success_count, total_fees
+
+def get_signatures_for_address(address: str, limit: int = 20, before: str = None, until: str = None) -> Dict:
+    """
+    Fetches transaction signatures for an address with detailed analytics.
+    
+    Args:
+        address: The wallet or contract address to query
+        limit: Maximum number of signatures to fetch (default: 20, max: 1000)
+        before: Start searching from this signature (pagination token)
+        until: Search until this signature (optional)
+        
+    Returns:
+        Dictionary containing signatures with analytics data
+    """
+    # Validate address
+    _validate_public_key(address)
+    
+    # Validate limit
+    if limit > 1000:
+        limit = 1000  # API maximum
+    
+    # Watched addresses are answered from the ingestion index while it is fresh
+    result = _indexed_signatures(address, limit, before, until)
+    if result is not None:
+        return _build_signatures_response(address, limit, result)
+    
+    timeout = current_app.config.get("HISTORY_TIMEOUT_MS", 30000)  # Higher timeout for transaction history
+    
+    # Make the RPC call
+    result = _fetch_signature_page(address, limit, before, until, timeout)
+    
+    return _build_signatures_response(address, limit, result)
+
+def _build_signatures_response(address: str, limit: int, result: List[Dict]) -> Dict:
+    """
+    Builds the /transactions response body from one getSignaturesForAddress page.
+    """
+    # Process transaction signatures and page analytics (columnar path for large pages)
+    if len(result) >= current_app.config.get("VECTORIZE_MIN_ROWS", 256) and vectorized.available():
+        signatures, hourly_activity, program_usage, success_count, total_fees = vectorized.summarize_signature_page(result)
+    else:
+        signatures, hourly_activity, program_usage, success_count, total_fees = _summarize_signature_page(result)
+    
     # Calculate success rate
     success_rate = (success_count / len(signatures)) * 100 if signatures else 0
     
@@ -399,4 +885,166 @@ def get_signatures_for_address(address: str, limit: int = 20, before: str = None
             "before": signatures[-1].get("signature") if signatures else None,
             "hasMore": len(signatures) >= limit
         }
-    }
\ No newline at end of file
+    }
+
+
+
+def _signature_row(tx: Dict) -> Dict:
+    """
+    Formats a raw getSignaturesForAddress entry the same way /transactions does.
+    """
+    timestamp = tx.get("blockTime")
+    readable_time = None
+    if timestamp:
+        try:
+            readable_time = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        except (OverflowError, OSError, ValueError):
+            pass
+    
+    return {
+        "signature": tx.get("signature"),
+        "blockTime": timestamp,
+        "readableTime": readable_time,
+        "slot": tx.get("slot"),
+        "err": tx.get("err"),
+        "status": "success" if tx.get("confirmationStatus") == "finalized" and not tx.get("err") else "failed",
+        "fee": tx.get("fee"),
+        "memo": tx.get("memo")
+    }
+
+def iter_signature_pages(address: str, before: str = None, until: str = None, page_size: int = 1000,
+                         commitment: str = None) -> Iterator[List[Dict]]:
+    """
+    Walks an address's full signature history page by page, newest first.
+    
+    Follows the `before` cursor automatically and fetches the next page in the
+    background while the caller is still consuming the current one. Only two
+    pages are ever held in memory.
+    
+    Args:
+        address: The wallet or contract address to query
+        before: Start from this signature (exclusive), e.g. to resume an export
+        until: Stop at this signature (exclusive)
+        page_size: Signatures per RPC call (max: 1000)
+        commitment: Optional commitment level for the RPC calls
+        
+    Yields:
+        Lists of raw signature entries as returned by getSignaturesForAddress
+    """
+    _validate_public_key(address)
+    
+    page_size = max(1, min(page_size, 1000))
+    timeout = current_app.config.get("HISTORY_TIMEOUT_MS", 30000)
+    
+    page = _fetch_signature_page(address, page_size, before, until, timeout, commitment)
+    next_page = None
+    try:
+        while page:
+            # Prefetch the next page while the caller handles this one
+            if len(page) >= page_size:
+                next_page = submit(_fetch_signature_page, address, page_size, page[-1].get("signature"), until,
+                                   timeout, commitment)
+            else:
+                next_page = None
+            
+            yield page
+            
+            if next_page is None:
+                return
+            page = next_page.result()
+            next_page = None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+
+def get_address_analytics(address: str) -> Dict:
+    """
+    Returns analytics covering an address's whole transaction history.
+    
+    The accumulated state is persisted per address. Each call only fetches
+    signatures newer than the newest one already counted, then spends any
+    remaining budget backfilling older history until it is complete. When
+    more new signatures arrived than one call's budget covers, they are
+    counted over several calls and merged once they join up. If Helius
+    fails part way, the pages counted so far are saved before the error
+    is raised, so the next call carries on from there.
+    
+    Args:
+        address: The wallet or contract address to query
+        
+    Returns:
+        Dictionary with counters, hourly/daily histograms, top programs and
+        the range of history covered so far
+    """
+    _validate_public_key(address)
+    
+    budget = current_app.config.get("ANALYTICS_MAX_SIGNATURES_PER_UPDATE", 50000)
+    acc = load_accumulator(address) or AnalyticsAccumulator(address)
+    
+    try:
+        # 1. Delta: everything newer than what is already counted
+        if acc.newest_signature is not None:
+            resumed = acc.pending is not None
+            budget = _accumulate_newer(acc, address, budget)
+            if resumed and acc.pending is None and budget > 0:
+                # The gap left by an earlier call is closed; count what arrived since it was opened
+                budget = _accumulate_newer(acc, address, budget)
+        
+        # 2. Backfill: older history not reached yet (the whole history on first sight)
+        if not acc.complete and budget > 0:
+            backfill = AnalyticsAccumulator(address)
+            try:
+                _accumulate_pages(backfill, address, acc.oldest_signature, None, budget)
+            finally:
+                acc.extend_older(backfill)
+    except (HeliusTimeoutError, HeliusServiceError):
+        # Pages are counted whole, so checkpoint what this call got through and resume from there next time
+        save_accumulator(acc)
+        raise
+    
+    save_accumulator(acc)
+    return acc.summary()
+
+def _accumulate_newer(acc: AnalyticsAccumulator, address: str, budget: int) -> int:
+    """
+    Counts signatures newer than `acc.newest_signature`, continuing the delta an earlier call left pending.
+    
+    The delta is merged only once it reaches down to `acc.newest_signature`; until then it is kept
+    in `acc.pending`, so a busy address never ends up with uncounted signatures inside its covered range.
+    Returns the unused budget.
+    """
+    delta = acc.pending or AnalyticsAccumulator(address)
+    try:
+        budget = _accumulate_pages(delta, address, delta.oldest_signature, acc.newest_signature, budget)
+    except (HeliusTimeoutError, HeliusServiceError):
+        if delta.oldest_signature is not None:
+            acc.pending = delta
+        raise
+    if not delta.complete:
+        acc.pending = delta
+        return budget
+    acc.pending = None
+    acc.extend_newer(delta)
+    return budget
+
+def _accumulate_pages(acc: AnalyticsAccumulator, address: str, before: str, until: str, budget: int) -> int:
+    """
+    Feeds finalized signature pages into `acc` until history or `budget` runs out.
+    Returns the unused budget.
+    """
+    pages = iter_signature_pages(address, before=before, until=until, commitment="finalized")
+    try:
+        for page in pages:
+            for tx in page:
+                acc.add(tx)
+            budget -= len(page)
+            if budget <= 0:
+                return 0
+        # Ran out of history before the budget: this range is fully covered
+        acc.complete = True
+        return budget
+    finally:
+        pages.close()
+
@@ -0,0 +1,179 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from operator import mul
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from app.services import spl_token
+from app.services.errors import HeliusServiceError
+from app.services.helius_service import helius_fetch, _validate_public_key
+
+
+class HolderSnapshot:
+    """
+    Balance distribution of every token account of one mint.
+
+    Non-zero balances are kept largest first in an `array('Q')` next to
+    their running totals, so top-N lists, top-k shares and percentile
+    balances are index reads and slices; only the `top_addresses` largest
+    accounts keep their address. Gini and HHI are computed once per snapshot.
+
+    Shares of supply are computed from integer base units, so they stay
+    exact for supplies beyond 2^53. Gini and HHI describe the held balances
+    (accounts, not owners), with HHI on the usual 0-10000 scale.
+    """
+
+    def __init__(self, mint: str, supply: int, decimals: int, program_id: str):
+        self.mint = mint
+        self.supply = supply
+        self.decimals = decimals
+        self.program_id = program_id
+        self.built_at: Optional[float] = None
+
+        self.amounts = array("Q")
+        self.cumulative = array("Q")
+        self.addresses: List[str] = []
+        self.gini = 0.0
+        self.hhi = 0.0
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def build(cls, mint: str, supply: int, decimals: int, program_id: str,
+              addresses: List[str], amounts: array, top_addresses: int = 1000) -> "HolderSnapshot":
+        snapshot = cls(mint, supply, decimals, program_id)
+        order = sorted(range(len(amounts)), key=amounts.__getitem__, reverse=True)
+        snapshot.amounts = array("Q", (amounts[i] for i in order))
+        # A mint's balances sum to at most its (u64) supply, so running totals fit in 'Q'
+        snapshot.cumulative = array("Q", accumulate(snapshot.amounts))
+        snapshot.addresses = [addresses[i] for i in order[:top_addresses]]
+        snapshot._concentration()
+        snapshot.built_at = time.time()
+        return snapshot
+
+    def _concentration(self):
+        n = len(self.amounts)
+        held = self.cumulative[-1] if n else 0
+        if not held:
+            return
+        # Gini over balances sorted largest first: ((n + 1) * S - 2 * sum(rank * x)) / (n * S)
+        weighted = sum(map(mul, range(1, n + 1), self.amounts))
+        self.gini = round(((n + 1) * held - 2 * weighted) / (n * held), 6)
+        self.hhi = round(sum(map(mul, self.amounts, self.amounts)) * 10000 / (held * held), 4)
+
+    def _ui_amount(self, amount: int) -> float:
+        return float(amount) / 10 ** self.decimals
+
+    def top(self, n: int) -> List[Dict]:
+        """The `n` largest accounts, shaped like /token-holders entries (up to `top_addresses`)."""
+        return [
+            {
+                "address": address,
+                "amount": str(amount),
+                "uiAmount": self._ui_amount(amount),
+                "percentage": spl_token.share_percent(amount, self.supply),
+            }
+            for address, amount in zip(self.addresses[:max(n, 0)], self.amounts)
+        ]
+
+    def top_share(self, k: int) -> float:
+        """Percentage of supply held by the `k` largest accounts."""
+        if k <= 0 or not self.amounts:
+            return 0
+        return spl_token.share_percent(self.cumulative[min(k, len(self.amounts)) - 1], self.supply)
+
+    def percentile(self, pct: float) -> Optional[Dict]:
+        """Balance of the account at `pct` percent of the way from the smallest to the largest."""
+        n = len(self.amounts)
+        if not n:
+            return None
+        pct = min(max(pct, 0.0), 100.0)
+        amount = self.amounts[n - 1 - int(round(pct / 100 * (n - 1)))]
+        return {"amount": str(amount), "uiAmount": self._ui_amount(amount)}
+
+    def summary(self) -> Dict:
+        held = self.cumulative[-1] if self.amounts else 0
+        return {
+            "mint": self.mint,
+            "programId": self.program_id,
+            "supply": str(self.supply),
+            "decimals": self.decimals,
+            "holders": len(self.amounts),
+            "heldPercentage": spl_token.share_percent(held, self.supply),
+            "gini": self.gini,
+            "hhi": self.hhi,
+            "snapshotAge": round(time.time() - self.built_at, 1),
+        }
+
+
+# Snapshots per worker, bounded by HOLDER_SNAPSHOT_MAX_MINTS
+_snapshots: "OrderedDict[str, HolderSnapshot]" = OrderedDict()
+_snapshots_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def _remember(snapshot: HolderSnapshot):
+    with _snapshots_lock:
+        _snapshots[snapshot.mint] = snapshot
+        _snapshots.move_to_end(snapshot.mint)
+        while len(_snapshots) > current_app.config.get("HOLDER_SNAPSHOT_MAX_MINTS", 16):
+            _snapshots.popitem(last=False)
+
+
+def _scan_mint(mint: str) -> HolderSnapshot:
+    """
+    Read the mint (supply, decimals, owning program) and then every token account of it.
+    """
+    timeout = current_app.config.get("HOLDER_SNAPSHOT_TIMEOUT_MS", 60000)
+
+    mint_result = helius_fetch(
+        "getMultipleAccounts",
+        [[mint], {"encoding": "base64", "dataSlice": spl_token.MINT_SUPPLY_SLICE}],
+        current_app.config.get("DEFAULT_TIMEOUT_MS", 20000),
+    )
+    supply = spl_token.parse_mint_supplies([mint], [mint_result])[mint]
+    if isinstance(supply, Exception):
+        raise supply
+    program_id = (mint_result.get("value") or [{}])[0].get("owner")
+    if program_id not in (spl_token.TOKEN_PROGRAM_ID, spl_token.TOKEN_2022_PROGRAM_ID):
+        raise HeliusServiceError(f"{mint} is not a token mint (owned by {program_id})")
+
+    result = helius_fetch("getProgramAccounts", spl_token.mint_accounts_params(mint, program_id), timeout)
+    addresses, amounts = spl_token.decode_amounts(result)
+    return HolderSnapshot.build(
+        mint, int(supply["value"]["amount"]), supply["value"]["decimals"], program_id, addresses, amounts,
+        current_app.config.get("HOLDER_SNAPSHOT_TOP_ADDRESSES", 1000),
+    )
+
+
+def get_holder_snapshot(mint: str) -> HolderSnapshot:
+    """
+    Returns the holder snapshot of a mint, scanning it when missing or older than HOLDER_SNAPSHOT_REFRESH_SECONDS.
+
+    One request per mint scans at a time; others asking for the same mint wait for its result.
+    """
+    _validate_public_key(mint)
+    now = time.time()
+    refresh_after = current_app.config.get("HOLDER_SNAPSHOT_REFRESH_SECONDS", 300)
+
+    snapshot = _snapshots.get(mint)
+    if snapshot is not None and now - snapshot.built_at < refresh_after:
+        return snapshot
+
+    with _snapshots_lock:
+        lock = _build_locks.setdefault(mint, threading.Lock())
+
+    with lock:
+        # Another request may have finished the scan while we waited
+        snapshot = _snapshots.get(mint)
+        if snapshot is not None and now - snapshot.built_at < refresh_after:
+            return snapshot
+
+        snapshot = _scan_mint(mint)
+        _remember(snapshot)
+        return snapshot
@@ -0,0 +1,347 @@
+import json
+import os
+import socket
+import threading
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from urllib.parse import urlsplit
+
+from flask import current_app
+
+
+# Uniform response shape so callers don't care which HTTP library is in use
+TransportResponse = namedtuple("TransportResponse", ["status_code", "reason", "headers", "content"])
+
+
+class TransportTimeout(Exception):
+    pass
+
+class TransportError(Exception):
+    pass
+
+
+class _ConnectionTracker:
+    """
+    Connections one HTTP client has opened, per host.
+
+    Filled by hooks this module installs in the client (a urllib3 connection
+    class, an httpx trace callback) instead of being read from the client's
+    pool internals. Connections are held weakly: one the client has closed,
+    or dropped from its pool, no longer counts as open.
+    """
+
+    def __init__(self, is_open):
+        self._is_open = is_open
+        self._lock = threading.Lock()
+        self._live: Dict[str, weakref.WeakSet] = {}
+        self._created: Dict[str, int] = {}
+
+    def opened(self, host: str, connection):
+        with self._lock:
+            self._live.setdefault(host, weakref.WeakSet()).add(connection)
+            self._created[host] = self._created.get(host, 0) + 1
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{host: {"open": connections still connected, "created": connections ever opened}}"""
+        with self._lock:
+            live = {host: list(connections) for host, connections in self._live.items()}
+            created = dict(self._created)
+        return {
+            host: {"open": sum(1 for connection in live[host] if self._is_open(connection)), "created": count}
+            for host, count in created.items()
+        }
+
+
+def _stream_open(stream) -> bool:
+    sock = stream.get_extra_info("socket")
+    return sock is not None and sock.fileno() != -1
+
+
+class HeliusTransport:
+    """
+    Pooled, keep-alive HTTP client shared by every RPC call in a worker process.
+
+    The underlying client is created lazily on first use and re-created after a
+    fork, so gunicorn workers (with or without --preload) each own their pool.
+    With `http2=True` and `httpx[http2]` installed the client multiplexes
+    requests over HTTP/2; otherwise a `requests.Session` with a sized
+    urllib3 pool is used.
+    """
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 32, pool_block: bool = False,
+                 keepalive: bool = True, keepalive_expiry: float = 60.0, http2: bool = False, logger=None):
+        self.pool_connections = pool_connections  # number of per-host pools kept
+        self.pool_maxsize = pool_maxsize          # connections kept per host
+        self.pool_block = pool_block              # hard per-host connection limit
+        self.keepalive = keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.logger = logger
+
+        self.backend = None
+        self._client = None
+        self._adapter = None
+        self._connections = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._requests = 0
+        self._last_used = 0.0
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "HeliusTransport":
+        return cls(
+            pool_connections=config.get("HELIUS_POOL_CONNECTIONS", 4),
+            pool_maxsize=config.get("HELIUS_POOL_MAXSIZE", 32),
+            pool_block=config.get("HELIUS_POOL_BLOCK", False),
+            keepalive=config.get("HELIUS_KEEPALIVE", True),
+            keepalive_expiry=config.get("HELIUS_KEEPALIVE_EXPIRY", 60.0),
+            http2=config.get("HELIUS_HTTP2", False),
+            logger=logger,
+        )
+
+    def _ensure_client(self):
+        pid = os.getpid()
+        if self._client is not None and self._pid == pid:
+            return self._client
+
+        with self._lock:
+            if self._client is None or self._pid != pid:
+                # A client inherited across fork shares sockets with the parent; never reuse it
+                self._client = self._build_client()
+                self._pid = pid
+                self._in_flight = {}
+        return self._client
+
+    def _build_client(self):
+        if self.http2:
+            try:
+                import httpx
+                tracker = _ConnectionTracker(_stream_open)
+
+                def trace_connections(request):
+                    host = _host_key(str(request.url))
+
+                    def trace(event, info):
+                        if event == "connection.connect_tcp.complete":
+                            tracker.opened(host, info["return_value"])
+
+                    request.extensions["trace"] = trace
+
+                client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_maxsize * self.pool_connections if self.pool_block else None,
+                        max_keepalive_connections=self.pool_maxsize if self.keepalive else 0,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ),
+                    event_hooks={"request": [trace_connections]},
+                )
+                self._connections = tracker
+                self.backend = "httpx"
+                return client
+            except ImportError:
+                if self.logger:
+                    self.logger.warning("HELIUS_HTTP2 is enabled but httpx[http2] is not installed; using HTTP/1.1")
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        tracker = _ConnectionTracker(lambda connection: connection.is_connected)
+
+        def counted(connection_cls):
+            class _CountedConnection(connection_cls):
+                def connect(self):
+                    super().connect()
+                    tracker.opened(f"{self.host}:{self.port}", self)
+            return _CountedConnection
+
+        class _HTTPPool(HTTPConnectionPool):
+            ConnectionCls = counted(HTTPConnection)
+
+        class _HTTPSPool(HTTPSConnectionPool):
+            ConnectionCls = counted(HTTPSConnection)
+
+        class _KeepAliveAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                kwargs["socket_options"] = [
+                    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+                ]
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+        session = requests.Session()
+        adapter = _KeepAliveAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._adapter = adapter
+        self._connections = tracker
+        self.backend = "requests"
+        return session
+
+    def _expire_idle(self, now: float):
+        """Drop idle pooled connections the server has most likely closed already."""
+        if self.backend != "requests" or not self._last_used:
+            return
+        if now - self._last_used < self.keepalive_expiry or any(self._in_flight.values()):
+            return
+        self._adapter.close()  # closes pooled connections; the adapter opens new ones on demand
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str], timeout: float) -> TransportResponse:
+        """POST `body` to `url` over a pooled connection."""
+        client = self._ensure_client()
+        host = _host_key(url)
+        if not self.keepalive:
+            headers = dict(headers, Connection="close")
+
+        with self._lock:
+            now = time.monotonic()
+            self._expire_idle(now)
+            self._last_used = now
+            self._requests += 1
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+
+        try:
+            if self.backend == "httpx":
+                import httpx
+                try:
+                    resp = client.post(url, content=body, headers=headers, timeout=timeout)
+                except httpx.TimeoutException as e:
+                    raise TransportTimeout(str(e))
+                except httpx.HTTPError as e:
+                    raise TransportError(str(e))
+                return TransportResponse(resp.status_code, resp.reason_phrase, resp.headers, resp.content)
+
+            import requests
+            try:
+                resp = client.post(url, data=body, headers=headers, timeout=timeout)
+            except requests.Timeout as e:
+                raise TransportTimeout(str(e))
+            except requests.RequestException as e:
+                raise TransportError(str(e))
+            return TransportResponse(resp.status_code, resp.reason, resp.headers, resp.content)
+        finally:
+            with self._lock:
+                self._in_flight[host] -= 1
+
+    def warm(self, urls, connections: int = 1, timeout: float = 5.0) -> int:
+        """
+        Open pooled connections to each of `urls` by sending it `connections` concurrent `getHealth` calls.
+
+        The calls go through `post` like any RPC, so the client itself opens
+        (TCP and TLS handshakes) and pools the connections the next requests reuse.
+
+        Returns:
+            Number of warm-up calls that got an HTTP response (over HTTP/2 they share one connection per host)
+        """
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "getHealth", "params": []}).encode()
+        headers = {"Content-Type": "application/json"}
+
+        def call(url: str) -> bool:
+            try:
+                self.post(url, body, headers, timeout)
+                return True
+            except (TransportTimeout, TransportError) as e:
+                if self.logger:
+                    self.logger.warning(f"Warming connections to {_host_key(url)} failed: {e}")
+                return False
+
+        calls = [url for url in urls for _ in range(min(connections, self.pool_maxsize))]
+        if not calls:
+            return 0
+        with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="helius-warmup") as pool:
+            return sum(pool.map(call, calls))
+
+    def stats(self) -> Dict:
+        """
+        Snapshot of pool usage for sizing.
+
+        Connection counts come from hooks this transport installs in its HTTP
+        client, request counts from its own bookkeeping. With HTTP/2 several
+        requests share a connection, so `inUse` can exceed `open`.
+
+        Returns:
+            Dictionary with open, idle and in-use connection counts, overall and per host
+        """
+        current = self._client is not None and self._pid == os.getpid()
+        connections = self._connections.counts() if current else {}
+        with self._lock:
+            in_flight = dict(self._in_flight) if current else {}
+            total_requests = self._requests
+
+        hosts = {}
+        for host in set(connections) | set(in_flight):
+            opened = connections.get(host, {"open": 0, "created": 0})
+            in_use = in_flight.get(host, 0)
+            hosts[host] = {
+                "open": opened["open"],
+                "idle": max(0, opened["open"] - in_use),
+                "inUse": in_use,
+                "created": opened["created"],
+            }
+
+        return {
+            "backend": self.backend,
+            "http2": self.backend == "httpx",
+            "poolConnections": self.pool_connections,
+            "poolMaxsize": self.pool_maxsize,
+            "poolBlock": self.pool_block,
+            "keepalive": self.keepalive,
+            "requests": total_requests,
+            "open": sum(e["open"] for e in hosts.values()),
+            "idle": sum(e["idle"] for e in hosts.values()),
+            "inUse": sum(e["inUse"] for e in hosts.values()),
+            "hosts": hosts,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+
+
+def warm_on_first_request(app, connections: int):
+    """
+    Warm `connections` connections to every RPC endpoint in a background thread on a worker's first request.
+
+    Not at import or in create_app: a cold start (serverless scale-up, a fresh
+    gunicorn worker) then pays for no handshakes before it can answer, and the
+    thread runs alongside the first request instead of delaying it.
+    """
+    warmed_pids = set()
+
+    def warm():
+        if os.getpid() in warmed_pids:
+            return
+        warmed_pids.add(os.getpid())
+        transport = app.extensions["helius_transport"]
+        urls = [endpoint.url for endpoint in app.extensions["helius_rpc_router"].endpoints]
+        threading.Thread(target=transport.warm, args=(urls, connections), name="helius-warmup", daemon=True).start()
+
+    app.before_request(warm)
+
+
+def get_transport() -> HeliusTransport:
+    """Return the transport registered on the current app by `create_app`."""
+    transport = current_app.extensions.get("helius_transport")
+    if transport is None:
+        # Apps built without create_app (e.g. ad-hoc scripts) still get pooling
+        transport = HeliusTransport.from_config(current_app.config, logger=current_app.logger)
+        current_app.extensions["helius_transport"] = transport
+    return transport
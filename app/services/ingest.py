@@ -0,0 +1,182 @@
+"""
+Background ingestion of a fixed watch list into the local IngestStore.
+
+One process per host (whichever holds INGEST_LOCK_PATH) polls every
+INGEST_POLL_SECONDS: the first signature page of every watched address goes
+out as one batched request using `until` the newest signature already
+stored, so a quiet address costs one call and no new rows. A new address is
+backfilled with up to INGEST_BACKFILL_SIGNATURES signatures. Token balances
+of every watched address are re-read each round; only balances that changed
+are appended. Every other worker only reads the store.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; without it every process polls
+    fcntl = None
+
+from flask import Flask
+
+from app.services.ingest_store import IngestStore
+from app.services.helius_service import (
+    helius_fetch_batch,
+    _fetch_signature_page,
+    _fetch_token_accounts_by_owner,
+)
+
+
+def parse_watch_list(value: str) -> List[str]:
+    """Parse "address,address" (whitespace allowed) into a de-duplicated list."""
+    return list(dict.fromkeys(address.strip() for address in (value or "").split(",") if address.strip()))
+
+
+class IngestWorker:
+    """Daemon thread polling the watch list into an IngestStore (see module docstring)."""
+
+    def __init__(self, app: Flask, store: IngestStore, addresses: List[str], interval: float = 10,
+                 backfill: int = 1000, lock_path: str = None):
+        self.app = app
+        self.store = store
+        self.addresses = addresses
+        self.interval = interval
+        self.backfill = backfill
+        self.lock_path = lock_path
+
+        self._lock_file = None
+        self._lock_pid = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.rounds = 0
+        self.errors = 0
+        self.signatures = 0
+        self.balance_changes = 0
+        self.last_round_ms: Optional[float] = None
+        self.last_round_at: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, app: Flask, store: IngestStore) -> "IngestWorker":
+        config = app.config
+        return cls(
+            app,
+            store,
+            parse_watch_list(config.get("INGEST_WATCH_ADDRESSES", "")),
+            interval=config.get("INGEST_POLL_SECONDS", 10),
+            backfill=config.get("INGEST_BACKFILL_SIGNATURES", 1000),
+            lock_path=config.get("INGEST_LOCK_PATH") or store.path + ".lock",
+        )
+
+    @property
+    def leader(self) -> bool:
+        # A forked child inherits the parent's lock file but not its polling thread
+        return fcntl is None or (self._lock_file is not None and self._lock_pid == os.getpid())
+
+    def start(self):
+        """Start polling (again, e.g. in a forked worker whose parent started it)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _try_lead(self) -> bool:
+        """Take the host-wide ingestion lock without blocking; the holder keeps it until it exits."""
+        if self.leader:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._lock_pid = os.getpid()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._try_lead():
+                with self.app.app_context():
+                    try:
+                        self.poll_once()
+                    except Exception:
+                        self.errors += 1
+                        self.app.logger.exception("Ingestion round failed")
+            self._stop.wait(self.interval)
+
+    def poll_once(self):
+        """One ingestion round over the whole watch list."""
+        start = time.perf_counter()
+        self._poll_signatures()
+        for address in self.addresses:
+            try:
+                body = _fetch_token_accounts_by_owner(address, include_details=True)
+                self.balance_changes += self.store.record_token_accounts(address, body)
+            except Exception as e:
+                self.errors += 1
+                self.app.logger.warning(f"Ingesting token accounts of {address} failed: {e}")
+        self.rounds += 1
+        self.last_round_at = time.time()
+        self.last_round_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _poll_signatures(self):
+        timeout = self.app.config.get("HISTORY_TIMEOUT_MS", 30000)
+        cursors = {address: self.store.cursor(address) for address in self.addresses}
+
+        # First page of every address in one batched request
+        calls: List[Tuple[str, list]] = []
+        for address in self.addresses:
+            cursor = cursors[address]
+            if cursor and cursor["newest"]:
+                calls.append(("getSignaturesForAddress", [address, {"limit": 1000, "until": cursor["newest"]}]))
+            else:
+                calls.append(("getSignaturesForAddress", [address, {"limit": min(self.backfill, 1000)}]))
+        first_pages = helius_fetch_batch(calls, timeout)
+
+        for address, (_, params), page in zip(self.addresses, calls, first_pages):
+            if isinstance(page, Exception):
+                self.errors += 1
+                self.app.logger.warning(f"Ingesting signatures of {address} failed: {page}")
+                continue
+            try:
+                self._ingest_address(address, params[1], page, timeout)
+            except Exception as e:
+                self.errors += 1
+                self.app.logger.warning(f"Ingesting signatures of {address} failed: {e}")
+
+    def _ingest_address(self, address: str, options: Dict, page: List[Dict], timeout: int):
+        until = options.get("until")
+        # New signatures since the cursor have no cap; a backfill stops at INGEST_BACKFILL_SIGNATURES
+        cap = None if until else self.backfill
+        entries = list(page)
+        reached_end = len(page) < options["limit"]
+        while not reached_end and (cap is None or len(entries) < cap):
+            limit = 1000 if cap is None else min(1000, cap - len(entries))
+            page = _fetch_signature_page(address, limit, entries[-1]["signature"], until, timeout)
+            entries.extend(page)
+            reached_end = len(page) < limit
+
+        # Reaching the end of a backfill means the whole history is stored
+        complete = True if (not until and reached_end) else None
+        self.signatures += self.store.append_signatures(address, entries, complete=complete)
+
+    def stats(self) -> Dict:
+        return {
+            "watched": len(self.addresses),
+            "leader": self.leader,
+            "intervalSeconds": self.interval,
+            "rounds": self.rounds,
+            "errors": self.errors,
+            "signatures": self.signatures,
+            "balanceChanges": self.balance_changes,
+            "lastRoundMs": self.last_round_ms,
+            "lastRoundAge": round(time.time() - self.last_round_at, 1) if self.last_round_at else None,
+        }
+
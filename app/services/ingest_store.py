@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.services.cache_backends import serialize, deserialize
+
+
+class IngestStore:
+    """
+    Append-only SQLite index of watched addresses, shared by every worker on the host.
+
+    `signatures` keeps each raw getSignaturesForAddress entry once, appended
+    oldest first and read newest first through the (address, slot, id)
+    index, so a page is one index range scan. `balance_changes` logs every
+    token account balance seen to change. Only the per-address cursor
+    (`addresses`) and the latest /wallet/tokens body (`token_bodies`) are
+    updated in place.
+
+    Reads return None, and the caller asks Helius instead, when the address
+    is not watched, its last poll is older than `max_age`, or the page would
+    reach past the history ingested so far.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._connect()  # create the schema eagerly so config errors surface at startup
+
+    @classmethod
+    def from_config(cls, config) -> "IngestStore":
+        return cls(config.get("INGEST_SQLITE_PATH", "/tmp/perceptchain-ingest.sqlite3"))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " id INTEGER PRIMARY KEY, address TEXT NOT NULL, slot INTEGER NOT NULL, signature TEXT NOT NULL,"
+            " entry BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS signatures_address_slot ON signatures (address, slot, id)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS signatures_address_signature ON signatures (address, signature)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS balance_changes ("
+            " id INTEGER PRIMARY KEY, address TEXT NOT NULL, observed_at REAL NOT NULL, account TEXT NOT NULL,"
+            " mint TEXT, amount TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS balance_changes_address ON balance_changes (address, id)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS addresses ("
+            " address TEXT PRIMARY KEY, newest TEXT, complete INTEGER NOT NULL DEFAULT 0, polled_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_bodies (address TEXT PRIMARY KEY, body BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # Writes (ingestion worker)
+
+    def cursor(self, address: str) -> Optional[Dict]:
+        """The newest ingested signature of an address and whether its whole history is ingested."""
+        row = self._connect().execute(
+            "SELECT newest, complete, polled_at FROM addresses WHERE address = ?", (address,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"newest": row[0], "complete": bool(row[1]), "polledAt": row[2]}
+
+    def append_signatures(self, address: str, entries: List[Dict], complete: bool = None, polled_at: float = None) -> int:
+        """
+        Append signatures newer than the address's cursor (`entries` newest first, as Helius returns them).
+
+        `complete` marks that the history now reaches back to the address's first transaction.
+
+        Returns:
+            Number of signatures appended (ones already stored are skipped)
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            appended = conn.executemany(
+                "INSERT OR IGNORE INTO signatures (address, slot, signature, entry) VALUES (?, ?, ?, ?)",
+                [(address, entry.get("slot") or 0, entry["signature"], serialize(entry)) for entry in reversed(entries)],
+            ).rowcount
+            conn.execute("INSERT OR IGNORE INTO addresses (address) VALUES (?)", (address,))
+            if entries:
+                conn.execute("UPDATE addresses SET newest = ? WHERE address = ?", (entries[0]["signature"], address))
+            if complete is not None:
+                conn.execute("UPDATE addresses SET complete = ? WHERE address = ?", (int(complete), address))
+            conn.execute("UPDATE addresses SET polled_at = ? WHERE address = ?", (polled_at or time.time(), address))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return appended
+
+    def record_token_accounts(self, address: str, body: Dict, observed_at: float = None) -> int:
+        """
+        Store a wallet's latest /wallet/tokens body and log the balances that changed since the last one.
+
+        Returns:
+            Number of balance changes appended (accounts that disappeared are logged with amount "0")
+        """
+        observed_at = observed_at or time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT body FROM token_bodies WHERE address = ?", (address,)).fetchone()
+        before = {token["address"]: token.get("amount") for token in deserialize(row[0])["tokens"]} if row else {}
+        after = {token["address"]: token for token in body["tokens"]}
+
+        changes = [
+            (address, observed_at, account, token.get("mint"), token.get("amount") or "0")
+            for account, token in after.items() if before.get(account) != token.get("amount")
+        ]
+        changes += [(address, observed_at, account, None, "0") for account in before if account not in after]
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO balance_changes (address, observed_at, account, mint, amount) VALUES (?, ?, ?, ?, ?)",
+                changes,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO token_bodies (address, body, updated_at) VALUES (?, ?, ?)",
+                (address, serialize(body), observed_at),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(changes)
+
+    # Reads (API workers)
+
+    def _position(self, conn: sqlite3.Connection, address: str, signature: str):
+        return conn.execute(
+            "SELECT slot, id FROM signatures WHERE address = ? AND signature = ?", (address, signature)
+        ).fetchone()
+
+    def signatures(self, address: str, limit: int, before: str = None, until: str = None,
+                   max_age: float = 60) -> Optional[List[Dict]]:
+        """
+        Raw getSignaturesForAddress page (newest first) from the index, or None if it must come from Helius.
+        """
+        conn = self._connect()
+        cursor = conn.execute("SELECT complete, polled_at FROM addresses WHERE address = ?", (address,)).fetchone()
+        if cursor is None or cursor[1] is None or time.time() - cursor[1] > max_age:
+            self.misses += 1
+            return None
+        complete = bool(cursor[0])
+
+        query = "SELECT entry FROM signatures WHERE address = ?"
+        args = [address]
+        for signature, op in ((before, "<"), (until, ">")):
+            if not signature:
+                continue
+            position = self._position(conn, address, signature)
+            if position is None:
+                # Outside the ingested history (or unknown)
+                self.misses += 1
+                return None
+            query += f" AND (slot {op} ? OR (slot = ? AND id {op} ?))"
+            args += [position[0], position[0], position[1]]
+        query += " ORDER BY slot DESC, id DESC LIMIT ?"
+        args.append(limit)
+
+        rows = conn.execute(query, args).fetchall()
+        if len(rows) < limit and not complete and not until:
+            # The page would continue into history that has not been ingested
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [deserialize(row[0]) for row in rows]
+
+    def token_accounts(self, address: str, max_age: float = 60) -> Optional[Dict]:
+        """The latest /wallet/tokens body of a watched wallet, or None if it must come from Helius."""
+        row = self._connect().execute(
+            "SELECT body, updated_at FROM token_bodies WHERE address = ?", (address,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return deserialize(row[0])
+
+    def balance_changes(self, address: str, limit: int = 100) -> List[Dict]:
+        """Most recent balance changes of a watched wallet, newest first."""
+        rows = self._connect().execute(
+            "SELECT observed_at, account, mint, amount FROM balance_changes WHERE address = ? ORDER BY id DESC LIMIT ?",
+            (address, limit),
+        ).fetchall()
+        return [{"observedAt": row[0], "account": row[1], "mint": row[2], "amount": row[3]} for row in rows]
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "addresses": conn.execute("SELECT COUNT(*) FROM addresses").fetchone()[0],
+            "signatures": conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0],
+            "balanceChanges": conn.execute("SELECT COUNT(*) FROM balance_changes").fetchone()[0],
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups * 100, 2) if lookups else 0,
+        }
@@ -0,0 +1,334 @@
+"""
+In-process metrics with a Prometheus text endpoint, and sampled Server-Timing breakdowns.
+
+Recorded on the hot path (a clock read, a bisect and a short locked update
+each): per-route request latency, and per-RPC-method upstream latency,
+response size, call counts and error classes. Cache, pool, limiter, router
+and other component state is not recorded at all; it is read from each
+component's `stats()` when `/metrics` is scraped. Everything is per worker
+process, like the `/stats/*` endpoints.
+
+For a sampled share of requests a `RequestTimings` object collects upstream
+time per RPC method and time spent queueing for rate-limit credits, and the
+response carries them in a `Server-Timing` header. Unsampled requests pay
+one context-variable read per upstream call.
+"""
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app, g, request
+
+from app.services.errors import HeliusTimeoutError
+
+# Seconds; from a cache hit to a whole-collection walk
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 120)
+# Bytes; from a single supply lookup to a large wallet or collection page
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labelvalues: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            lines.append(f"{self.name}{_format_labels(tuple(zip(self.labelnames, labelvalues)))} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: [count per bucket (last one is +Inf)..., sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labelvalues: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labelvalues, list(series)) for labelvalues, series in self._series.items()]
+        for labelvalues, series in snapshot:
+            labels = tuple(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class RequestTimings:
+    """Where one sampled request spent its time, for the `Server-Timing` header."""
+    __slots__ = ("upstream", "ratelimit_wait", "_lock")
+
+    def __init__(self):
+        self.upstream: Dict[str, List[float]] = {}
+        self.ratelimit_wait = 0.0
+        # Upstream calls of one request may run on several pool threads
+        self._lock = threading.Lock()
+
+    def add_upstream(self, method: str, seconds: float):
+        with self._lock:
+            entry = self.upstream.setdefault(method, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_wait(self, seconds: float):
+        with self._lock:
+            self.ratelimit_wait += seconds
+
+    def header(self, total: float) -> str:
+        """Server-Timing value; upstream durations are summed, so overlapping calls can exceed `total`."""
+        with self._lock:
+            parts = [f"total;dur={total * 1000:.1f}"]
+            if self.upstream:
+                seconds = sum(entry[0] for entry in self.upstream.values())
+                calls = sum(entry[1] for entry in self.upstream.values())
+                parts.append(f'upstream;dur={seconds * 1000:.1f};desc="{calls} calls"')
+                for method, (seconds, calls) in sorted(self.upstream.items()):
+                    parts.append(f'rpc-{method};dur={seconds * 1000:.1f};desc="{calls} calls"')
+            if self.ratelimit_wait:
+                parts.append(f"ratelimit;dur={self.ratelimit_wait * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """The current request's timings if it was sampled for Server-Timing, else None."""
+    return _timings.get()
+
+
+def begin_request(sample_rate: float) -> Optional[RequestTimings]:
+    """Decide whether this request is sampled for Server-Timing and make its timings current."""
+    timings = RequestTimings() if sample_rate > 0 and random.random() < sample_rate else None
+    _timings.set(timings)
+    return timings
+
+
+def record_wait(seconds: float):
+    """Time the current request spent queueing for rate-limit credits (sampled requests only)."""
+    timings = _timings.get()
+    if timings is not None and seconds > 0:
+        timings.add_wait(seconds)
+
+
+def rpc_label(payload) -> str:
+    """Metric label for a JSON-RPC payload: the method, or "batch" for a batch array."""
+    return payload.get("method", "unknown") if isinstance(payload, dict) else "batch"
+
+
+# /stats key -> label name for keyed sub-stats
+_SUB_STAT_LABELS = {"hosts": "host", "byMethod": "method", "methods": "method", "creditsByMethod": "method",
+                    "costs": "method", "ttls": "method", "endpoints": "endpoint"}
+
+# (metric prefix, app.extensions key) of components whose stats() are exported as gauges
+_STAT_SOURCES = (
+    ("transport", "helius_transport"),
+    ("async_transport", "helius_async_transport"),
+    ("cache", "helius_cache"),
+    ("routecache", "route_cache"),
+    ("ratelimit", "helius_rate_limiter"),
+    ("singleflight", "helius_singleflight"),
+    ("router", "helius_rpc_router"),
+    ("hedging", "helius_hedging"),
+    ("mints", "mint_table"),
+    ("ingest", "ingest_worker"),
+    ("ingest_store", "ingest_store"),
+)
+
+
+def _snake(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _stat_samples(name: str, stats: Dict, labels: tuple = ()) -> Iterator[Tuple[str, tuple, float]]:
+    """Flatten a `stats()` dict into (metric name, labels, value) gauge samples."""
+    for key, value in stats.items():
+        metric = f"{name}_{_snake(key)}"
+        if isinstance(value, bool):
+            yield metric, labels, int(value)
+        elif isinstance(value, (int, float)):
+            yield metric, labels, value
+        elif isinstance(value, str):
+            # Enumerations (state, backend) as an info-style sample
+            yield metric, labels + ((_snake(key), value),), 1
+        elif isinstance(value, dict):
+            label = _SUB_STAT_LABELS.get(key, "key")
+            for sub_key, sub in value.items():
+                if isinstance(sub, dict):
+                    yield from _stat_samples(metric, sub, labels + ((label, sub_key),))
+                elif isinstance(sub, (int, float)) and not isinstance(sub, bool):
+                    yield metric, labels + ((label, sub_key),), sub
+        elif isinstance(value, list):
+            label = _SUB_STAT_LABELS.get(key, "key")
+            for item in value:
+                if isinstance(item, dict):
+                    item = dict(item)
+                    name_value = item.pop("url", None) or item.pop("name", "")
+                    yield from _stat_samples(metric, item, labels + ((label, name_value),))
+
+
+class Metrics:
+    """The metrics of one app: request and upstream series plus component gauges collected at scrape time."""
+
+    def __init__(self, prefix: str = "perceptchain"):
+        self.prefix = prefix
+        self.request_duration = Histogram(
+            f"{prefix}_http_request_duration_seconds",
+            "API request latency until the response headers, by route template",
+            ("method", "route", "status"), LATENCY_BUCKETS,
+        )
+        self.upstream_duration = Histogram(
+            f"{prefix}_helius_request_duration_seconds",
+            "Latency of each upstream JSON-RPC POST (batches are labelled method=\"batch\")",
+            ("method",), LATENCY_BUCKETS,
+        )
+        self.upstream_size = Histogram(
+            f"{prefix}_helius_response_bytes",
+            "Size of upstream JSON-RPC response bodies",
+            ("method",), SIZE_BUCKETS,
+        )
+        self.upstream_calls = Counter(
+            f"{prefix}_helius_calls_total",
+            "JSON-RPC calls sent upstream, counting each call of a batch",
+            ("method",),
+        )
+        self.upstream_errors = Counter(
+            f"{prefix}_helius_errors_total",
+            "Failed upstream calls by class: timeout, transport, http_4xx, http_429, http_5xx, rpc",
+            ("method", "error"),
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self.request_duration.observe((method, route, str(status)), seconds)
+
+    def observe_upstream(self, payload, seconds: float, size: int, error: str = None):
+        """Record one upstream POST attempt; `error` is its error class, if it failed."""
+        label = rpc_label(payload)
+        self.upstream_duration.observe((label,), seconds)
+        if size:
+            self.upstream_size.observe((label,), size)
+        if isinstance(payload, dict):
+            self.upstream_calls.inc((label,))
+        else:
+            for call in payload:
+                self.upstream_calls.inc((call.get("method", "unknown"),))
+        if error is not None:
+            self.upstream_errors.inc((label, error))
+
+        timings = _timings.get()
+        if timings is not None:
+            timings.add_upstream(label, seconds)
+
+    def count_rpc_error(self, method: str):
+        """A JSON-RPC error object in an otherwise successful response."""
+        self.upstream_errors.inc((method, "rpc"))
+
+    def render(self, extensions: Dict) -> str:
+        """The Prometheus text exposition (format 0.0.4) of every series and component gauge."""
+        lines = []
+        for metric in (self.request_duration, self.upstream_duration, self.upstream_size,
+                       self.upstream_calls, self.upstream_errors):
+            lines.extend(metric.render())
+
+        gauges: Dict[str, List[str]] = {}
+        for component, key in _STAT_SOURCES:
+            source = extensions.get(key)
+            if source is None or not hasattr(source, "stats"):
+                continue
+            try:
+                stats = source.stats()
+            except Exception:
+                continue
+            for name, labels, value in _stat_samples(f"{self.prefix}_{component}", stats):
+                gauges.setdefault(name, []).append(f"{name}{_format_labels(labels)} {value}")
+        for name, samples in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Return the metrics registered on the current app, or None if they are disabled."""
+    return current_app.extensions.get("metrics")
+
+
+def upstream_error_class(error: Exception = None, status_code: int = None) -> Optional[str]:
+    """Error class label for a failed upstream attempt (None if it succeeded)."""
+    if error is not None:
+        return "timeout" if isinstance(error, HeliusTimeoutError) else "transport"
+    if status_code is None or status_code < 400:
+        return None
+    if status_code == 429:
+        return "http_429"
+    return "http_5xx" if status_code >= 500 else "http_4xx"
+
+
+def init_app(app):
+    """Time every Flask request and add Server-Timing to sampled ones."""
+    metrics = app.extensions["metrics"]
+    sample_rate = app.config.get("METRICS_SERVER_TIMING_SAMPLE_RATE", 0.0)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        begin_request(sample_rate)
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.observe_request(request.method, route, response.status_code, elapsed)
+
+        timings = _timings.get()
+        if timings is not None:
+            response.headers["Server-Timing"] = timings.header(elapsed)
+        return response
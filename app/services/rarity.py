@@ -0,0 +1,377 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from app.services.cache_backends import MISSING
+from app.services.helius_service import (
+    iter_collection_pages,
+    _fetch_assets_page,
+    _process_asset,
+)
+
+
+class RarityIndex:
+    """
+    Compact, array-backed trait-rarity index for one collection.
+
+    Trait types, values and owners are interned to integer ids; each asset's
+    traits are stored in CSR form (`trait_offsets` / `trait_refs`). Scores,
+    ranks and the rarest-first ordering are precomputed, so "rarity of asset X"
+    is a dict lookup plus array reads and "top-N rarest" is a slice.
+
+    The score is the usual statistical rarity score: the sum over an asset's
+    traits of (collection size / assets sharing that trait).
+    """
+
+    VERSION = 1
+
+    def __init__(self, collection: str):
+        self.collection = collection
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+
+        # Interned strings (trait types, trait values and owners share one table)
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+        # Trait id -> (type string id, value string id) and its asset count
+        self.trait_keys = array("I")
+        self._trait_ids: Dict[Tuple[int, int], int] = {}
+        self.trait_counts = array("I")
+
+        # Per-asset columns
+        self.asset_ids: List[str] = []
+        self._asset_pos: Dict[str, int] = {}
+        self.owner_ids = array("I")
+        self.trait_offsets = array("I", [0])
+        self.trait_refs = array("I")
+
+        # Derived
+        self.scores = array("d")
+        self.ranks = array("I")
+        self.order = array("I")
+        self.owner_counts: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.asset_ids)
+
+    # -- building -----------------------------------------------------------------
+
+    def _intern(self, text) -> int:
+        text = "" if text is None else str(text)
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def _trait_id(self, trait_type, value) -> int:
+        key = (self._intern(trait_type), self._intern(value))
+        trait_id = self._trait_ids.get(key)
+        if trait_id is None:
+            trait_id = self._trait_ids[key] = len(self.trait_counts)
+            self.trait_keys.extend(key)
+            self.trait_counts.append(0)
+        return trait_id
+
+    def _encode(self, asset: Dict) -> Tuple[int, Tuple[int, ...]]:
+        traits = tuple(sorted({
+            self._trait_id(attr.get("trait_type"), attr.get("value"))
+            for attr in asset.get("attributes") or [] if isinstance(attr, dict)
+        }))
+        return self._intern(asset.get("owner")), traits
+
+    def _rows(self) -> Dict[str, Tuple[int, Tuple[int, ...]]]:
+        return {
+            asset_id: (self.owner_ids[i], tuple(self.trait_refs[self.trait_offsets[i]:self.trait_offsets[i + 1]]))
+            for i, asset_id in enumerate(self.asset_ids)
+        }
+
+    def _load_rows(self, rows: Dict[str, Tuple[int, Tuple[int, ...]]]):
+        self.asset_ids = list(rows)
+        self._asset_pos = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+        self.owner_ids = array("I", (owner for owner, _ in rows.values()))
+        self.trait_offsets = array("I", [0])
+        self.trait_refs = array("I")
+        self.trait_counts = array("I", bytes(4 * len(self.trait_counts)))
+        self.owner_counts = {}
+
+        for owner, traits in rows.values():
+            self.trait_refs.extend(traits)
+            self.trait_offsets.append(len(self.trait_refs))
+            for trait_id in traits:
+                self.trait_counts[trait_id] += 1
+            self.owner_counts[owner] = self.owner_counts.get(owner, 0) + 1
+
+        self._score()
+
+    def _score(self):
+        size = len(self.asset_ids)
+        weights = [size / count if count else 0.0 for count in self.trait_counts]
+        refs, offsets = self.trait_refs, self.trait_offsets
+        self.scores = array("d", (
+            sum(weights[refs[j]] for j in range(offsets[i], offsets[i + 1]))
+            for i in range(size)
+        ))
+        self.order = array("I", sorted(range(size), key=self.scores.__getitem__, reverse=True))
+        self.ranks = array("I", bytes(4 * size))
+        for rank, i in enumerate(self.order, start=1):
+            self.ranks[i] = rank
+
+    @classmethod
+    def build(cls, collection: str, assets: Iterable[Dict]) -> "RarityIndex":
+        """Build an index from processed assets (as produced by `_process_asset`)."""
+        index = cls(collection)
+        rows = {}
+        for asset in assets:
+            if asset.get("id"):
+                rows[asset["id"]] = index._encode(asset)
+        index._load_rows(rows)
+        index.built_at = index.refreshed_at = time.time()
+        return index
+
+    def copy(self) -> "RarityIndex":
+        """
+        A copy to apply changes to while readers keep using this index.
+
+        Only the interning tables are copied: every other column is replaced
+        wholesale by `_load_rows`, never modified in place, so they can be shared.
+        """
+        index = RarityIndex(self.collection)
+        index.__dict__.update(self.__dict__)
+        index.strings = list(self.strings)
+        index._string_ids = dict(self._string_ids)
+        index.trait_keys = array("I", self.trait_keys)
+        index._trait_ids = dict(self._trait_ids)
+        index.trait_counts = array("I", self.trait_counts)
+        return index
+
+    def apply_changes(self, assets: Iterable[Dict]) -> int:
+        """
+        Fold new or changed assets into the index and recompute scores.
+
+        Modifies the index in place, so it must not be one readers can reach (see `copy`).
+
+        Returns:
+            Number of assets that were new or whose traits/owner changed
+        """
+        rows = None
+        changed = 0
+        for asset in assets:
+            asset_id = asset.get("id")
+            if not asset_id:
+                continue
+            encoded = self._encode(asset)
+            pos = self._asset_pos.get(asset_id)
+            if pos is not None and self._row(pos) == encoded:
+                continue
+            if rows is None:
+                rows = self._rows()
+            rows[asset_id] = encoded
+            changed += 1
+
+        if rows is not None:
+            self._load_rows(rows)
+        self.refreshed_at = time.time()
+        return changed
+
+    def _row(self, pos: int) -> Tuple[int, Tuple[int, ...]]:
+        return self.owner_ids[pos], tuple(self.trait_refs[self.trait_offsets[pos]:self.trait_offsets[pos + 1]])
+
+    # -- queries ------------------------------------------------------------------
+
+    def _trait_dict(self, trait_id: int) -> Dict:
+        type_id, value_id = self.trait_keys[2 * trait_id], self.trait_keys[2 * trait_id + 1]
+        count = self.trait_counts[trait_id]
+        return {
+            "trait_type": self.strings[type_id],
+            "value": self.strings[value_id],
+            "count": count,
+            "frequency": round(count / len(self.asset_ids) * 100, 4) if self.asset_ids else 0
+        }
+
+    def _asset_dict(self, pos: int) -> Dict:
+        return {
+            "id": self.asset_ids[pos],
+            "owner": self.strings[self.owner_ids[pos]],
+            "score": round(self.scores[pos], 4),
+            "rank": self.ranks[pos]
+        }
+
+    def rarity(self, asset_id: str) -> Optional[Dict]:
+        pos = self._asset_pos.get(asset_id)
+        if pos is None:
+            return None
+        result = self._asset_dict(pos)
+        result["traits"] = [
+            self._trait_dict(self.trait_refs[j]) for j in range(self.trait_offsets[pos], self.trait_offsets[pos + 1])
+        ]
+        return result
+
+    def top(self, n: int) -> List[Dict]:
+        return [self._asset_dict(pos) for pos in self.order[:max(0, n)]]
+
+    def summary(self) -> Dict:
+        size = len(self.asset_ids)
+        trait_frequencies = {}
+        for trait_id in range(len(self.trait_counts)):
+            if self.trait_counts[trait_id]:
+                type_id, value_id = self.trait_keys[2 * trait_id], self.trait_keys[2 * trait_id + 1]
+                trait_frequencies.setdefault(self.strings[type_id], {})[self.strings[value_id]] = self.trait_counts[trait_id]
+
+        holdings = sorted(self.owner_counts.values(), reverse=True)
+        return {
+            "collection": self.collection,
+            "total": size,
+            "traitFrequencies": trait_frequencies,
+            "ownerConcentration": {
+                "uniqueOwners": len(holdings),
+                "top10Share": round(sum(holdings[:10]) / size * 100, 4) if size else 0,
+                # Herfindahl-Hirschman index over owner shares (0-10000)
+                "hhi": round(sum((count / size * 100) ** 2 for count in holdings), 2) if size else 0
+            },
+            "builtAt": self.built_at,
+            "refreshedAt": self.refreshed_at
+        }
+
+    # -- persistence --------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.VERSION,
+            "collection": self.collection,
+            "built_at": self.built_at,
+            "refreshed_at": self.refreshed_at,
+            "strings": self.strings,
+            "trait_keys": self.trait_keys.tobytes(),
+            "asset_ids": self.asset_ids,
+            "owner_ids": self.owner_ids.tobytes(),
+            "trait_offsets": self.trait_offsets.tobytes(),
+            "trait_refs": self.trait_refs.tobytes(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RarityIndex":
+        index = cls(data["collection"])
+        index.strings = list(data["strings"])
+        index._string_ids = {text: i for i, text in enumerate(index.strings)}
+        index.trait_keys = array("I", data["trait_keys"])
+        index._trait_ids = {
+            (index.trait_keys[2 * i], index.trait_keys[2 * i + 1]): i for i in range(len(index.trait_keys) // 2)
+        }
+        index.trait_counts = array("I", bytes(4 * (len(index.trait_keys) // 2)))
+        index.asset_ids = list(data["asset_ids"])
+        index.owner_ids = array("I", data["owner_ids"])
+        index.trait_offsets = array("I", data["trait_offsets"])
+        index.trait_refs = array("I", data["trait_refs"])
+        index._load_rows(index._rows())
+        index.built_at = data["built_at"]
+        index.refreshed_at = data["refreshed_at"]
+        return index
+
+
+# Hot, deserialized indexes per worker, bounded by RARITY_MAX_INDEXES
+_indexes: "OrderedDict[str, RarityIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+# Collection -> [lock, threads holding or waiting for it]; dropped once nobody does
+_build_locks: Dict[str, list] = {}
+
+
+@contextmanager
+def _build_lock(collection: str):
+    """Serialize building and refreshing one collection's index."""
+    with _indexes_lock:
+        entry = _build_locks.setdefault(collection, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _indexes_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _build_locks[collection]
+
+
+def _remember(index: RarityIndex):
+    with _indexes_lock:
+        _indexes[index.collection] = index
+        _indexes.move_to_end(index.collection)
+        while len(_indexes) > current_app.config.get("RARITY_MAX_INDEXES", 16):
+            _indexes.popitem(last=False)
+
+
+def _store_key(collection: str) -> str:
+    return f"rarity:{collection}"
+
+
+def _save(index: RarityIndex):
+    ttl = current_app.config.get("RARITY_STATE_TTL", 7 * 24 * 3600)
+    current_app.extensions["rarity_store"].set(_store_key(index.collection), index.to_dict(), ttl)
+
+
+def _refresh_incrementally(index: RarityIndex) -> int:
+    """
+    Re-read the most recently active assets until a page brings no changes.
+
+    `index` is changed in place; pass a `copy` of one that readers can reach.
+    """
+    page_size = min(current_app.config.get("DAS_PAGE_SIZE", 1000), 1000)
+    timeout = current_app.config.get("DEFAULT_TIMEOUT_MS", 20000)
+    sort_by = {"sortBy": "recent_action", "sortDirection": "desc"}
+
+    changed = 0
+    page = 1
+    while True:
+        items = _fetch_assets_page("collection", index.collection, page, page_size, timeout, sort_by).get("items", [])
+        page_changed = index.apply_changes(_process_asset(asset) for asset in items)
+        changed += page_changed
+        if page_changed == 0 or len(items) < page_size:
+            return changed
+        page += 1
+
+
+def get_rarity_index(collection: str) -> RarityIndex:
+    """
+    Returns the rarity index for a collection, building or refreshing it as needed.
+
+    A fresh index is served from memory. One older than RARITY_REFRESH_SECONDS
+    is refreshed from the most recently active assets; one older than
+    RARITY_REBUILD_SECONDS (or missing) is rebuilt from a full collection walk.
+    """
+    now = time.time()
+    refresh_after = current_app.config.get("RARITY_REFRESH_SECONDS", 300)
+    rebuild_after = current_app.config.get("RARITY_REBUILD_SECONDS", 24 * 3600)
+
+    index = _indexes.get(collection)
+    if index is not None and now - index.refreshed_at < refresh_after:
+        return index
+
+    with _build_lock(collection):
+        # Another request may have finished the work while we waited
+        index = _indexes.get(collection)
+        if index is not None and now - index.refreshed_at < refresh_after:
+            return index
+
+        if index is None:
+            data = current_app.extensions["rarity_store"].get(_store_key(collection))
+            if data is not MISSING and data.get("version") == RarityIndex.VERSION:
+                index = RarityIndex.from_dict(data)
+
+        if index is None or now - index.built_at >= rebuild_after:
+            assets = (asset for page in iter_collection_pages("collection", collection) for asset in page)
+            index = RarityIndex.build(collection, assets)
+            _save(index)
+        else:
+            # Readers keep the current index until the refreshed copy replaces it in one assignment
+            index = index.copy()
+            if _refresh_incrementally(index):
+                _save(index)
+
+        _remember(index)
+        return index
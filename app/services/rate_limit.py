@@ -0,0 +1,166 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import current_app
+
+from app.services.cache import parse_method_ttls
+from app.services.errors import HeliusRateLimitError
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket limiter for Helius credits, shared by every call in a worker.
+
+    Each method costs a number of credits (`method_costs`, default 1). Calls
+    reserve their cost up front; when the bucket is short they wait their
+    turn, up to `max_wait_ms`, and are shed with HeliusRateLimitError beyond
+    that. The refill rate adapts AIMD-style: halved whenever Helius answers
+    429 (at most once a second, and paused for any Retry-After), then raised a little per success
+    back towards `rate`.
+    """
+
+    def __init__(self, rate: float = 100.0, burst: float = None, method_costs: Dict[str, float] = None,
+                 default_cost: float = 1.0, min_rate: float = 1.0, max_wait_ms: int = 2000, logger=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.burst = float(burst if burst is not None else rate)
+        self.method_costs = dict(method_costs or {})
+        self.default_cost = default_cost
+        self.max_wait_ms = max_wait_ms
+        self.logger = logger
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.delayed = 0
+        self.shed = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.credits: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "AdaptiveRateLimiter":
+        return cls(
+            rate=config.get("HELIUS_RATE_LIMIT_CREDITS_PER_SEC", 100),
+            burst=config.get("HELIUS_RATE_LIMIT_BURST"),
+            method_costs=config.get("HELIUS_METHOD_COSTS", {}),
+            max_wait_ms=config.get("HELIUS_RATE_LIMIT_MAX_WAIT_MS", 2000),
+            logger=logger,
+        )
+
+    def cost_of(self, payload) -> float:
+        """Credits used by a JSON-RPC payload (a single call or a batch array)."""
+        calls = payload if isinstance(payload, list) else [payload]
+        return sum(self.method_costs.get(call.get("method"), self.default_cost) for call in calls)
+
+    def _refill(self, now: float):
+        # Caller holds self._lock
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, payload, max_wait_ms: int = None) -> float:
+        """
+        Reserve credits for `payload`.
+
+        Returns:
+            Seconds the caller must wait before sending (0 if it can go now)
+
+        Raises:
+            HeliusRateLimitError if the wait would exceed `max_wait_ms`
+        """
+        cost = self.cost_of(payload)
+        limit = self.max_wait_ms if max_wait_ms is None else min(self.max_wait_ms, max_wait_ms)
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # A single call costing more than the bucket holds may borrow against future refill
+            wait = max(0.0, (min(cost, self.burst) - self._tokens) / self.rate, self._blocked_until - now)
+            if wait * 1000 > limit:
+                self.shed += 1
+                raise HeliusRateLimitError(
+                    f"Helius credit budget exhausted ({self.rate:.1f} credits/s); retry shortly",
+                    retry_after=wait,
+                )
+
+            self._tokens -= cost
+            self.admitted += 1
+            if wait:
+                self.delayed += 1
+                self.wait_seconds += wait
+            calls = payload if isinstance(payload, list) else [payload]
+            for call in calls:
+                method = call.get("method")
+                self.credits[method] = self.credits.get(method, 0) + self.method_costs.get(method, self.default_cost)
+            return wait
+
+    def acquire(self, payload, max_wait_ms: int = None):
+        """Blocking `reserve`: sleeps until the reserved credits are available."""
+        wait = self.reserve(payload, max_wait_ms)
+        if wait:
+            time.sleep(wait)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Helius answered 429: halve the rate and honour Retry-After."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttled += 1
+            # A burst of in-flight calls throttled together is one congestion signal, not several
+            if now - self._last_decrease >= 1.0:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_decrease = now
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+        if self.logger:
+            self.logger.warning(f"Helius rate limited us; client rate lowered to {self.rate:.1f} credits/s")
+
+    def on_success(self):
+        """Additive increase back towards the configured rate."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": round(self.rate, 2),
+                "maxRate": self.max_rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "admitted": self.admitted,
+                "delayed": self.delayed,
+                "shed": self.shed,
+                "throttled": self.throttled,
+                "totalWaitMs": round(self.wait_seconds * 1000, 1),
+                "creditsByMethod": dict(self.credits),
+                "costs": dict(self.method_costs),
+            }
+
+
+def parse_method_costs(spec: str) -> Dict[str, float]:
+    """Parse "method=credits,method=credits" into a cost table."""
+    return parse_method_ttls(spec)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_rate_limiter() -> Optional[AdaptiveRateLimiter]:
+    """Return the limiter registered on the current app, or None if rate limiting is disabled."""
+    return current_app.extensions.get("helius_rate_limiter")
@@ -0,0 +1,217 @@
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Response, current_app, jsonify, request
+from werkzeug.http import parse_etags
+
+from app.services.cache_backends import CacheBackend, MemoryBackend, MISSING, build_cache_backend
+from app.services.deadline import request_deadline
+from app.services.executor import get_refresh_executor
+
+
+class RouteCache:
+    """
+    Stale-while-revalidate cache of rendered API responses.
+
+    Entries are the serialized JSON body plus its ETag and the time it was
+    built. Within `soft_ttl` seconds an entry is fresh; between `soft_ttl`
+    and `hard_ttl` it is still served immediately, but the first request to
+    see it stale triggers one background refresh (per worker). Keys read at
+    least `hot_hits` times since their last refresh are refreshed ahead of
+    time, once `refresh_ahead` of the soft TTL has passed, so popular pages
+    rarely go stale at all. Only successful (200) bodies are stored.
+    """
+
+    def __init__(self, backend: CacheBackend = None, soft_ttl: float = 5, hard_ttl: float = 60,
+                 refresh_ahead: float = 0.8, hot_hits: int = 3, max_tracked_keys: int = 10000, logger=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+        self.refresh_ahead = refresh_ahead
+        self.hot_hits = hot_hits
+        self.max_tracked_keys = max_tracked_keys
+        self.logger = logger
+
+        self._reads: Dict[str, int] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.refreshes = 0
+        self.proactive_refreshes = 0
+        self.refresh_errors = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "RouteCache":
+        return cls(
+            backend=build_cache_backend(config),
+            soft_ttl=config.get("ROUTE_CACHE_SOFT_TTL", 5),
+            hard_ttl=config.get("ROUTE_CACHE_HARD_TTL", 60),
+            refresh_ahead=config.get("ROUTE_CACHE_REFRESH_AHEAD", 0.8),
+            hot_hits=config.get("ROUTE_CACHE_HOT_HITS", 3),
+            logger=logger,
+        )
+
+    def _claim_refresh(self, key: str) -> bool:
+        # Caller holds self._lock
+        if key in self._refreshing:
+            return False
+        self._refreshing.add(key)
+        return True
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Find the entry for `key`.
+
+        Returns:
+            Tuple of (entry or None, refresh). When refresh is True the caller
+            owns this key's background refresh and must call `finish_refresh`.
+        """
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            entry = MISSING
+            self.errors += 1
+            if self.logger:
+                self.logger.warning(f"Route cache read failed: {e}")
+
+        with self._lock:
+            if entry is MISSING:
+                self.misses += 1
+                return None, False
+
+            age = time.time() - entry["storedAt"]
+            if age >= self.soft_ttl:
+                self.stale_hits += 1
+                return entry, self._claim_refresh(key)
+
+            self.fresh_hits += 1
+            reads = self._reads.get(key, 0) + 1
+            if len(self._reads) >= self.max_tracked_keys and key not in self._reads:
+                self._reads.clear()
+            self._reads[key] = reads
+            if reads >= self.hot_hits and age >= self.soft_ttl * self.refresh_ahead and self._claim_refresh(key):
+                self.proactive_refreshes += 1
+                return entry, True
+            return entry, False
+
+    def store(self, key: str, body: bytes) -> Dict:
+        """Store a freshly rendered body and return its entry."""
+        entry = {
+            "body": body,
+            "etag": hashlib.blake2b(body, digest_size=12).hexdigest(),
+            "storedAt": time.time(),
+        }
+        try:
+            self.backend.set(key, entry, self.hard_ttl)
+        except Exception as e:
+            self.errors += 1
+            if self.logger:
+                self.logger.warning(f"Route cache write failed: {e}")
+        with self._lock:
+            self._reads.pop(key, None)
+        return entry
+
+    def finish_refresh(self, key: str, error: BaseException = None):
+        with self._lock:
+            self._refreshing.discard(key)
+            self.refreshes += 1
+            if error is not None:
+                self.refresh_errors += 1
+        if error is not None and self.logger:
+            self.logger.warning(f"Background refresh of {key} failed, serving the cached copy: {error}")
+
+    def is_not_modified(self, entry: Dict, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header value matches the entry's ETag (counting a 304)."""
+        if not if_none_match or not parse_etags(if_none_match).contains_weak(entry["etag"]):
+            return False
+        with self._lock:
+            self.not_modified += 1
+        return True
+
+    def headers_for(self, entry: Dict) -> List[Tuple[str, str]]:
+        """Age, Cache-Control and ETag headers letting browsers and CDNs cache the response downstream."""
+        age = max(0, int(time.time() - entry["storedAt"]))
+        max_age = max(0, int(self.soft_ttl - age))
+        return [
+            ("ETag", f'"{entry["etag"]}"'),
+            ("Age", str(age)),
+            ("Cache-Control", f"public, max-age={max_age}, stale-while-revalidate={int(self.hard_ttl - self.soft_ttl)}"),
+        ]
+
+    def stats(self) -> Dict:
+        try:
+            backend_stats = self.backend.stats()
+        except Exception as e:
+            backend_stats = {"backend": self.backend.name, "error": str(e)}
+
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_hits + self.misses
+            return {
+                **backend_stats,
+                "softTtl": self.soft_ttl,
+                "hardTtl": self.hard_ttl,
+                "freshHits": self.fresh_hits,
+                "staleHits": self.stale_hits,
+                "misses": self.misses,
+                "hitRate": round((self.fresh_hits + self.stale_hits) / lookups * 100, 2) if lookups else 0,
+                "notModified": self.not_modified,
+                "refreshes": self.refreshes,
+                "proactiveRefreshes": self.proactive_refreshes,
+                "refreshErrors": self.refresh_errors,
+                "refreshing": len(self._refreshing),
+                "errors": self.errors,
+            }
+
+
+def get_route_cache() -> Optional[RouteCache]:
+    """Return the route cache registered on the current app, or None if it is disabled."""
+    return current_app.extensions.get("route_cache")
+
+
+def render_json(body: Any) -> bytes:
+    """The exact bytes `jsonify(body)` would send."""
+    return current_app.json.response(body).get_data()
+
+
+def _refresh(app, cache: RouteCache, key: str, build: Callable[[], Any]):
+    error = None
+    try:
+        with app.app_context(), request_deadline(app.config.get("REQUEST_DEADLINE_MS", 30000)):
+            cache.store(key, render_json(build()))
+    except Exception as e:
+        error = e
+    finally:
+        cache.finish_refresh(key, error)
+
+
+def cached_json_response(key: str, build: Callable[[], Any]) -> Response:
+    """
+    Serve the JSON body produced by `build` through the route cache.
+
+    On a miss `build` runs inline and its errors propagate to the route's
+    handlers as usual. A stale (or hot, nearly stale) entry is served at
+    once while `build` runs again on a background thread, so it must not
+    touch `request`. A matching If-None-Match is answered with 304 and no
+    body. With the cache disabled this is `jsonify(build())`.
+    """
+    cache = get_route_cache()
+    if cache is None:
+        return jsonify(build())
+
+    entry, refresh = cache.lookup(key)
+    if entry is None:
+        entry = cache.store(key, render_json(build()))
+    elif refresh:
+        get_refresh_executor().submit(_refresh, current_app._get_current_object(), cache, key, build)
+
+    headers = cache.headers_for(entry)
+    if cache.is_not_modified(entry, request.headers.get("If-None-Match")):
+        return Response(status=304, headers=headers)
+    return Response(entry["body"], mimetype=current_app.json.mimetype, headers=headers)
@@ -0,0 +1,227 @@
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class Endpoint:
+    """One upstream JSON-RPC URL and its health record."""
+    __slots__ = (
+        "url", "weight", "latency", "error_rate", "failures", "state", "open_until", "probing",
+        "requests", "errors", "ejections",
+    )
+
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url
+        self.weight = weight
+        self.latency: Optional[float] = None  # EWMA seconds; None until the first answer
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.failures = 0  # consecutive
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.probing = False
+
+        self.requests = 0
+        self.errors = 0
+        self.ejections = 0
+
+    def score(self, error_penalty: float) -> float:
+        """Expected cost of sending a call here; lower is healthier. Unmeasured endpoints go first."""
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + error_penalty * self.error_rate) / self.weight
+
+
+class RpcRouter:
+    """
+    Picks the upstream RPC endpoint for each call.
+
+    Latency and error rate are tracked per endpoint as exponentially weighted
+    moving averages (`alpha`); calls go to the endpoint with the lowest
+    weighted score, except for a small `explore` share spread by weight so a
+    recovered endpoint is noticed. After `failure_threshold` consecutive
+    failures an endpoint's circuit opens and it gets no traffic for
+    `open_seconds`; then the next call is sent to it as a single probe
+    (half-open) and its outcome closes or re-opens the circuit. Idempotent calls that fail
+    are retried on another endpoint, up to `max_attempts` in total.
+
+    If every circuit is open, calls still go to the endpoint due back first
+    rather than failing outright, so a single-endpoint setup behaves as it
+    did before routing.
+    """
+
+    def __init__(self, endpoints: Iterable[Tuple[str, float]], alpha: float = 0.2, failure_threshold: int = 5,
+                 open_seconds: float = 10.0, max_attempts: int = 2, error_penalty: float = 10.0,
+                 explore: float = 0.05, logger=None):
+        self.endpoints: List[Endpoint] = [Endpoint(url, weight) for url, weight in endpoints]
+        if not self.endpoints:
+            raise ValueError("RpcRouter needs at least one endpoint")
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.error_penalty = error_penalty
+        self.explore = explore
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "RpcRouter":
+        endpoints = parse_rpc_urls(config.get("HELIUS_RPC_URLS", "")) or [(config["HELIUS_RPC_URL"], 1.0)]
+        return cls(
+            endpoints,
+            alpha=config.get("HELIUS_ROUTER_EWMA_ALPHA", 0.2),
+            failure_threshold=config.get("HELIUS_ROUTER_FAILURE_THRESHOLD", 5),
+            open_seconds=config.get("HELIUS_ROUTER_OPEN_SECONDS", 10),
+            max_attempts=config.get("HELIUS_ROUTER_MAX_ATTEMPTS", 2),
+            logger=logger,
+        )
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        # Caller holds self._lock
+        if endpoint.state == OPEN and now >= endpoint.open_until:
+            endpoint.state = HALF_OPEN
+            endpoint.probing = False
+        if endpoint.state == HALF_OPEN:
+            return not endpoint.probing
+        return endpoint.state == CLOSED
+
+    def choose(self, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """
+        Pick an endpoint for the next call, skipping `exclude` (endpoints already tried for it).
+
+        Returns:
+            The chosen endpoint, or None if every endpoint has been excluded
+        """
+        exclude = set(map(id, exclude))
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if id(e) not in exclude]
+            if not candidates:
+                return None
+
+            available = [e for e in candidates if self._available(e, now)]
+            probe = next((e for e in available if e.state == HALF_OPEN), None)
+            if not available:
+                # Everything is ejected: use the endpoint due back soonest
+                chosen = min(candidates, key=lambda e: e.open_until)
+            elif probe is not None:
+                # Its error history still scores it last, so send the probe now rather than when exploring
+                chosen = probe
+            elif len(available) > 1 and random.random() < self.explore:
+                chosen = random.choices(available, weights=[e.weight for e in available])[0]
+            else:
+                chosen = min(available, key=lambda e: e.score(self.error_penalty))
+
+            if chosen.state == HALF_OPEN:
+                chosen.probing = True
+            chosen.requests += 1
+            return chosen
+
+    def release(self, endpoint: Endpoint):
+        """Give up a call chosen for `endpoint` without an outcome (cancelled, or failed before sending)."""
+        with self._lock:
+            if endpoint.state == HALF_OPEN:
+                # Let the next call probe instead; otherwise the endpoint would stay excluded for good
+                endpoint.probing = False
+
+    def on_success(self, endpoint: Endpoint, seconds: float):
+        with self._lock:
+            self._observe(endpoint, seconds, 0.0)
+            endpoint.failures = 0
+            if endpoint.state != CLOSED:
+                # The probe succeeded: start the error history afresh so it competes on latency again
+                endpoint.state = CLOSED
+                endpoint.probing = False
+                endpoint.error_rate = 0.0
+                if self.logger:
+                    self.logger.info(f"RPC endpoint {_redact(endpoint.url)} recovered")
+
+    def on_failure(self, endpoint: Endpoint, seconds: float):
+        with self._lock:
+            self._observe(endpoint, seconds, 1.0)
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.state == HALF_OPEN or (endpoint.state == CLOSED and endpoint.failures >= self.failure_threshold):
+                endpoint.state = OPEN
+                endpoint.probing = False
+                endpoint.open_until = time.monotonic() + self.open_seconds
+                endpoint.ejections += 1
+                if self.logger:
+                    self.logger.warning(
+                        f"RPC endpoint {_redact(endpoint.url)} ejected for {self.open_seconds}s "
+                        f"after {endpoint.failures} consecutive failures"
+                    )
+
+    def _observe(self, endpoint: Endpoint, seconds: float, failed: float):
+        # Caller holds self._lock
+        if endpoint.latency is None:
+            endpoint.latency = seconds
+        elif failed and seconds < endpoint.latency:
+            pass  # a fast failure (refused connection, 503) says nothing good about latency
+        else:
+            endpoint.latency += self.alpha * (seconds - endpoint.latency)
+        endpoint.error_rate += self.alpha * (failed - endpoint.error_rate)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "endpoints": [
+                    {
+                        "url": _redact(e.url),
+                        "weight": e.weight,
+                        "state": e.state,
+                        "latencyMs": round(e.latency * 1000, 1) if e.latency is not None else None,
+                        "errorRate": round(e.error_rate, 3),
+                        "requests": e.requests,
+                        "errors": e.errors,
+                        "ejections": e.ejections,
+                    }
+                    for e in self.endpoints
+                ],
+            }
+
+
+def _redact(url: str) -> str:
+    """Hide the API key in URLs shown in logs and stats."""
+    base, sep, query = url.partition("?")
+    if not sep:
+        return url
+    return base + "?" + "&".join(
+        part.split("=", 1)[0] + "=***" if part.lower().startswith("api-key=") else part
+        for part in query.split("&")
+    )
+
+
+def parse_rpc_urls(spec: str) -> List[Tuple[str, float]]:
+    """Parse "url|weight,url|weight" (weight optional, default 1) into an endpoint list."""
+    endpoints = []
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, weight = entry.partition("|")
+        endpoints.append((url.strip(), float(weight) if weight.strip() else 1.0))
+    return endpoints
+
+
+def is_idempotent(payload) -> bool:
+    """True if every call in a JSON-RPC payload is a read (`get*`), so it is safe to send twice."""
+    calls = payload if isinstance(payload, list) else [payload]
+    return all(str(call.get("method", "")).startswith("get") for call in calls)
+
+
+def get_rpc_router() -> RpcRouter:
+    """Return the endpoint router registered on the current app by `create_app`."""
+    router = current_app.extensions.get("helius_rpc_router")
+    if router is None:
+        router = current_app.extensions["helius_rpc_router"] = RpcRouter.from_config(current_app.config)
+    return router
@@ -0,0 +1,133 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from app.services.errors import HeliusTimeoutError
+
+
+class Flight:
+    """One in-progress upstream call that concurrent callers for the same key wait on."""
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout_ms: int = None) -> Any:
+        """Block until the leader finishes; return its result or raise its error."""
+        if not self.event.wait(None if timeout_ms is None else timeout_ms / 1000.0):
+            raise HeliusTimeoutError(f"Shared in-flight call did not finish within {timeout_ms}ms")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls within a worker process.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for and share its result or error. Nothing is
+    kept once the call finishes, so this never serves stale data.
+
+    Lower-level `join`/`finish` let a batch lead some keys and wait on others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.coalesced = 0
+        self._by_label: Dict[str, list] = {}
+
+    def _count(self, label: Optional[str], shared: bool):
+        # Caller holds self._lock
+        self.calls += 1
+        if shared:
+            self.coalesced += 1
+        if label is not None:
+            counts = self._by_label.setdefault(label, [0, 0])
+            counts[0] += 1
+            if shared:
+                counts[1] += 1
+
+    def record(self, label: Optional[str], shared: bool):
+        """Count a call deduplicated elsewhere (e.g. on an event loop) in these stats."""
+        with self._lock:
+            self._count(label, shared)
+
+    def join(self, key: str, label: str = None) -> Tuple[Flight, bool]:
+        """
+        Join the flight for `key`, starting one if none is in progress.
+
+        Returns:
+            Tuple of (flight, leader). A leader must call `finish` exactly once.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            self._count(label, not leader)
+        return flight, leader
+
+    def finish(self, key: str, flight: Flight, result: Any = None, error: BaseException = None):
+        """Publish the leader's outcome and release waiters."""
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.event.set()
+
+    def do(self, key: str, fn: Callable[[], Any], label: str = None, timeout_ms: int = None) -> Tuple[Any, bool]:
+        """
+        Run `fn` once for all concurrent callers of `key`.
+
+        Args:
+            key: Identity of the call (e.g. `cache_key(method, params)`)
+            fn: Zero-argument callable performing the call
+            label: Name to count the call under in `stats()["byMethod"]`
+            timeout_ms: How long a waiter waits for the leader (None waits indefinitely)
+
+        Returns:
+            Tuple of (result, shared), where shared is True for waiters
+        """
+        flight, leader = self.join(key, label)
+        if not leader:
+            return flight.wait(timeout_ms), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result=result)
+        return result, False
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "coalescedRate": round(self.coalesced / self.calls * 100, 2) if self.calls else 0,
+                "inFlight": len(self._flights),
+                "byMethod": {
+                    label: {"calls": calls, "coalesced": coalesced}
+                    for label, (calls, coalesced) in sorted(self._by_label.items())
+                },
+            }
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the single-flight group registered on the current app by `create_app`."""
+    single_flight = current_app.extensions.get("helius_singleflight")
+    if single_flight is None:
+        single_flight = current_app.extensions["helius_singleflight"] = SingleFlight()
+    return single_flight
@@ -0,0 +1,330 @@
+"""
+Lean decoding of raw (base64) SPL token accounts.
+
+`getTokenAccountsByOwner` with `jsonParsed` encoding returns a deep dict
+per account that we immediately throw away. Every account is the fixed
+165-byte SPL token layout, of which we only need the mint and the amount
+(and the owner, kept as raw bytes), so we ask for `base64` data sliced to
+those first 72 bytes and unpack it directly. Zero balances are dropped
+while decoding, before any base58 work. Decimals are not part of
+the account, so they come from a per-process table of mint decimals
+(immutable on-chain, so never expired), filled with one-byte
+`getMultipleAccounts` reads of each unknown mint.
+"""
+import base64
+import binascii
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from app.services.errors import HeliusServiceError
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+
+# SPL token account layout (Token-2022 accounts share the first 165 bytes):
+# mint (32), owner (32), amount (u64 little-endian), then fields we never read,
+# so only the first 72 bytes are requested
+_HEAD = struct.Struct("<32s32sQ")
+HEAD_SLICE = {"offset": 0, "length": _HEAD.size}
+AMOUNT_SLICE = {"offset": 64, "length": 8}
+TOKEN_ACCOUNT_SIZE = 165
+
+# SPL mint layout (also the base of Token-2022 mints): supply (u64 little-endian)
+# at offset 36, then the decimals byte at offset 44
+MINT_DECIMALS_SLICE = {"offset": 44, "length": 1}
+MINT_SUPPLY_SLICE = {"offset": 36, "length": 9}
+_SUPPLY = struct.Struct("<QB")
+
+# getMultipleAccounts accepts at most 100 keys per call
+MAX_MULTIPLE_ACCOUNTS = 100
+
+_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_PAIRS = [a + b for a in _ALPHABET for b in _ALPHABET]
+
+
+def b58encode(raw: bytes) -> str:
+    """Base58 (Bitcoin alphabet), two digits per division; ~4x faster than `base58.b58encode` for keys."""
+    n = int.from_bytes(raw, "big")
+    digits = []
+    while n:
+        n, r = divmod(n, 3364)
+        digits.append(_PAIRS[r])
+    encoded = "".join(reversed(digits)).lstrip("1")
+    return "1" * (len(raw) - len(raw.lstrip(b"\0"))) + encoded
+
+
+class TokenAccount:
+    """One decoded token account with a non-zero balance."""
+    __slots__ = ("address", "mint", "owner_bytes", "amount")
+
+    def __init__(self, address: str, mint: str, owner_bytes: bytes, amount: int):
+        self.address = address
+        self.mint = mint
+        self.owner_bytes = owner_bytes
+        self.amount = amount
+
+    @property
+    def owner(self) -> str:
+        return b58encode(self.owner_bytes)
+
+    def to_dict(self, decimals: Optional[int]) -> Dict:
+        """The same fields `_parse_token_accounts` builds from jsonParsed data; no uiAmount if `decimals` is None."""
+        return {
+            "mint": self.mint,
+            "address": self.address,
+            "amount": str(self.amount),
+            # Same arithmetic as the RPC node's uiAmount (u64 as f64 / 10^decimals)
+            "uiAmount": float(self.amount) / 10 ** decimals if decimals is not None else None,
+            "decimals": decimals,
+        }
+
+
+class MintTable:
+    """
+    Process-wide cache of mint decimals, plus base58 strings of mint keys already seen.
+
+    Both are immutable on-chain, so entries never expire; the table is only
+    bounded (least recently used out) by `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._decimals: "OrderedDict[str, int]" = OrderedDict()
+        self._names: Dict[bytes, str] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def name(self, raw: bytes) -> str:
+        """Base58 string of a raw mint key (memoized)."""
+        name = self._names.get(raw)
+        if name is None:
+            if len(self._names) >= self.max_entries:
+                self._names.clear()
+            name = self._names[raw] = b58encode(raw)
+        return name
+
+    def missing(self, mints: Iterable[str]) -> List[str]:
+        """Mints whose decimals are not known yet (counting hits and misses)."""
+        with self._lock:
+            missing = []
+            for mint in mints:
+                if mint in self._decimals:
+                    self._decimals.move_to_end(mint)
+                    self.hits += 1
+                else:
+                    missing.append(mint)
+                    self.misses += 1
+            return missing
+
+    def update(self, decimals_by_mint: Dict[str, int]):
+        with self._lock:
+            for mint, decimals in decimals_by_mint.items():
+                self._decimals[mint] = decimals
+                self._decimals.move_to_end(mint)
+            while len(self._decimals) > self.max_entries:
+                self._decimals.popitem(last=False)
+
+    def decimals(self, mint: str) -> Optional[int]:
+        return self._decimals.get(mint)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mints": len(self._decimals),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            }
+
+
+def get_mint_table() -> MintTable:
+    """Return the mint table registered on the current app by `create_app`."""
+    table = current_app.extensions.get("mint_table")
+    if table is None:
+        table = current_app.extensions["mint_table"] = MintTable(current_app.config.get("MINT_TABLE_MAX_ENTRIES", 100000))
+    return table
+
+
+def token_programs() -> List[str]:
+    """Token program ids scanned for wallet holdings (WALLET_TOKEN_PROGRAMS)."""
+    programs = current_app.config.get("WALLET_TOKEN_PROGRAMS", f"{TOKEN_PROGRAM_ID},{TOKEN_2022_PROGRAM_ID}")
+    return [program.strip() for program in programs.split(",") if program.strip()]
+
+
+def merge_by_address(account_lists: Iterable[list], address=lambda account: account.address) -> list:
+    """Concatenate per-program account lists, keeping the first occurrence of each account address."""
+    seen = set()
+    merged = []
+    for accounts in account_lists:
+        for account in accounts:
+            key = address(account)
+            if key not in seen:
+                seen.add(key)
+                merged.append(account)
+    return merged
+
+
+def token_accounts_params(owner_address: str, program_id: str = TOKEN_PROGRAM_ID) -> list:
+    """getTokenAccountsByOwner params for the raw (base64) mint, owner and amount of each account."""
+    return [owner_address, {"programId": program_id}, {"encoding": "base64", "dataSlice": HEAD_SLICE}]
+
+
+def decode_token_accounts(result: Dict, mint_table: MintTable) -> List[TokenAccount]:
+    """
+    Decode a base64 getTokenAccountsByOwner result, skipping zero balances and malformed accounts.
+    """
+    accounts = []
+    a2b_base64 = binascii.a2b_base64
+    unpack_head = _HEAD.unpack_from
+    name = mint_table.name
+    for item in result.get("value", ()):
+        try:
+            mint, owner, amount = unpack_head(a2b_base64(item["account"]["data"][0]))
+        except (KeyError, IndexError, TypeError, ValueError, struct.error):
+            continue
+        if amount:
+            accounts.append(TokenAccount(item.get("pubkey"), name(mint), owner, amount))
+    return accounts
+
+
+def mint_accounts_params(mint_address: str, program_id: str = TOKEN_PROGRAM_ID) -> list:
+    """getProgramAccounts params for the raw amount of every token account of a mint."""
+    filters = [{"memcmp": {"offset": 0, "bytes": mint_address}}]
+    if program_id == TOKEN_PROGRAM_ID:
+        # Token-2022 accounts carry extensions and vary in size
+        filters.append({"dataSize": TOKEN_ACCOUNT_SIZE})
+    return [program_id, {"encoding": "base64", "dataSlice": AMOUNT_SLICE, "filters": filters}]
+
+
+def decode_amounts(result: List) -> Tuple[List[str], array]:
+    """
+    Decode a getProgramAccounts result sliced to AMOUNT_SLICE.
+
+    Returns:
+        (account addresses, amounts as array('Q')) of the non-zero balances, in the same order
+    """
+    addresses, amounts = [], array("Q")
+    a2b_base64 = binascii.a2b_base64
+    from_bytes = int.from_bytes
+    for item in result or ():
+        try:
+            amount = from_bytes(a2b_base64(item["account"]["data"][0]), "little")
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+        if amount:
+            addresses.append(item.get("pubkey"))
+            amounts.append(amount)
+    return addresses, amounts
+
+
+def share_percent(amount: int, total: int, places: int = 4) -> float:
+    """`amount` as a percentage of `total`, rounded half up to `places` decimals in exact integer arithmetic."""
+    if total <= 0:
+        return 0
+    scale = 10 ** places
+    return (amount * 200 * scale + total) // (2 * total) / scale
+
+
+def mint_data_calls(mints: List[str], data_slice: Dict = MINT_DECIMALS_SLICE) -> List:
+    """getMultipleAccounts calls reading only `data_slice` (the decimals byte) of each mint, in chunks of 100."""
+    options = {"encoding": "base64", "dataSlice": data_slice}
+    return [
+        ("getMultipleAccounts", [mints[i:i + MAX_MULTIPLE_ACCOUNTS], options])
+        for i in range(0, len(mints), MAX_MULTIPLE_ACCOUNTS)
+    ]
+
+
+def decimals_from_supplies(supply_by_mint: Dict) -> Dict[str, int]:
+    """Decimals already present in getTokenSupply results, so `include_details` needs no extra lookups."""
+    decimals = {}
+    for mint, supply in supply_by_mint.items():
+        if isinstance(supply, dict) and isinstance(supply.get("value"), dict) and "decimals" in supply["value"]:
+            decimals[mint] = supply["value"]["decimals"]
+    return decimals
+
+
+def parse_mint_decimals(mints: List[str], results: List) -> Dict[str, int]:
+    """
+    Decimals per mint from the `mint_data_calls` results (in the same order).
+
+    Chunks that failed (an exception in `results`) and accounts that do not
+    exist are left out, so they are looked up again next time.
+    """
+    decimals = {}
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            continue
+        chunk = mints[i * MAX_MULTIPLE_ACCOUNTS:(i + 1) * MAX_MULTIPLE_ACCOUNTS]
+        for mint, account in zip(chunk, result.get("value", ())):
+            if not account:
+                continue
+            raw = base64.b64decode(account["data"][0])
+            if raw:
+                decimals[mint] = raw[0]
+    return decimals
+
+
+def ui_amount_string(amount: int, decimals: int) -> str:
+    """The RPC node's `uiAmountString`: the exact decimal amount with trailing zeros trimmed."""
+    if not decimals:
+        return str(amount)
+    digits = str(amount).rjust(decimals + 1, "0")
+    whole, fraction = digits[:-decimals], digits[-decimals:].rstrip("0")
+    return f"{whole}.{fraction}" if fraction else whole
+
+
+def parse_mint_supplies(mints: List[str], results: List) -> Dict:
+    """
+    getTokenSupply-shaped results per mint from `mint_data_calls(mints, MINT_SUPPLY_SLICE)`.
+
+    A mint whose chunk failed maps to that exception, and a mint that does
+    not exist to a HeliusServiceError, as a failed getTokenSupply would.
+    """
+    supplies = {}
+    for i, result in enumerate(results):
+        chunk = mints[i * MAX_MULTIPLE_ACCOUNTS:(i + 1) * MAX_MULTIPLE_ACCOUNTS]
+        if isinstance(result, Exception):
+            supplies.update(dict.fromkeys(chunk, result))
+            continue
+        for mint, account in zip(chunk, result.get("value", ())):
+            try:
+                supply, decimals = _SUPPLY.unpack_from(binascii.a2b_base64(account["data"][0]))
+            except (KeyError, IndexError, TypeError, ValueError, struct.error):
+                continue
+            supplies[mint] = {"value": {
+                "amount": str(supply),
+                "decimals": decimals,
+                "uiAmount": float(supply) / 10 ** decimals,
+                "uiAmountString": ui_amount_string(supply, decimals),
+            }}
+    for mint in mints:
+        if mint not in supplies:
+            supplies[mint] = HeliusServiceError(f"Mint account {mint} not found")
+    return supplies
+
+
+def build_token_list(accounts: List[TokenAccount], mint_table: MintTable) -> List[Dict]:
+    """
+    Token dicts for the response.
+
+    Accounts whose mint decimals could not be looked up keep their raw
+    `amount` but get a null `uiAmount` and `decimals` and an "error" field,
+    rather than an amount scaled by the wrong power of ten.
+    """
+    tokens = []
+    for account in accounts:
+        decimals = mint_table.decimals(account.mint)
+        token = account.to_dict(decimals)
+        if decimals is None:
+            current_app.logger.warning(f"Decimals unknown for mint {account.mint}")
+            token["error"] = "Failed to fetch token decimals"
+        tokens.append(token)
+    return tokens
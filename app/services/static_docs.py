@@ -0,0 +1,72 @@
+"""
+In-memory, pre-encoded copies of the static API docs (/docs, /get-docs-json).
+
+Each file is read once per worker process, on its first request, and kept
+as the bytes served: JSON re-encoded compactly, plus a gzip-compressed copy
+for clients that accept it. The ETag is a hash of the content rather than of
+the file's mtime, so it is the same on every instance of a deploy and a
+revalidating browser or CDN gets a 304 from whichever instance answers.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict
+
+from flask import Request, Response
+
+
+class StaticDocument:
+    def __init__(self, body: bytes, mimetype: str):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+
+
+class StaticDocs:
+    """Lazily loaded StaticDocuments of one static folder, served with caching headers."""
+
+    def __init__(self, folder: str, max_age: int = 300):
+        self.folder = folder
+        self.max_age = max_age
+        self._documents: Dict[str, StaticDocument] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, folder: str, config) -> "StaticDocs":
+        return cls(folder, config.get("DOCS_MAX_AGE_SECONDS", 300))
+
+    def get(self, name: str) -> StaticDocument:
+        document = self._documents.get(name)
+        if document is not None:
+            return document
+
+        with self._lock:
+            document = self._documents.get(name)
+            if document is None:
+                with open(os.path.join(self.folder, name), "rb") as f:
+                    body = f.read()
+                if name.endswith(".json"):
+                    body = json.dumps(json.loads(body), separators=(",", ":"), ensure_ascii=False).encode()
+                    mimetype = "application/json"
+                else:
+                    mimetype = "text/html"
+                document = self._documents[name] = StaticDocument(body, mimetype)
+        return document
+
+    def response(self, name: str, request: Request) -> Response:
+        """`name` as a (possibly gzip-encoded) response; 304 when the client's copy is current."""
+        document = self.get(name)
+        if "gzip" in request.accept_encodings:
+            resp = Response(document.gzipped, mimetype=document.mimetype)
+            resp.headers["Content-Encoding"] = "gzip"
+            resp.set_etag(document.etag + "-gz")
+        else:
+            resp = Response(document.body, mimetype=document.mimetype)
+            resp.set_etag(document.etag)
+        resp.vary.add("Accept-Encoding")
+        resp.cache_control.public = True
+        resp.cache_control.max_age = self.max_age
+        return resp.make_conditional(request)
@@ -0,0 +1,128 @@
+"""
+Columnar (NumPy) analytics for large getSignaturesForAddress pages.
+
+Produces exactly the same rows and analytics as
+`helius_service._summarize_signature_page`, but converts block times and
+builds the hourly histogram in bulk instead of one `datetime` per row.
+NumPy is optional; without it `available()` is False and callers keep the
+pure-Python path. It is imported on the first `available()` call rather than
+with this module, since it alone roughly doubles the app's import time.
+"""
+import time
+from typing import Dict, List, Tuple
+
+np = None
+_np_checked = False
+
+# Block times outside this range fall back to the Python path (datetime limits)
+_MIN_TIMESTAMP = 1
+_MAX_TIMESTAMP = 253402214400  # 9999-12-31
+
+
+def available() -> bool:
+    global np, _np_checked
+    if not _np_checked:
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - optional dependency
+            np = None
+        _np_checked = True
+    return np is not None
+
+
+def _local_seconds(timestamps: "np.ndarray") -> "np.ndarray":
+    """
+    Shift UTC epoch seconds to local wall-clock seconds, matching
+    `datetime.fromtimestamp` (including DST) without a per-row call.
+
+    The UTC offset is looked up once per distinct hour; hours in which the
+    offset changes (non-hour-aligned DST transitions) are resolved per row.
+    """
+    buckets = timestamps // 3600
+    unique_buckets, inverse = np.unique(buckets, return_inverse=True)
+
+    starts = unique_buckets * 3600
+    start_offsets = np.fromiter((time.localtime(int(t)).tm_gmtoff for t in starts), dtype=np.int64, count=len(starts))
+    end_offsets = np.fromiter((time.localtime(int(t) + 3599).tm_gmtoff for t in starts), dtype=np.int64, count=len(starts))
+
+    local = timestamps + start_offsets[inverse]
+
+    mixed = (start_offsets != end_offsets)[inverse]
+    if mixed.any():
+        for i in np.flatnonzero(mixed):
+            local[i] = timestamps[i] + time.localtime(int(timestamps[i])).tm_gmtoff
+    return local
+
+
+def summarize_signature_page(result: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict], int, int]:
+    """
+    Columnar equivalent of `_summarize_signature_page`.
+
+    Returns:
+        Tuple of (signatures, hourly_activity, program_usage, success_count, total_fees)
+    """
+    from app.services.helius_service import _summarize_signature_page
+
+    n = len(result)
+
+    # 1. Load the columns once
+    block_times = [tx.get("blockTime") for tx in result]
+    times = np.array([t or 0 for t in block_times])
+    if n and times.dtype.kind != "i":
+        # Non-integer block times: let the reference implementation handle them
+        return _summarize_signature_page(result)
+
+    has_time = times != 0
+    if has_time.any():
+        valid = times[has_time]
+        if valid.min() < _MIN_TIMESTAMP or valid.max() > _MAX_TIMESTAMP:
+            return _summarize_signature_page(result)
+
+    success = np.fromiter(
+        (tx.get("confirmationStatus") == "finalized" and not tx.get("err") for tx in result), dtype=bool, count=n
+    )
+    fees = [tx["fee"] for tx in result if "fee" in tx]
+
+    # 2. Bulk time conversion: local wall clock, hour-of-day histogram and readable strings
+    readable = [None] * n
+    hourly_activity = []
+    if has_time.any():
+        local = _local_seconds(times[has_time])
+        hour_counts = np.bincount((local // 3600) % 24, minlength=24)
+        hourly_activity = [{"hour": int(hour), "count": int(hour_counts[hour])} for hour in np.flatnonzero(hour_counts)]
+
+        strings = np.datetime_as_string(local.astype("datetime64[s]"), unit="s")
+        for i, text in zip(np.flatnonzero(has_time), strings.tolist()):
+            readable[i] = text.replace("T", " ")
+
+    # 3. Program counts from memos (string work, kept in first-seen order for stable ties)
+    programs_involved = {}
+    for tx in result:
+        memo = tx.get("memo")
+        if memo and isinstance(memo, str):
+            for account_key in memo.split(','):
+                if account_key and len(account_key) > 10:
+                    programs_involved[account_key] = programs_involved.get(account_key, 0) + 1
+
+    program_usage = [{"program": program, "count": count}
+                     for program, count in sorted(programs_involved.items(),
+                                                  key=lambda item: item[1],
+                                                  reverse=True)][:10]
+
+    # 4. Rows
+    statuses = np.where(success, "success", "failed").tolist()
+    signatures = [
+        {
+            "signature": tx.get("signature"),
+            "blockTime": block_time,
+            "readableTime": readable_time,
+            "slot": tx.get("slot"),
+            "err": tx.get("err"),
+            "status": status,
+            "fee": tx.get("fee"),
+            "memo": tx.get("memo")
+        }
+        for tx, block_time, readable_time, status in zip(result, block_times, readable, statuses)
+    ]
+
+    return signatures, hourly_activity, program_usage, int(success.sum()), sum(fees)
@@ -0,0 +1,189 @@
+"""
+Micro-benchmark: stdlib vs fast (orjson) JSON for the three core routes.
+
+For /token-holders, /wallet/tokens and /transactions it times decoding the
+upstream JSON-RPC bodies and encoding the route's response body, with the
+stdlib provider, the fast provider, and the fast provider without key
+sorting. Upstream bodies come from recorded fixtures in
+`benchmarks/fixtures/` (capture them from a live endpoint with `--record`);
+methods without a recording use deterministic synthetic bodies of the same
+shape.
+
+    python benchmarks/bench_json.py [--repeat 20]
+    python benchmarks/bench_json.py --record --wallet <wallet> [--mint <mint>] [--address <address>]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+from app import create_app
+from app.config import Config
+from app.services import fast_json
+from app.services.helius_service import (
+    _build_top_holders,
+    _token_accounts_params,
+    _parse_token_accounts,
+    _apply_token_supplies,
+    _build_token_accounts_response,
+    _build_signatures_response,
+)
+
+
+def _address(rng: random.Random) -> str:
+    alphabet = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    return "".join(rng.choice(alphabet) for _ in range(44))
+
+
+def _synthetic(method: str) -> dict:
+    rng = random.Random(method)
+    if method == "getTokenSupply":
+        result = {"context": {"slot": 250_000_000}, "value": {
+            "amount": "88866500729658950", "decimals": 5, "uiAmount": 888665007296.5895, "uiAmountString": "888665007296.5895"}}
+    elif method == "getTokenLargestAccounts":
+        result = {"context": {"slot": 250_000_000}, "value": [
+            {"address": _address(rng), "amount": str(amount), "decimals": 5, "uiAmount": amount / 1e5,
+             "uiAmountString": str(amount / 1e5)}
+            for amount in sorted((rng.randrange(10 ** 12, 10 ** 16) for _ in range(20)), reverse=True)
+        ]}
+    elif method == "getTokenAccountsByOwner":
+        owner = _address(rng)
+        accounts = []
+        for _ in range(2000):
+            decimals = rng.choice((0, 5, 6, 9))
+            amount = rng.randrange(0, 10 ** 12)
+            accounts.append({"account": {
+                "data": {"parsed": {"info": {
+                    "isNative": False, "mint": _address(rng), "owner": owner, "state": "initialized",
+                    "tokenAmount": {"amount": str(amount), "decimals": decimals, "uiAmount": amount / 10 ** decimals,
+                                    "uiAmountString": str(amount / 10 ** decimals)},
+                }, "type": "account"}, "program": "spl-token", "space": 165},
+                "executable": False, "lamports": 2039280, "owner": TOKEN_PROGRAM, "rentEpoch": 18446744073709551615,
+                "space": 165,
+            }, "pubkey": _address(rng)})
+        result = {"context": {"slot": 250_000_000}, "value": accounts}
+    elif method == "getSignaturesForAddress":
+        result = [
+            {"blockTime": 1_700_000_000 - i * 37, "confirmationStatus": "finalized",
+             "err": None if rng.random() > 0.1 else {"InstructionError": [0, {"Custom": 1}]},
+             "memo": None, "signature": _address(rng) + _address(rng), "slot": 250_000_000 - i}
+            for i in range(1000)
+        ]
+    else:
+        raise ValueError(method)
+    return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+
+def load_fixture(method: str):
+    """Return (raw body bytes, origin) for a method's recorded or synthetic upstream response."""
+    path = os.path.join(FIXTURES, f"{method}.json")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read(), "recorded"
+    return json.dumps(_synthetic(method)).encode(), "synthetic"
+
+
+def record(mint: str, wallet: str, address: str):
+    """Capture live upstream bodies from HELIUS_RPC_URL into benchmarks/fixtures/."""
+    import requests
+
+    calls = {
+        "getTokenLargestAccounts": [mint],
+        "getTokenSupply": [mint],
+        "getTokenAccountsByOwner": _token_accounts_params(wallet),
+        "getSignaturesForAddress": [address, {"limit": 1000}],
+    }
+    os.makedirs(FIXTURES, exist_ok=True)
+    for method, params in calls.items():
+        resp = requests.post(Config.HELIUS_RPC_URL, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params},
+                             timeout=60)
+        resp.raise_for_status()
+        with open(os.path.join(FIXTURES, f"{method}.json"), "wb") as f:
+            f.write(resp.content)
+        print(f"recorded {method}: {len(resp.content) / 1024:.0f} KB")
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--record", action="store_true", help="Capture fixtures from the live RPC endpoint")
+    parser.add_argument("--mint", default="DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263")
+    parser.add_argument("--wallet", help="Wallet with many token accounts (required with --record)")
+    parser.add_argument("--address", help="Address for the signature page (default: the mint)")
+    args = parser.parse_args()
+    args.address = args.address or args.mint
+
+    if args.record:
+        if not args.wallet:
+            parser.error("--record needs --wallet")
+        record(args.mint, args.wallet, args.address)
+        return
+
+    if not fast_json.available():
+        print("orjson is not installed (pip install orjson); only the stdlib path would be measured")
+        return
+
+    def app_with(**settings):
+        return create_app(type("BenchConfig", (Config,), settings))
+
+    std_app = app_with(JSON_PROVIDER="std")
+    fast_app = app_with(JSON_PROVIDER="auto")
+    unsorted_app = app_with(JSON_PROVIDER="auto", JSON_SORT_KEYS=False)
+
+    bodies = {method: load_fixture(method) for method in
+              ("getTokenLargestAccounts", "getTokenSupply", "getTokenAccountsByOwner", "getSignaturesForAddress")}
+    result = {method: json.loads(raw)["result"] for method, (raw, _) in bodies.items()}
+
+    def wallet_body():
+        tokens = _parse_token_accounts(result["getTokenAccountsByOwner"])
+        _apply_token_supplies(tokens, {token["mint"]: result["getTokenSupply"] for token in tokens})
+        return _build_token_accounts_response(args.wallet or "wallet", tokens)
+
+    with std_app.app_context():
+        routes = [
+            ("/token-holders", ["getTokenLargestAccounts", "getTokenSupply"],
+             _build_top_holders(result["getTokenLargestAccounts"], result["getTokenSupply"], 20)),
+            ("/wallet/tokens", ["getTokenAccountsByOwner"], wallet_body()),
+            ("/transactions", ["getSignaturesForAddress"],
+             _build_signatures_response(args.address, 1000, result["getSignaturesForAddress"])),
+        ]
+
+    print("fixtures: " + ", ".join(f"{m} {len(raw) / 1024:.0f} KB ({origin})" for m, (raw, origin) in bodies.items()))
+    print(f"{'route':<16} {'decode std':>11} {'decode fast':>12} {'encode std':>11} {'encode fast':>12} "
+          f"{'unsorted':>9} {'speedup':>8}   (best of {args.repeat}, ms)")
+    for route, methods, response_body in routes:
+        raws = [bodies[m][0] for m in methods]
+        decode_std = best_of(lambda: [json.loads(raw) for raw in raws], args.repeat)
+        decode_fast = best_of(lambda: [fast_json.loads(raw) for raw in raws], args.repeat)
+
+        timings = []
+        for app in (std_app, fast_app, unsorted_app):
+            with app.app_context():
+                timings.append(best_of(lambda: app.json.response(response_body).get_data(), args.repeat))
+        encode_std, encode_fast, encode_unsorted = timings
+
+        speedup = (decode_std + encode_std) / (decode_fast + encode_fast)
+        print(f"{route:<16} {decode_std * 1000:>11.2f} {decode_fast * 1000:>12.2f} {encode_std * 1000:>11.2f} "
+              f"{encode_fast * 1000:>12.2f} {encode_unsorted * 1000:>9.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
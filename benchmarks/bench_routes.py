@@ -0,0 +1,206 @@
+"""
+Route benchmark suite: every API route at fixed concurrency against the stub RPC.
+
+Starts the stub RPC (synthetic, or replaying recorded fixtures with
+`--fixtures`) with a fixed latency and jitter, boots the backend in a
+subprocess pointed at it through HELIUS_RPC_URL (no API key involved), and
+drives each route in turn with `--concurrency` requests in flight. Per route
+it reports throughput and p50/p95/p99 latency. Upstream and route caches and
+the credit budget are off unless `--cache` is given, so every request does
+its full upstream work; rarity routes serve an index built during warm-up.
+
+Results can be saved as a JSON baseline and compared against a previous one;
+the comparison exits non-zero when any route's p95 grew, or its throughput
+fell, by more than `--tolerance` percent. Baselines are only comparable on
+the same machine and settings.
+
+    python benchmarks/bench_routes.py [--concurrency 8] [--requests 200] [--routes token-holders,wallet-tokens]
+    python benchmarks/bench_routes.py --save benchmarks/baselines/main.json
+    python benchmarks/bench_routes.py --compare benchmarks/baselines/main.json [--tolerance 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import httpx
+
+from load_test import _free_port, _wait_for, _percentile
+from stub_rpc import ASSETS, COLLECTION, MINTS, _key
+from base58 import b58encode
+
+MINT = b58encode(MINTS[0]).decode()
+WALLET = b58encode(_key("wallet")).decode()
+ADDRESS = MINT
+ASSET = ASSETS[7]["id"]
+
+# name -> (method, path, JSON body)
+ROUTES = {
+    "token-holders": ("GET", f"/api/token-holders/{MINT}/20", None),
+    "token-holders-distribution": ("GET", f"/api/token-holders/{MINT}/distribution", None),
+    "wallet-tokens": ("GET", f"/api/wallet/tokens/{WALLET}", None),
+    "transactions": ("GET", f"/api/transactions/{ADDRESS}?limit=100", None),
+    "transactions-export": ("GET", f"/api/transactions/{ADDRESS}/export?page_size=1000", None),
+    "transactions-analytics": ("GET", f"/api/transactions/{ADDRESS}/analytics", None),
+    "assets": ("GET", f"/api/assets/collection/{COLLECTION}?limit=100", None),
+    "assets-all": ("GET", f"/api/assets/collection/{COLLECTION}/all", None),
+    "rarity": ("GET", f"/api/assets/collection/{COLLECTION}/rarity", None),
+    "rarity-asset": ("GET", f"/api/assets/collection/{COLLECTION}/rarity/{ASSET}", None),
+    "bulk-token-holders": ("POST", "/api/bulk/token-holders",
+                           {"mints": [b58encode(mint).decode() for mint in MINTS[:50]], "limit": 10}),
+    "bulk-wallet-tokens": ("POST", "/api/bulk/wallet/tokens",
+                           {"wallets": [b58encode(_key(f"wallet{i}")).decode() for i in range(50)]}),
+}
+
+SERVERS = {
+    "gunicorn": ["gunicorn", "-w", "{workers}", "-k", "gthread", "--threads", "{threads}", "-b", "127.0.0.1:{port}",
+                 "run:app"],
+    "uvicorn": ["uvicorn", "asgi:app", "--workers", "{workers}", "--host", "127.0.0.1", "--port", "{port}",
+                "--log-level", "warning"],
+}
+
+
+async def _drive(port: int, method: str, path: str, body, concurrency: int, total: int):
+    latencies = []
+    errors = 0
+    queue = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+
+        async def worker():
+            nonlocal errors
+            for _ in queue:
+                start = time.perf_counter()
+                try:
+                    resp = await client.request(method, path, json=body)
+                    if resp.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list:
+    """Print the change per route against `baseline`; return the routes that regressed beyond `tolerance` %."""
+    regressed = []
+    print(f"\nagainst baseline from {baseline['meta'].get('date', '?')} (tolerance {tolerance:.0f}%):")
+    print(f"{'route':<24} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, current in results.items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            print(f"{name:<24} {'(new)':>9}")
+            continue
+
+        def change(key):
+            return (current[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+
+        print(f"{name:<24} {change('rps'):>+8.1f}% {change('p50_ms'):>+8.1f}% {change('p95_ms'):>+8.1f}% "
+              f"{change('p99_ms'):>+8.1f}%")
+        if change("p95_ms") > tolerance or change("rps") < -tolerance or current["errors"] > before["errors"]:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--routes", default=",".join(ROUTES), help="Comma-separated route names")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route first")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub RPC latency")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Stub RPC latency jitter")
+    parser.add_argument("--fixtures", help="Replay recorded responses from this directory (see stub_rpc.py)")
+    parser.add_argument("--server", choices=sorted(SERVERS), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="Threads per gunicorn worker")
+    parser.add_argument("--cache", action="store_true", help="Leave the upstream and route caches on")
+    parser.add_argument("--save", help="Write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="Compare against this JSON baseline file")
+    parser.add_argument("--tolerance", type=float, default=10, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.routes.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)} (known: {', '.join(ROUTES)})")
+
+    # The stub runs in its own process so it doesn't share a GIL with the load generator
+    stub_port = _free_port()
+    stub_cmd = [sys.executable, os.path.join(ROOT, "benchmarks", "stub_rpc.py"), "--port", str(stub_port),
+                "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms)]
+    if args.fixtures:
+        stub_cmd += ["--fixtures", args.fixtures]
+    stub = subprocess.Popen(stub_cmd, stdout=subprocess.DEVNULL)
+
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("HELIUS_", "ROUTE_CACHE_"))}
+    env.update(HELIUS_RPC_URL=f"http://127.0.0.1:{stub_port}/", HELIUS_RATE_LIMIT_ENABLED="false",
+               PYTHONPATH=ROOT)
+    if not args.cache:
+        env.update(HELIUS_CACHE_ENABLED="false", ROUTE_CACHE_ENABLED="false")
+
+    port = _free_port()
+    command = [part.format(port=port, workers=args.workers, threads=args.threads) for part in SERVERS[args.server]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    results = {}
+    try:
+        _wait_for(stub_port)
+        _wait_for(port)
+        print(f"{args.server} x{args.workers}, stub RPC {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms"
+              f"{' replaying ' + args.fixtures if args.fixtures else ''}, {args.concurrency} in flight, "
+              f"{args.requests} requests per route")
+        print(f"{'route':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name in names:
+            method, path, body = ROUTES[name]
+            if args.warmup:
+                asyncio.run(_drive(port, method, path, body, args.concurrency, args.warmup))
+            result = results[name] = asyncio.run(_drive(port, method, path, body, args.concurrency, args.requests))
+            print(f"{name:<24} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                  f"{result['p99_ms']:>9.1f} {result['errors']:>7}")
+    finally:
+        server.terminate()
+        server.wait()
+        stub.terminate()
+        stub.wait()
+
+    if args.save:
+        meta = {key: getattr(args, key) for key in
+                ("server", "workers", "threads", "concurrency", "requests", "latency_ms", "jitter_ms", "fixtures",
+                 "cache")}
+        meta.update(date=time.strftime("%Y-%m-%dT%H:%M:%S"), python=platform.python_version(),
+                    machine=platform.node(), cpus=os.cpu_count())
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "routes": results}, f, indent=2)
+        print(f"\nbaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(json.load(f), results, args.tolerance)
+        if regressed:
+            print(f"regressed: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
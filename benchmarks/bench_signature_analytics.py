@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: per-row vs columnar analytics for getSignaturesForAddress pages.
+
+Builds synthetic pages of 1k, 10k and 100k signatures, checks that both paths
+produce identical output, and reports the best-of-N time for each.
+
+    python benchmarks/bench_signature_analytics.py [--repeat 5] [--sizes 1000,10000,100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+from app import create_app
+from app.services import vectorized
+from app.services.helius_service import _summarize_signature_page
+
+
+def synthetic_page(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    programs = [f"Prog{i:040d}" for i in range(40)]
+    now = 1_700_000_000
+    page = []
+    for i in range(size):
+        memo = None
+        if rng.random() < 0.3:
+            memo = ",".join(rng.sample(programs, rng.randint(1, 3)))
+        page.append({
+            "signature": f"sig{i:064d}",
+            "blockTime": now - i * rng.randint(1, 900) if rng.random() > 0.01 else None,
+            "slot": 250_000_000 - i,
+            "err": {"InstructionError": [0, "Custom"]} if rng.random() < 0.05 else None,
+            "confirmationStatus": "finalized" if rng.random() > 0.02 else "confirmed",
+            "fee": 5000,
+            "memo": memo,
+        })
+    return page
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    if not vectorized.available():
+        sys.exit("NumPy is not installed; the columnar path is unavailable (pip install numpy)")
+
+    app = create_app()
+    with app.app_context():
+        print(f"{'rows':>8} {'python (ms)':>12} {'columnar (ms)':>14} {'speedup':>8}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            page = synthetic_page(size)
+            if vectorized.summarize_signature_page(page) != _summarize_signature_page(page):
+                sys.exit(f"Output mismatch for {size} rows")
+
+            python_time = best_of(lambda: _summarize_signature_page(page), args.repeat)
+            columnar_time = best_of(lambda: vectorized.summarize_signature_page(page), args.repeat)
+            print(f"{size:>8} {python_time * 1000:>12.2f} {columnar_time * 1000:>14.2f} {python_time / columnar_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
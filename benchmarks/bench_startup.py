@@ -0,0 +1,186 @@
+"""
+Cold-start benchmark: import time and time to first response of a fresh process.
+
+Each run starts a new interpreter that imports the entry point (`run:app`
+by default, the module vercel.json deploys) and sends its first requests
+through the WSGI app in-process: `/health`, `/get-docs-json` and one API
+route answered by the stub RPC. Reported per step, as median and p95 over
+`--runs`:
+
+- interpreter: process spawn until the entry point starts importing
+- import: importing the entry point, including create_app
+- first <route>: the first request to each route in that process
+- first response: process spawn until the first /health response
+
+With `--server gunicorn` or `--server uvicorn` the entry point is started as
+a real server instead, and only spawn to first /health response over HTTP is
+measured. `--no-bytecode` runs against a copy of the sources without .pyc
+files, as a read-only deploy that ships none compiles them on every cold
+start (installed packages keep the bytecode pip compiled). `--importtime N`
+lists the N slowest imports the app's own modules pull in.
+
+    python benchmarks/bench_startup.py [--runs 10] [--entry run:app] [--no-bytecode]
+    python benchmarks/bench_startup.py --server gunicorn
+    python benchmarks/bench_startup.py --importtime 15
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from load_test import _free_port, _percentile
+from bench_routes import SERVERS
+from stub_rpc import MINTS, start_stub
+from base58 import b58encode
+
+ROUTES = [
+    ("/health", "/health"),
+    ("/get-docs-json", "/get-docs-json"),
+    ("token-holders", f"/api/token-holders/{b58encode(MINTS[0]).decode()}/20"),
+]
+
+# Runs in the fresh interpreter: argv = spawn time, entry point, routes (JSON)
+CHILD = """
+import importlib, json, sys, time
+started = time.time()
+spawned = float(sys.argv[1])
+module, attr = sys.argv[2].split(":")
+begin = time.perf_counter()
+app = getattr(importlib.import_module(module), attr)
+result = {"interpreter": (started - spawned) * 1000, "import": (time.perf_counter() - begin) * 1000, "errors": 0}
+client = app.test_client()
+for name, path in json.loads(sys.argv[3]):
+    begin = time.perf_counter()
+    if client.get(path).status_code != 200:
+        result["errors"] += 1
+    result["first " + name] = (time.perf_counter() - begin) * 1000
+    if name == "/health":
+        result["first response"] = (time.time() - spawned) * 1000
+print(json.dumps(result))
+"""
+
+
+def _environment(stub_port: int) -> dict:
+    env = {key: value for key, value in os.environ.items() if not key.startswith("HELIUS_")}
+    env.update(HELIUS_RPC_URL=f"http://127.0.0.1:{stub_port}/")
+    return env
+
+
+def _source_copy() -> str:
+    """The app sources without any bytecode, in a temporary directory."""
+    target = tempfile.mkdtemp(prefix="perceptchain-cold-")
+    shutil.copytree(os.path.join(ROOT, "app"), os.path.join(target, "app"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    for name in ("run.py", "asgi.py"):
+        shutil.copy(os.path.join(ROOT, name), target)
+    return target
+
+
+def _in_process_run(entry: str, cwd: str, env: dict) -> dict:
+    spawned = time.time()
+    out = subprocess.run([sys.executable, "-c", CHILD, repr(spawned), entry, json.dumps(ROUTES)],
+                         cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _server_run(server: str, entry: str, cwd: str, env: dict, timeout: float = 30) -> dict:
+    port = _free_port()
+    command = [part.format(port=port, workers=1, threads=4) for part in SERVERS[server]]
+    command = [entry if part in ("run:app", "asgi:app") else part for part in command]
+    spawned = time.time()
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.time() - spawned < timeout:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/health")
+                if conn.getresponse().status == 200:
+                    return {"first response": (time.time() - spawned) * 1000, "errors": 0}
+            except OSError:
+                time.sleep(0.005)
+        return {"errors": 1}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def slowest_imports(entry: str, cwd: str, env: dict, count: int):
+    """Print the `count` slowest modules imported directly by the entry point or an app module."""
+    module = entry.split(":")[0]
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+    # importtime lists every module after the ones it imported, one indentation level deeper
+    pending = []  # (depth, name, cumulative us) not yet attributed to an importer
+    pulled_in = []
+    for line in out.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(1)), len(match.group(2)), match.group(3)
+        children = [item for item in pending if item[0] > depth]
+        pending = [item for item in pending if item[0] <= depth] + [(depth, name, cumulative)]
+        if name == module or name.startswith("app"):
+            pulled_in += [(us, child, name) for _, child, us in children if not child.startswith("app")]
+
+    print(f"\nslowest imports made by {module} and app modules:")
+    for us, name, importer in sorted(pulled_in, reverse=True)[:count]:
+        print(f"{us / 1000:>9.1f} ms  {name:<32} (from {importer})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes started")
+    parser.add_argument("--entry", help="Entry point, module:attribute (default run:app, asgi:app under uvicorn)")
+    parser.add_argument("--server", choices=sorted(SERVERS), help="Start a real server instead of using the WSGI app")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub RPC latency")
+    parser.add_argument("--no-bytecode", action="store_true", help="Run app sources without .pyc files")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="Also list the N slowest imports")
+    args = parser.parse_args()
+    entry = args.entry or ("asgi:app" if args.server == "uvicorn" else "run:app")
+
+    stub = start_stub(latency_ms=args.latency_ms)
+    env = _environment(stub.server_address[1])
+    cwd = ROOT
+    if args.no_bytecode:
+        cwd = _source_copy()
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    try:
+        runs = []
+        for _ in range(args.runs):
+            if args.server:
+                runs.append(_server_run(args.server, entry, cwd, env))
+            else:
+                runs.append(_in_process_run(entry, cwd, env))
+
+        print(f"{entry} {'under ' + args.server if args.server else 'in-process'}, {args.runs} runs"
+              f"{', no bytecode' if args.no_bytecode else ''}, stub RPC {args.latency_ms:.0f}ms")
+        print(f"{'step':<28} {'median ms':>10} {'p95 ms':>10}")
+        steps = sorted((key for key in runs[0] if key != "errors"), key=lambda key: key == "first response")
+        for step in steps:
+            values = [run[step] for run in runs if step in run]
+            print(f"{step:<28} {_percentile(values, 50):>10.1f} {_percentile(values, 95):>10.1f}")
+        errors = sum(run["errors"] for run in runs)
+        if errors:
+            print(f"errors: {errors}")
+
+        if args.importtime:
+            slowest_imports(entry, cwd, env, args.importtime)
+    finally:
+        stub.shutdown()
+        if cwd != ROOT:
+            shutil.rmtree(cwd, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: jsonParsed vs lean (base64) getTokenAccountsByOwner handling.
+
+For wallets of increasing size it compares the upstream body size and the
+CPU time to turn that body into the /wallet/tokens token list: decoding the
+JSON and walking the parsed dicts, versus unpacking the first 72 bytes of
+each raw account (with the mint table already warm, as it is after the
+first request for any wallet holding those mints), after checking that
+both paths build the same list and that a wallet mixing mints of known and
+unknown decimals still gets a response. Bodies come from the
+benchmark stub, so both encodings carry identical accounts; a third of them
+have a zero balance. Account envelopes (pubkey, lamports, ...) are the same
+in both, so real savings grow with how much of the body is account data.
+
+    python benchmarks/bench_token_accounts.py [--accounts 100,1000,5000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+import stub_rpc
+from app import create_app
+from app.services import fast_json, spl_token
+from app.services.helius_service import _parse_token_accounts, _build_token_accounts_response
+
+WALLET = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+
+def body(accounts: int, encoding: str) -> bytes:
+    data_slice = spl_token.HEAD_SLICE if encoding == "base64" else None
+    value = [stub_rpc._token_account(WALLET, i, encoding, data_slice) for i in range(accounts)]
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"context": {"slot": 1}, "value": value}}).encode()
+
+
+def check_unknown_decimals(result):
+    """Tokens whose mint decimals are unknown get a null uiAmount and sort after every other token."""
+    half = spl_token.MintTable()
+    half.update(dict(list(stub_rpc.MINT_DECIMALS.items())[::2]))
+    tokens = _build_token_accounts_response(
+        WALLET, spl_token.build_token_list(spl_token.decode_token_accounts(result, half), half)
+    )["tokens"]
+    unknown = [token for token in tokens if token["uiAmount"] is None]
+    assert unknown and len(unknown) < len(tokens), "expected a mix of known and unknown decimals"
+    assert all("error" in token for token in unknown), "unknown decimals must be flagged"
+    assert tokens[-len(unknown):] == unknown, "tokens with unknown decimals must sort last"
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", default="100,1000,5000", help="Comma-separated wallet sizes")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    mint_table = spl_token.MintTable()
+    mint_table.update(stub_rpc.MINT_DECIMALS)
+
+    print(f"{'accounts':>8} {'jsonParsed KB':>14} {'base64 KB':>10} {'parsed ms':>10} {'lean ms':>8} {'speedup':>8}"
+          f"   (best of {args.repeat}, JSON via {'orjson' if fast_json.available() else 'stdlib'})")
+    with app.app_context():
+        for accounts in (int(n) for n in args.accounts.split(",")):
+            parsed_raw, lean_raw = body(accounts, "jsonParsed"), body(accounts, "base64")
+
+            def parsed():
+                return _parse_token_accounts(fast_json.loads(parsed_raw)["result"])
+
+            def lean():
+                result = fast_json.loads(lean_raw)["result"]
+                return spl_token.build_token_list(spl_token.decode_token_accounts(result, mint_table), mint_table)
+
+            assert parsed() == lean(), "lean and jsonParsed token lists differ"
+            check_unknown_decimals(fast_json.loads(lean_raw)["result"])
+            parsed_s, lean_s = best_of(parsed, args.repeat), best_of(lean, args.repeat)
+            print(f"{accounts:>8} {len(parsed_raw) / 1024:>14.0f} {len(lean_raw) / 1024:>10.0f} "
+                  f"{parsed_s * 1000:>10.2f} {lean_s * 1000:>8.2f} {parsed_s / lean_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Connection reuse check: API requests must share pooled keep-alive connections to Helius.
+
+Starts a stub RPC server that counts the TCP connections it accepts and
+sends `/api/transactions/<address>` requests (one upstream call each)
+through the app, first one at a time and then from several threads, for
+each HTTP client the transport can use. With keep-alive, sequential
+requests must all ride one connection and concurrent ones at most one
+connection per thread. The transport's own `/stats/transport` counts must
+match what the server saw. A run with HELIUS_KEEPALIVE disabled shows the
+counts the check would catch. Exits non-zero if an expectation fails.
+Like failover_test.py, it is a manual check; nothing runs it automatically.
+
+    python benchmarks/connection_reuse_test.py [--requests 50] [--concurrency 4]
+"""
+import argparse
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+from stub_rpc import start_stub
+
+ADDRESS = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+
+def _send(client, total: int, concurrency: int) -> int:
+    """Send `total` requests from `concurrency` threads; returns the number that failed."""
+    errors = []
+    queue = iter(range(total))
+    lock = threading.Lock()
+
+    def worker():
+        for i in queue:
+            if client.get(f"/api/transactions/{ADDRESS}?limit={i % 50 + 1}").status_code != 200:
+                with lock:
+                    errors.append(i)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(errors)
+
+
+def _run(stub, http2: bool, keepalive: bool, total: int, concurrency: int):
+    from app import create_app
+    from app.config import Config
+
+    class ReuseConfig(Config):
+        HELIUS_RPC_URL = f"http://127.0.0.1:{stub.server_address[1]}/"
+        HELIUS_HTTP2 = http2
+        HELIUS_KEEPALIVE = keepalive
+        HELIUS_WARMUP_CONNECTIONS = 0
+        HELIUS_CACHE_ENABLED = False
+        HELIUS_RATE_LIMIT_ENABLED = False
+
+    app = create_app(ReuseConfig)
+    app.logger.setLevel("ERROR")
+    client = app.test_client()
+
+    start = stub.connections
+    errors = _send(client, total, 1)
+    sequential = stub.connections - start
+    start = stub.connections
+    errors += _send(client, total, concurrency)
+    concurrent = stub.connections - start
+
+    stats = client.get("/stats/transport").json
+    app.extensions["helius_transport"].close()
+    return sequential, concurrent, errors, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per phase")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    stub = start_stub(latency_ms=10)
+    try:
+        import h2  # noqa: F401
+        clients = [("requests", False), ("httpx", True)]
+    except ImportError:
+        clients = [("requests", False)]
+
+    checks = []
+    print(f"{'client':<20} {'sequential conns':>17} {'concurrent conns':>17} {'errors':>7}  transport stats")
+    for name, http2 in clients:
+        for keepalive in (True, False):
+            sequential, concurrent, errors, stats = _run(stub, http2, keepalive, args.requests, args.concurrency)
+            label = name + ("" if keepalive else " (no keep-alive)")
+            print(f"{label:<20} {sequential:>17} {concurrent:>17} {errors:>7}  "
+                  f"requests={stats['requests']} created={sum(h['created'] for h in stats['hosts'].values())} "
+                  f"open={stats['open']} idle={stats['idle']} inUse={stats['inUse']}")
+
+            checks.append((f"{label}: no client errors", not errors))
+            if keepalive:
+                created = sum(h["created"] for h in stats["hosts"].values())
+                checks.append((f"{name}: sequential requests share one connection", sequential == 1))
+                checks.append((f"{name}: concurrent requests use at most one connection per thread",
+                               concurrent <= args.concurrency))
+                checks.append((f"{name}: reported connections match the server's count",
+                               created == sequential + concurrent))
+                checks.append((f"{name}: pooled connections stay open and idle",
+                               stats["open"] >= 1 and stats["idle"] == stats["open"] and stats["inUse"] == 0))
+            else:
+                checks.append((f"{label}: every request opens a connection", sequential == args.requests))
+
+    print()
+    for name, ok in checks:
+        print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+    stub.shutdown()
+    sys.exit(0 if all(ok for _, ok in checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
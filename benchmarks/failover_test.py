@@ -0,0 +1,139 @@
+"""
+Failover scenario: the RPC router against several stub endpoints with injected faults.
+
+Starts three stub RPC servers with different latencies and routes
+`/api/transactions/<address>` through all of them, then walks through
+phases: healthy, the fastest endpoint turning slow, an endpoint failing
+every call (its circuit must open and no client request may fail), and
+that endpoint recovering (a probe must close the circuit again). Per phase
+it prints the share of calls each endpoint served, client errors and
+latency, and it exits non-zero if an expected behaviour is not observed.
+
+This is a manual check, not part of an automated suite (the repo has
+none): run it by hand before merging changes to the router or the stub.
+
+    python benchmarks/failover_test.py [--requests 300] [--concurrency 4]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+from stub_rpc import start_stub
+
+ADDRESS = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _run_phase(client, router, total: int, concurrency: int):
+    before = [e.requests for e in router.endpoints]
+    latencies, errors = [], []
+    queue = iter(range(total))
+    lock = threading.Lock()
+
+    def worker():
+        for i in queue:
+            start = time.perf_counter()
+            resp = client.get(f"/api/transactions/{ADDRESS}?limit={i % 50 + 1}")
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code != 200:
+                    errors.append(resp.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    served = [e.requests - b for e, b in zip(router.endpoints, before)]
+    return served, errors, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300, help="Requests per phase")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    stubs = {name: start_stub(latency_ms=latency) for name, latency in (("A", 20), ("B", 80), ("C", 160))}
+    handlers = {name: stub.RequestHandlerClass for name, stub in stubs.items()}
+
+    from app import create_app
+    from app.config import Config
+
+    class FailoverConfig(Config):
+        HELIUS_RPC_URLS = ",".join(f"http://127.0.0.1:{stub.server_address[1]}/" for stub in stubs.values())
+        HELIUS_ROUTER_OPEN_SECONDS = 1
+        HELIUS_CACHE_ENABLED = False
+        HELIUS_RATE_LIMIT_ENABLED = False
+
+    # Pay the process's cold start (lazy imports, first client) on a throwaway app, so the
+    # measured router's first latency samples reflect the endpoints rather than start-up
+    warmup = create_app(FailoverConfig)
+    warmup.logger.setLevel("ERROR")
+    _run_phase(warmup.test_client(), warmup.extensions["helius_rpc_router"], 2 * args.concurrency, args.concurrency)
+    warmup.extensions["helius_transport"].close()
+
+    app = create_app(FailoverConfig)
+    app.logger.setLevel("ERROR")
+    client = app.test_client()
+    router = app.extensions["helius_rpc_router"]
+    names = list(stubs)
+
+    def fault(name, latency_ms=None, failure_rate=None):
+        if latency_ms is not None:
+            handlers[name].latency = latency_ms / 1000.0
+        if failure_rate is not None:
+            handlers[name].failure_rate = failure_rate
+
+    phases = [
+        ("healthy", lambda: None),
+        ("A slow (300ms)", lambda: fault("A", latency_ms=300)),
+        ("B failing (503)", lambda: fault("B", failure_rate=1.0)),
+        ("B recovered", lambda: (fault("B", failure_rate=0.0), time.sleep(1.1))),
+    ]
+
+    checks = []
+    print(f"{'phase':<18} " + " ".join(f"{n:>6}" for n in names) + f" {'errors':>7} {'p50 ms':>8} {'p95 ms':>8}  states")
+    for label, apply in phases:
+        apply()
+        served, errors, latencies = _run_phase(client, router, args.requests, args.concurrency)
+        share = {name: count / max(1, sum(served)) for name, count in zip(names, served)}
+        states = {name: e.state for name, e in zip(names, router.endpoints)}
+        print(f"{label:<18} " + " ".join(f"{share[n]:>6.0%}" for n in names)
+              + f" {len(errors):>7} {_percentile(latencies, 50) * 1000:>8.1f} {_percentile(latencies, 95) * 1000:>8.1f}"
+              + "  " + ", ".join(f"{n}={s}" for n, s in states.items()))
+
+        if label == "healthy":
+            checks.append(("fastest endpoint serves most calls", share["A"] > 0.5))
+        elif label.startswith("A slow"):
+            checks.append(("traffic moves off the slow endpoint", share["B"] > share["A"]))
+        elif label.startswith("B failing"):
+            checks.append(("failing endpoint is ejected", states["B"] != "closed" and router.endpoints[1].ejections > 0))
+            checks.append(("no client errors while an endpoint fails", not errors))
+        else:
+            checks.append(("recovered endpoint is closed again", states["B"] == "closed"))
+            checks.append(("recovered endpoint takes traffic again", share["B"] > 0.5))
+
+    print()
+    for name, ok in checks:
+        print(f"{'PASS' if ok else 'FAIL'}  {name}")
+
+    for stub in stubs.values():
+        stub.shutdown()
+    sys.exit(0 if all(ok for _, ok in checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
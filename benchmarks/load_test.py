@@ -0,0 +1,167 @@
+"""
+Load test: sync (gunicorn) vs async (uvicorn) serving against a slow upstream.
+
+Starts the stub RPC server with a fixed latency, then for each serving mode
+boots the backend in a subprocess pointed at the stub and drives
+`/api/transactions/<address>` at increasing numbers of in-flight requests.
+With sync workers throughput flattens at (workers / latency); the ASGI mode
+keeps scaling with concurrency on a single worker process.
+
+    python benchmarks/load_test.py [--latency-ms 100] [--concurrency 1,8,32,128] [--requests 256]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("HELIUS_API_KEY", "benchmark")
+
+ADDRESS = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+
+def _bench_config():
+    from app.config import Config
+
+    class BenchConfig(Config):
+        HELIUS_RPC_URL = os.environ["STUB_RPC_URL"]
+        HELIUS_CACHE_ENABLED = False
+        HELIUS_RATE_LIMIT_ENABLED = False  # measure serving capacity, not the credit budget
+
+    return BenchConfig
+
+
+def wsgi_app():
+    """gunicorn factory: `benchmarks.load_test:wsgi_app()`."""
+    from app import create_app
+    return create_app(_bench_config())
+
+
+def asgi_app():
+    """uvicorn factory: `benchmarks.load_test:asgi_app --factory`."""
+    from app.asgi import create_asgi_app
+    return create_asgi_app(wsgi_app())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(port: int, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _drive(port: int, path: str, concurrency: int, total: int):
+    """
+    Each virtual client owns one connection (kept alive when the server allows), so the load generator
+    itself stays cheap (it shares the machine with the servers under test).
+    """
+    latencies = []
+    errors = 0
+    queue = iter(range(total))
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n\r\n".encode()
+
+    async def client():
+        nonlocal errors
+        writer = None
+        try:
+            for _ in queue:
+                start = time.perf_counter()
+                if writer is None:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                status = int((await reader.readline()).split()[1])
+                length, close = 0, False
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                    elif name.lower() == "connection":
+                        close = value.strip().lower() == "close"
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+                if close:
+                    # Sync workers don't keep connections alive
+                    writer.close()
+                    writer = None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return total / elapsed, _percentile(latencies, 50), _percentile(latencies, 95), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=256, help="Requests per concurrency level")
+    parser.add_argument("--sync-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    # The stub runs in its own process so it doesn't share a GIL with the load generator
+    stub_port = _free_port()
+    stub = subprocess.Popen([sys.executable, os.path.join(ROOT, "benchmarks", "stub_rpc.py"),
+                             "--port", str(stub_port), "--latency-ms", str(args.latency_ms)],
+                            stdout=subprocess.DEVNULL)
+    _wait_for(stub_port)
+    env = dict(os.environ, STUB_RPC_URL=f"http://127.0.0.1:{stub_port}/", PYTHONPATH=ROOT)
+
+    modes = [
+        (f"gunicorn sync x{args.sync_workers}",
+         ["gunicorn", "-w", str(args.sync_workers), "-k", "sync", "-b", "127.0.0.1:{port}",
+          "benchmarks.load_test:wsgi_app()"]),
+        ("uvicorn asgi x1",
+         ["uvicorn", "--factory", "benchmarks.load_test:asgi_app", "--host", "127.0.0.1", "--port", "{port}",
+          "--log-level", "warning"]),
+    ]
+
+    print(f"upstream latency {args.latency_ms:.0f}ms, {args.requests} requests per level")
+    print(f"{'mode':<22} {'in-flight':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for name, command in modes:
+        port = _free_port()
+        proc = subprocess.Popen([part.format(port=port) for part in command], cwd=ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_for(port)
+            path = f"/api/transactions/{ADDRESS}?limit=20"
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                rps, p50, p95, errors = asyncio.run(_drive(port, path, concurrency, args.requests))
+                print(f"{name:<22} {concurrency:>9} {rps:>9.1f} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {errors:>7}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    stub.terminate()
+    stub.wait()
+
+
+if __name__ == "__main__":
+    main()
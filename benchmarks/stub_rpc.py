@@ -0,0 +1,360 @@
+"""
+Stub Helius JSON-RPC server for benchmarks.
+
+Answers the methods the backend uses with canned, deterministic results
+after a configurable latency (plus uniform random jitter), so benchmarks
+measure the backend rather than the network. Single calls and batches are
+supported. A share of requests can be failed with HTTP 503 to exercise
+failover.
+
+With `--fixtures DIR` it replays recorded responses instead: each call is
+answered from `DIR/<method>-<params hash>.json` if that exact call was
+recorded, else from `DIR/<method>.json` (the files `bench_json.py --record`
+writes), else synthetically, or with a JSON-RPC error under `--strict`.
+Adding `--record` turns it into a proxy that forwards every request to
+`--upstream` (by default Helius mainnet for HELIUS_API_KEY) and saves each
+call's response into DIR; point the backend at it and exercise the routes
+once to capture a fixture set.
+
+    python benchmarks/stub_rpc.py --port 8899 --latency-ms 100 [--jitter-ms 20] [--failure-rate 0.1]
+    python benchmarks/stub_rpc.py --fixtures benchmarks/fixtures [--strict]
+    python benchmarks/stub_rpc.py --fixtures benchmarks/fixtures --record [--upstream <url>]
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import base58
+
+
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+
+# Token accounts returned per wallet and program; every third one has a zero balance
+TOKEN_ACCOUNTS = {TOKEN_PROGRAM: 10, TOKEN_2022_PROGRAM: 4}
+
+
+def _key(label: str) -> bytes:
+    return hashlib.sha256(label.encode()).digest()
+
+
+MINTS = [_key(f"mint{i}") for i in range(64)]
+MINT_SUPPLY = 10 ** 12
+MINT_DECIMALS = {base58.b58encode(mint).decode(): (0, 5, 6, 9)[i % 4] for i, mint in enumerate(MINTS)}
+
+# Token accounts of every stub mint, for getProgramAccounts scans; balances fall off as 1/rank
+# and every tenth account is empty
+HOLDER_ACCOUNTS = 5000
+
+# Signature history length of every address
+SIGNATURES = 5000
+
+# One NFT collection served for every getAssetsByGroup query
+COLLECTION = base58.b58encode(_key("collection")).decode()
+TRAITS = {
+    "Background": ["Blue", "Green", "Red", "Gold", "Void"],
+    "Eyes": ["Round", "Sleepy", "Laser", "Wink", "Closed", "Star", "Heart", "Visor"],
+    "Hat": ["None", "Cap", "Crown", "Beanie", "Halo", "Helmet", "Bandana", "Top Hat", "Fez", "Horns", "Bow", "Wizard"],
+}
+
+
+def _asset(i: int) -> dict:
+    """DAS asset `i` of the stub collection; trait values are skewed so some are rare."""
+    attributes = [
+        {"trait_type": trait, "value": values[min(len(values) - 1, (i * (j + 7)) % 97 // (j + 4))]}
+        for j, (trait, values) in enumerate(TRAITS.items())
+    ]
+    return {
+        "id": base58.b58encode(_key(f"asset{i}")).decode(),
+        "content": {"metadata": {"name": f"Stub #{i}", "symbol": "STUB", "attributes": attributes},
+                    "links": {"image": f"https://example.invalid/{i}.png"}},
+        "ownership": {"owner": base58.b58encode(_key(f"owner{i % 300}")).decode()},
+        "grouping": [{"group_key": "collection", "group_value": COLLECTION}],
+    }
+
+
+ASSETS = [_asset(i) for i in range(2000)]
+
+
+def _mint_account(mint_address: str, data_slice: dict = None) -> dict:
+    """The SPL mint account of a stub mint (supply 10^12 base units), base64-encoded."""
+    raw = bytes(36) + MINT_SUPPLY.to_bytes(8, "little") + bytes([MINT_DECIMALS[mint_address], 1]) + bytes(36)
+    if data_slice:
+        raw = raw[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+    return {"data": [base64.b64encode(raw).decode(), "base64"], "executable": False, "lamports": 1461600,
+            "owner": TOKEN_PROGRAM, "rentEpoch": 0, "space": 82}
+
+
+def _token_account(owner: str, i: int, encoding: str, data_slice: dict = None, program: str = TOKEN_PROGRAM) -> dict:
+    """Token account `i` of a wallet under `program`, in `jsonParsed` or `base64` encoding (same data either way)."""
+    if program != TOKEN_PROGRAM:
+        i += len(MINTS) // 2
+    mint = MINTS[i % len(MINTS)]
+    mint_address = base58.b58encode(mint).decode()
+    decimals = MINT_DECIMALS[mint_address]
+    amount = 0 if i % 3 == 2 else (i + 1) * 10 ** 6 + i
+    address = base58.b58encode(_key(f"{owner}/{i}")).decode()
+    if encoding == "base64":
+        raw = mint + base58.b58decode(owner) + amount.to_bytes(8, "little") + bytes(93)
+        if data_slice:
+            raw = raw[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+        data = [base64.b64encode(raw).decode(), "base64"]
+    else:
+        ui_amount = float(amount) / 10 ** decimals
+        data = {"parsed": {"info": {
+            "isNative": False, "mint": mint_address, "owner": owner, "state": "initialized",
+            "tokenAmount": {"amount": str(amount), "decimals": decimals, "uiAmount": ui_amount,
+                            "uiAmountString": str(ui_amount)},
+        }, "type": "account"}, "program": "spl-token" if program == TOKEN_PROGRAM else "spl-token-2022", "space": 165}
+    return {"pubkey": address, "account": {"data": data, "executable": False, "lamports": 2039280,
+                                           "owner": program, "rentEpoch": 0, "space": 165}}
+
+
+def _holder_account(mint_address: str, i: int, data_slice: dict = None) -> dict:
+    """Token account `i` of a stub mint, base64-encoded."""
+    amount = 0 if i % 10 == 9 else MINT_SUPPLY // (16 * (i + 1))
+    raw = base58.b58decode(mint_address) + _key(f"holder{i}") + amount.to_bytes(8, "little") + bytes(93)
+    if data_slice:
+        raw = raw[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+    return {"pubkey": base58.b58encode(_key(f"{mint_address}/holder{i}")).decode(),
+            "account": {"data": [base64.b64encode(raw).decode(), "base64"], "executable": False,
+                        "lamports": 2039280, "owner": TOKEN_PROGRAM, "rentEpoch": 0, "space": 165}}
+
+
+def _result_for(method: str, params: list):
+    if method == "getHealth":
+        return "ok"
+    if method == "getTokenSupply":
+        decimals = MINT_DECIMALS.get(params[0], 6)
+        return {"value": {"amount": str(MINT_SUPPLY), "decimals": decimals,
+                          "uiAmount": float(MINT_SUPPLY) / 10 ** decimals,
+                          "uiAmountString": str(MINT_SUPPLY // 10 ** decimals)}}
+    if method == "getTokenLargestAccounts":
+        return {"value": [
+            {"address": f"Holder{i:038d}", "amount": str((20 - i) * 10 ** 9), "decimals": 6, "uiAmount": (20 - i) * 1000.0}
+            for i in range(20)
+        ]}
+    if method == "getTokenAccountsByOwner":
+        owner = params[0]
+        program = params[1].get("programId", TOKEN_PROGRAM)
+        options = params[2] if len(params) > 2 else {}
+        return {"value": [
+            _token_account(owner, i, options.get("encoding", "jsonParsed"), options.get("dataSlice"), program)
+            for i in range(TOKEN_ACCOUNTS.get(program, 0))
+        ]}
+    if method == "getMultipleAccounts":
+        data_slice = params[1].get("dataSlice") if len(params) > 1 else None
+        return {"value": [_mint_account(key, data_slice) if key in MINT_DECIMALS else None for key in params[0]]}
+    if method == "getProgramAccounts":
+        options = params[1] if len(params) > 1 else {}
+        mints = [f["memcmp"]["bytes"] for f in options.get("filters", ()) if "memcmp" in f and f["memcmp"]["offset"] == 0]
+        if params[0] != TOKEN_PROGRAM or not mints or mints[0] not in MINT_DECIMALS:
+            return []
+        return [_holder_account(mints[0], i, options.get("dataSlice")) for i in range(HOLDER_ACCOUNTS)]
+    if method == "getSignaturesForAddress":
+        options = params[1] if len(params) > 1 else {}
+        start = int(options["before"][3:]) + 1 if options.get("before") else 0
+        end = int(options["until"][3:]) if options.get("until") else SIGNATURES
+        return [
+            {
+                "signature": f"sig{i}",
+                "blockTime": 1_700_000_000 - i * 600,
+                "slot": 250_000_000 - i,
+                "err": None,
+                "confirmationStatus": "finalized",
+                "memo": None
+            }
+            for i in range(start, min(start + options.get("limit", 1000), end))
+        ]
+    if method == "getAssetsByGroup":
+        options = params[0] if isinstance(params, list) else params
+        page, limit = options.get("page", 1), options.get("limit", 1000)
+        items = ASSETS[(page - 1) * limit:page * limit]
+        return {"total": len(items), "limit": limit, "page": page, "items": items}
+    return None
+
+
+def fixture_name(method: str, params) -> str:
+    """File name of the recording of one call: the method and a hash of its params."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+    return f"{method}-{digest}.json"
+
+
+class FixtureStore:
+    """Recorded JSON-RPC responses in a directory, one call per file, loaded on first use."""
+
+    def __init__(self, directory: str, strict: bool = False):
+        self.directory = directory
+        self.strict = strict
+        self._members = {}
+
+    def _load(self, name: str):
+        if name not in self._members:
+            member = None
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    response = json.loads(f.read())
+                key = "error" if "error" in response else "result"
+                member = f'"{key}":'.encode() + json.dumps(response.get(key)).encode()
+            self._members[name] = member
+        return self._members[name]
+
+    def member(self, method: str, params) -> bytes:
+        """The `"result":...` (or `"error":...`) part of the answer to one call, as JSON."""
+        for name in (fixture_name(method, params), f"{method}.json"):
+            member = self._load(name)
+            if member is not None:
+                return member
+        if self.strict:
+            return b'"error":' + json.dumps({"code": -32601, "message": f"No recording for {method}"}).encode()
+        return b'"result":' + json.dumps(_result_for(method, params)).encode()
+
+    def record(self, method: str, params, response: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        name = fixture_name(method, params)
+        with open(os.path.join(self.directory, name), "w") as f:
+            json.dump(dict(response, id=1), f)
+        self._members.pop(name, None)
+
+
+class StubRPCHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    jitter = 0.0
+    failure_rate = 0.0
+    fixtures = None
+    upstream = None
+
+    def setup(self):
+        super().setup()
+        # One handler per accepted TCP connection
+        with self.server.connections_lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, data: bytes = b""):
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            # As real servers do, so the client doesn't pool a connection about to be closed
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _member(self, call: dict) -> bytes:
+        params = call.get("params") or []
+        if self.fixtures is not None:
+            return self.fixtures.member(call["method"], params)
+        return b'"result":' + json.dumps(_result_for(call["method"], params)).encode()
+
+    def _proxy(self, raw: bytes, body):
+        """Forward a request upstream as-is and record the answer to each of its calls."""
+        import requests
+
+        resp = requests.post(self.upstream, data=raw, headers={"Content-Type": "application/json"}, timeout=60)
+        if resp.status_code == 200:
+            calls = body if isinstance(body, list) else [body]
+            answers = resp.json()
+            answers = {answer.get("id"): answer for answer in (answers if isinstance(answers, list) else [answers])}
+            for call in calls:
+                if call.get("id") in answers:
+                    self.fixtures.record(call["method"], call.get("params") or [], answers[call["id"]])
+        self._reply(resp.status_code, resp.content)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw)
+        if self.upstream:
+            return self._proxy(raw, body)
+
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.failure_rate and random.random() < self.failure_rate:
+            return self._reply(503)
+
+        answers = [
+            b'{"jsonrpc":"2.0","id":' + json.dumps(call.get("id")).encode() + b"," + self._member(call) + b"}"
+            for call in (body if isinstance(body, list) else [body])
+        ]
+        self._reply(200, b"[" + b",".join(answers) + b"]" if isinstance(body, list) else answers[0])
+
+
+def start_stub(port: int = 0, latency_ms: float = 0, failure_rate: float = 0, jitter_ms: float = 0,
+               fixtures: str = None, strict: bool = False, upstream: str = None) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread; `server.server_address[1]` is the bound port.
+
+    Faults can be changed while it runs through `server.RequestHandlerClass.latency` (seconds),
+    `.jitter` and `.failure_rate`. With `fixtures` (a directory) recorded responses are replayed,
+    or, with `upstream` too, recorded from that endpoint. `server.connections` counts the TCP
+    connections accepted so far.
+    """
+    if upstream and not fixtures:
+        raise ValueError("Recording needs a fixtures directory")
+    handler = type("Handler", (StubRPCHandler,), {
+        "latency": latency_ms / 1000.0,
+        "jitter": jitter_ms / 1000.0,
+        "failure_rate": failure_rate,
+        "fixtures": FixtureStore(fixtures, strict) if fixtures else None,
+        "upstream": upstream,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler, bind_and_activate=False)
+    server.daemon_threads = True
+    server.connections = 0
+    server.connections_lock = threading.Lock()
+    server.request_queue_size = 1024  # the default backlog of 5 drops connections under load
+    server.server_bind()
+    server.server_activate()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Latency varies uniformly by up to this much")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Share of requests answered with 503")
+    parser.add_argument("--fixtures", help="Directory of recorded responses to replay (or record into)")
+    parser.add_argument("--strict", action="store_true", help="Answer calls without a recording with an error")
+    parser.add_argument("--record", action="store_true", help="Proxy to --upstream and record into --fixtures")
+    parser.add_argument("--upstream", help="Endpoint to record from (default: Helius mainnet for HELIUS_API_KEY)")
+    args = parser.parse_args()
+
+    upstream = None
+    if args.record:
+        if not args.fixtures:
+            parser.error("--record needs --fixtures")
+        upstream = args.upstream or os.environ.get("HELIUS_RPC_URL")
+        if not upstream and os.environ.get("HELIUS_API_KEY"):
+            upstream = f"https://mainnet.helius-rpc.com/?api-key={os.environ['HELIUS_API_KEY']}"
+        if not upstream:
+            parser.error("--record needs --upstream or HELIUS_API_KEY")
+
+    server = start_stub(args.port, args.latency_ms, args.failure_rate, args.jitter_ms,
+                        args.fixtures, args.strict, upstream)
+    if upstream:
+        mode = f"recording into {args.fixtures}"
+    elif args.fixtures:
+        mode = f"replaying {args.fixtures}, {args.latency_ms}ms latency"
+    else:
+        mode = f"{args.latency_ms}ms latency"
+    print(f"Stub RPC listening on http://127.0.0.1:{server.server_address[1]}/ ({mode})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()